@@ -31,6 +31,20 @@ class ${obj_key}(${", ".join(parent_classes)}):
     ${shared['py']['format_description'](obj['description'])}
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+% for attr_name in obj['attribute_names']:
+        '_${underscore(attr_name)}',
+% endfor
+% if obj_key == "Game":
+        'name',
+        '_game_object_classes',
+% elif obj_key == 'Tile' and 'TiledGame' in game['serverParentClasses']:
+        '_neighbors',
+% endif
+    )
+
     def __init__(self):
         """Initializes a ${obj_key} with basic logic as provided by the Creer code generator."""
 % for parent_class in reversed(parent_classes):
@@ -43,6 +57,10 @@ class ${obj_key}(${", ".join(parent_classes)}):
 %>        self._${underscore(attr_name)} = ${shared['py']['default'](attr_parms['type'], attr_parms['default'])}
 % endfor
 
+% if obj_key == 'Tile' and 'TiledGame' in game['serverParentClasses']:
+        self._neighbors = None  # cached by the neighbors property
+
+% endif
 % if obj_key == "Game":
         self.name = "${game_name}"
 
@@ -107,19 +125,31 @@ class ${obj_key}(${", ".join(parent_classes)}):
     """int: The valid directions that tiles can be in, "North", "East", "South", or "West"
     """
 
+    # the neighbors are cached until a delta changes one of the links to them
+    _cached_from = {
+        '_neighbors': ('_tile_north', '_tile_east', '_tile_south', '_tile_west')
+    }
+
+    @property
+    def neighbors(self):
+        """The neighbors of this Tile, in the order of directions, without copying them
+
+        :rtype: tuple[games.${underscore(game_name)}.tile.Tile]
+        """
+        if self._neighbors is None:
+            self._neighbors = tuple(
+                neighbor for neighbor in (self._tile_north, self._tile_east, self._tile_south, self._tile_west)
+                if neighbor
+            )
+
+        return self._neighbors
+
     def get_neighbors(self):
         """Gets the neighbors of this Tile
 
         :rtype list[games.${underscore(game_name)}.tile.Tile]
         """
-        neighbors = []
-
-        for direction in Tile.directions:
-            neighbor = getattr(self, "tile_" + direction.lower())
-            if neighbor:
-                neighbors.append(neighbor)
-
-        return neighbors
+        return list(self.neighbors)
 
     def is_pathable(self):
         """Checks if a Tile is pathable to units
@@ -136,7 +166,7 @@ ${merge("        # ", "is_pathable_builtin", "        return false  # DEVELOPER
         Returns:
             bool: True if the tile is a neighbor of this Tile, False otherwise
         """
-        return bool(tile and tile in self.get_neighbors())
+        return bool(tile and tile in self.neighbors)
 % endif
 % endif
 
@@ -0,0 +1,41 @@
+# Codec benchmark: parses the frames of the recorded Necrowar game, and
+# serializes their events again, with each JSON codec joueur.serializer can
+# use that is installed, against how the client did before codecs (json.loads
+# of each frame decoded to a str, json.dumps encoded to bytes).
+import json
+import common
+import joueur.serializer as serializer
+
+
+def main():
+    constants, deltas = common.recorded()
+    sent = common.frames(deltas)
+    events = [json.loads(frame) for frame in sent]
+    print('codecs over {} frames, {:.1f} MB'.format(len(sent), sum(len(frame) for frame in sent) / 1e6))
+
+    loads_before = common.best(lambda: [json.loads(frame.decode('utf-8')) for frame in sent])
+    dumps_before = common.best(lambda: [json.dumps(event).encode('utf-8') for event in events])
+    common.report('loads: json, from str', loads_before)
+    common.report('dumps: json, to str then bytes', dumps_before)
+
+    default = serializer.json_codec_name
+    try:
+        for name in serializer._json_codec_preference:
+            try:
+                serializer.set_json_codec(name)
+            except ImportError:
+                print('  {} is not installed'.format(name))
+                continue
+
+            loads, dumps = serializer.loads, serializer.dumps
+            assert [loads(frame) for frame in sent] == events
+            assert [json.loads(dumps(event)) for event in events] == events
+
+            common.report('loads: {}, from bytes'.format(name), common.best(lambda: [loads(frame) for frame in sent]), loads_before)
+            common.report('dumps: {}, to bytes'.format(name), common.best(lambda: [dumps(event) for event in events]), dumps_before)
+    finally:
+        serializer.set_json_codec(default)
+
+
+if __name__ == '__main__':
+    main()
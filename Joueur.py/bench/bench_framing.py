@@ -0,0 +1,71 @@
+# Framing benchmark: splits the recorded Necrowar game, sent back to back a
+# few times as one stream of several megabytes, into frames as it is read in
+# recv-sized chunks, the way the client did before FrameBuffer (decoding each
+# chunk, then splitting the str buffered so far on EOT) and via FrameBuffer.
+import common
+from joueur.frame_buffer import FrameBuffer
+
+REPEAT = 4
+
+
+# stands in for the socket, handing out a recorded stream as recv would
+class _Replay():
+    def __init__(self, stream):
+        self._stream = memoryview(stream)
+        self._position = 0
+
+    def recv(self, size):
+        data = self._stream[self._position:self._position + size].tobytes()
+        self._position += len(data)
+        return data
+
+    def recv_into(self, into):
+        data = self._stream[self._position:self._position + len(into)]
+        into[:len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+
+# the client's loop before FrameBuffer, minus parsing
+def _before(stream, size):
+    sock = _Replay(stream)
+    received = ''
+    frames = []
+    while True:
+        sent = sock.recv(size).decode('utf-8')
+        if not sent:
+            return frames
+
+        split = (received + sent).split('\x04')
+        received = split.pop()
+        frames.extend(split)
+
+
+def _after(stream, size):
+    sock = _Replay(stream)
+    buffer = FrameBuffer(size)
+    frames = []
+    while buffer.recv_into(sock):
+        frames.extend(frame.decode('utf-8') for frame in buffer.frames())
+
+    return frames
+
+
+def main():
+    constants, deltas = common.recorded()
+    sent = common.frames(deltas, REPEAT)
+    stream = b''.join(frame + b'\x04' for frame in sent)
+    print('framing {} frames, {:.1f} MB, the largest {:.1f} MB'.format(
+        len(sent), len(stream) / 1e6, max(len(frame) for frame in sent) / 1e6))
+
+    expected = [frame.decode('utf-8') for frame in sent]
+    for size in (1024, 64 * 1024):
+        assert _before(stream, size) == _after(stream, size) == expected
+
+        before = common.best(lambda: _before(stream, size), repeat=3)
+        common.report('recv({}), decode and split each chunk'.format(size), before)
+        common.report('recv_into({}), FrameBuffer'.format(size), common.best(lambda: _after(stream, size), repeat=3), before)
+
+
+if __name__ == '__main__':
+    main()
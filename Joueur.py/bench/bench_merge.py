@@ -0,0 +1,53 @@
+# Merge benchmark: merges the recorded Necrowar game, its whole initial state
+# and then every delta after it, with the GameManager as it was before
+# (tests/baseline_game_manager.py, recursive and converting every key) and
+# with joueur.game_manager.
+import copy
+import common
+import baseline_game_manager
+import games.necrowar
+from joueur.game_manager import GameManager
+
+
+# times merging the initial state, then the rest, each with its own copies as
+# the baseline changes deltas it merges
+def _time(manager_class, constants, deltas):
+    state = {}
+
+    def setup():
+        state['manager'] = manager_class(games.necrowar.Game())
+        state['manager'].set_constants(constants)
+        state['deltas'] = copy.deepcopy(deltas)
+
+    def initial():
+        state['manager'].apply_delta_state(state['deltas'][0])
+
+    def rest():
+        apply_delta_state = state['manager'].apply_delta_state
+        for delta in state['deltas'][1:]:
+            apply_delta_state(delta)
+
+    def setup_rest():
+        setup()
+        initial()
+
+    return common.best(initial, setup=setup), common.best(rest, setup=setup_rest), state['manager'].game
+
+
+def main():
+    constants, deltas = common.recorded()
+    print('merging {} deltas, the initial state has {} game objects'.format(len(deltas), len(deltas[0]['gameObjects'])))
+
+    initial_before, rest_before, game_before = _time(baseline_game_manager.GameManager, constants, deltas)
+    initial_after, rest_after, game_after = _time(GameManager, constants, deltas)
+    assert sorted(game_before._game_objects) == sorted(game_after._game_objects)
+    assert game_before.current_turn == game_after.current_turn
+
+    common.report('initial state: baseline', initial_before)
+    common.report('initial state: GameManager', initial_after, initial_before)
+    common.report('{} deltas after it: baseline'.format(len(deltas) - 1), rest_before)
+    common.report('{} deltas after it: GameManager'.format(len(deltas) - 1), rest_after, rest_before)
+
+
+if __name__ == '__main__':
+    main()
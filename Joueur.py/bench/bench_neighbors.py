@@ -0,0 +1,78 @@
+# Neighbors benchmark: a breadth first search over the whole map of the
+# recorded Necrowar game, walking tiles via get_neighbors() as it was before
+# (four getattr calls building a new list each call), via the cached
+# neighbors of tiles now, and via tile indexes and the flat adjacency.
+from collections import deque
+import common
+from joueur.tile_graph import adjacency
+
+DIRECTIONS = ['North', 'East', 'South', 'West']
+
+
+# Tile.get_neighbors before
+def _get_neighbors_before(tile):
+    neighbors = []
+    for direction in DIRECTIONS:
+        neighbor = getattr(tile, 'tile_' + direction.lower())
+        if neighbor:
+            neighbors.append(neighbor)
+
+    return neighbors
+
+
+def _bfs_tiles(start, neighbors_of):
+    seen = {start}
+    fringe = deque([start])
+    while fringe:
+        for neighbor in neighbors_of(fringe.popleft()):
+            if neighbor not in seen:
+                seen.add(neighbor)
+                fringe.append(neighbor)
+
+    return len(seen)
+
+
+def _bfs_indexes(offsets, neighbors, start):
+    seen = bytearray(len(offsets) - 1)
+    seen[start] = 1
+    fringe = deque([start])
+    count = 1
+    while fringe:
+        index = fringe.popleft()
+        for neighbor in neighbors[offsets[index]:offsets[index + 1]]:
+            if not seen[neighbor]:
+                seen[neighbor] = 1
+                fringe.append(neighbor)
+                count += 1
+
+    return count
+
+
+def main():
+    game, manager = common.necrowar(turns=0)
+    start = game.tiles[0]
+    offsets, neighbors = adjacency(game)
+    print('breadth first search over the {}x{} map'.format(game.map_width, game.map_height))
+
+    searches = [
+        ('get_neighbors(), before', lambda: _bfs_tiles(start, _get_neighbors_before)),
+        ('get_neighbors(), now', lambda: _bfs_tiles(start, lambda tile: tile.get_neighbors())),
+        ('neighbors, cached', lambda: _bfs_tiles(start, lambda tile: tile.neighbors)),
+        ('indexes, adjacency', lambda: _bfs_indexes(offsets, neighbors, 0))
+    ]
+    assert len(set(search() for label, search in searches)) == 1
+
+    before = common.best(searches[0][1], number=10)
+    common.report(searches[0][0], before)
+    for label, search in searches[1:]:
+        common.report(label, common.best(search, number=10), before)
+    common.report('building the adjacency, once a game', common.best(lambda: adjacency(game), number=10))
+
+    pairs = [(tile, other) for tile in game.tiles[:200] for other in game.tiles[:200]]
+    has_before = common.best(lambda: [bool(other and other in _get_neighbors_before(tile)) for tile, other in pairs])
+    common.report('has_neighbor() of {} pairs, before'.format(len(pairs)), has_before)
+    common.report('has_neighbor() of {} pairs, now'.format(len(pairs)), common.best(lambda: [tile.has_neighbor(other) for tile, other in pairs]), has_before)
+
+
+if __name__ == '__main__':
+    main()
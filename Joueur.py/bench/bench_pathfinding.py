@@ -0,0 +1,61 @@
+# Pathfinding benchmark: finds paths across the map of the recorded Necrowar
+# game, through the tiles its AI could path through, with the find_path every
+# tile game's AI had its own copy of before, and with joueur.pathfinding's
+# searches via a Pathfinder. That they find the same paths is checked by
+# tests/test_pathfinding.py.
+import random
+import common
+from joueur.pathfinding import Pathfinder
+
+# how many random pairs of tiles are searched between
+PAIRS = 200
+
+
+# the AIs' find_path before, given what tiles paths can go through
+def _find_path_before(start, goal, passable):
+    if start == goal:
+        return []
+
+    fringe = [start]
+    came_from = {}
+    while len(fringe) > 0:
+        inspect = fringe.pop(0)
+        for neighbor in inspect.get_neighbors():
+            if neighbor == goal:
+                path = [goal]
+                while inspect != start:
+                    path.insert(0, inspect)
+                    inspect = came_from[inspect.id]
+                return path
+
+            if neighbor and neighbor.id not in came_from and passable(neighbor):
+                fringe.append(neighbor)
+                came_from[neighbor.id] = inspect
+
+    return []
+
+
+def _passable(tile):
+    return tile.unit is None and not tile.is_river and not tile.is_unit_spawn
+
+
+def main():
+    game, manager = common.necrowar(turns=0)
+    pathfinder = Pathfinder(game)
+    rng = random.Random(0)
+    pairs = [(rng.choice(game.tiles), rng.choice(game.tiles)) for _ in range(PAIRS)]
+    across = [(game.get_tile_at(0, 0), game.get_tile_at(game.map_width - 1, game.map_height - 1))]
+    print('paths on the {}x{} map'.format(game.map_width, game.map_height))
+
+    for label, queries in [('{} random pairs'.format(PAIRS), pairs), ('corner to corner', across)]:
+        before = common.best(lambda: [_find_path_before(start, goal, _passable) for start, goal in queries])
+        common.report('{}: find_path before'.format(label), before)
+        for search in ('bfs', 'a_star', 'bidirectional'):
+            common.report('{}: {}'.format(label, search), common.best(
+                lambda: [pathfinder.find_path(start, goal, _passable, search) for start, goal in queries]), before)
+
+    common.report('building the Pathfinder, once a game', common.best(lambda: Pathfinder(game)))
+
+
+if __name__ == '__main__':
+    main()
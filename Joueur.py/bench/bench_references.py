@@ -0,0 +1,81 @@
+# References benchmark: resolves game object references the way the client
+# did before the reference fast path and the way it does now, in a delta
+# re-linking every tile of the recorded Necrowar game to its neighbors (the
+# most references a delta holds), in the data of a 'ran' or 'order' event,
+# and one by one via get_game_object.
+import copy
+import common
+import baseline_game_manager
+import games.necrowar
+import joueur.serializer as serializer
+from joueur.game_manager import GameManager
+
+LINKS = ['tileNorth', 'tileEast', 'tileSouth', 'tileWest']
+
+
+# get_game_object before, via the game_objects property, looking up twice
+def _get_game_object_before(game, id):
+    if id in game.game_objects:
+        return game.game_objects[id]
+
+
+# serializer.deserialize before
+def _deserialize_before(data, game):
+    if not isinstance(data, (list, dict)):
+        return data
+
+    if serializer.is_game_object_reference(data):
+        return _get_game_object_before(game, data['id'])
+
+    deserialized = [None] * len(data) if isinstance(data, list) else {}
+    for key, value in (data.items() if isinstance(data, dict) else enumerate(data)):
+        if serializer.is_object(value):
+            deserialized[key] = _deserialize_before(value, game)
+        else:
+            deserialized[key] = value
+
+    return deserialized
+
+
+# times merging a delta into a game already merged with the initial state
+def _time_merge(manager_class, constants, initial, delta):
+    game = games.necrowar.Game()
+    manager = manager_class(game)
+    manager.set_constants(constants)
+    manager.apply_delta_state(copy.deepcopy(initial))
+    copies = []
+
+    return common.best(
+        lambda: manager.apply_delta_state(copies.pop()),
+        setup=lambda: copies.append(copy.deepcopy(delta))
+    )
+
+
+def main():
+    constants, deltas = common.recorded()
+    game, manager = common.necrowar(turns=0)
+    initial = deltas[0]
+
+    tiles = {id: state for id, state in initial['gameObjects'].items() if state['gameObjectName'] == 'Tile'}
+    relink = {'gameObjects': {id: {link: state[link] for link in LINKS} for id, state in tiles.items()}}
+    print('resolving references: {} in the delta, {} tiles'.format(
+        sum(1 for links in relink['gameObjects'].values() for link in links.values() if link), len(tiles)))
+
+    merge_before = _time_merge(baseline_game_manager.GameManager, constants, initial, relink)
+    common.report('merge a delta of tile links: baseline', merge_before)
+    common.report('merge a delta of tile links: GameManager', _time_merge(GameManager, constants, initial, relink), merge_before)
+
+    data = {'tiles': [{'id': id} for id in tiles], 'nested': [[{'id': id}, 1, 'a'] for id in list(tiles)[:500]]}
+    assert _deserialize_before(data, game) == serializer.deserialize(data, game)
+    deserialize_before = common.best(lambda: _deserialize_before(data, game), number=10)
+    common.report('deserialize event data: before', deserialize_before)
+    common.report('deserialize event data: now', common.best(lambda: serializer.deserialize(data, game), number=10), deserialize_before)
+
+    ids = list(game._game_objects) * 10
+    get_before = common.best(lambda: [_get_game_object_before(game, id) for id in ids], number=10)
+    common.report('get_game_object of {} ids: before'.format(len(ids)), get_before)
+    common.report('get_game_object of {} ids: now'.format(len(ids)), common.best(lambda: [game.get_game_object(id) for id in ids], number=10), get_before)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+# Slots benchmark: the memory and attribute access of every game object class
+# of the 11 games, as generated now, with __slots__, against each as it was
+# before, with its attributes in a per-instance __dict__ (rebuilt here from
+# its properties, which read the same attributes either way).
+import gc
+import importlib
+import os
+import tracemalloc
+import common
+
+GAMES = sorted(
+    name for name in os.listdir(os.path.join(common.ROOT, 'games'))
+    if os.path.isfile(os.path.join(common.ROOT, 'games', name, '__init__.py'))
+)
+
+# how many of each class are made
+COUNT = 1000
+
+
+# the class the way it was generated before, without __slots__
+def _with_dict(cls):
+    namespace = {}
+    for klass in reversed(cls.__mro__):
+        namespace.update((name, value) for name, value in vars(klass).items() if isinstance(value, property))
+
+    return type(cls.__name__, (), namespace)
+
+
+def _attributes(cls):
+    return [name for klass in cls.__mro__ for name in getattr(klass, '__slots__', ())]
+
+
+# makes instances the way it was generated before, with what new ones hold
+def _before(cls, with_dict, attributes):
+    instance = with_dict()
+    made = cls()
+    for name in attributes:
+        if hasattr(made, name):
+            setattr(instance, name, getattr(made, name))
+
+    return instance
+
+
+def _bytes(make):
+    gc.collect()
+    tracemalloc.start()
+    instances = [make() for _ in range(COUNT)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del instances
+    return size / COUNT
+
+
+def _read(instances, properties):
+    for instance in instances:
+        for name in properties:
+            getattr(instance, name)
+
+
+def main():
+    print('the bytes one of each game object class takes, and reading every property of {} of each'.format(COUNT))
+    totals = [0, 0, 0.0, 0.0]
+    for game_name in GAMES:
+        game = importlib.import_module('games.' + game_name).Game()
+        results = [0, 0, 0.0, 0.0]
+        for cls in game._game_object_classes.values():
+            with_dict = _with_dict(cls)
+            attributes = _attributes(cls)
+            properties = [name for name, value in vars(with_dict).items() if isinstance(value, property)]
+
+            results[0] += _bytes(lambda: _before(cls, with_dict, attributes))
+            results[1] += _bytes(cls)
+
+            before = [_before(cls, with_dict, attributes) for _ in range(COUNT)]
+            after = [cls() for _ in range(COUNT)]
+            results[2] += common.best(lambda: _read(before, properties))
+            results[3] += common.best(lambda: _read(after, properties))
+
+        print('{} ({} classes): {:.0f} bytes before, {:.0f} with slots ({:.0%} less)'.format(
+            game_name, len(game._game_object_classes), results[0], results[1], 1 - results[1] / results[0]))
+        common.report('reading, before', results[2])
+        common.report('reading, with slots', results[3], results[2])
+        totals = [total + result for total, result in zip(totals, results)]
+
+    print('all {} games: {:.0f} bytes before, {:.0f} with slots ({:.0%} less)'.format(
+        len(GAMES), totals[0], totals[1], 1 - totals[1] / totals[0]))
+    common.report('reading, before', totals[2])
+    common.report('reading, with slots', totals[3], totals[2])
+
+
+if __name__ == '__main__':
+    main()
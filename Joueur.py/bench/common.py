@@ -0,0 +1,104 @@
+# Shared by the benchmarks: the Necrowar game recorded from its simulator for
+# the tests (tests/fixtures/deltas/necrowar.json.gz, its first sequence), as
+# deltas, frames, or a merged game, and the timing and printing of results.
+import copy
+import gzip
+import json
+import os
+import sys
+import timeit
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'tests'))  # for baseline_game_manager
+
+import games.necrowar  # noqa: E402
+from joueur.game_manager import GameManager  # noqa: E402
+
+RECORDED = os.path.join(ROOT, 'tests', 'fixtures', 'deltas', 'necrowar.json.gz')
+
+
+def recorded():
+    """Loads the recorded Necrowar game.
+
+    Returns:
+        tuple[dict, list[dict]]: its constants, and its deltas in order, the
+        first being the whole initial state
+    """
+    with gzip.open(RECORDED, 'rb') as file:
+        fixture = json.loads(file.read().decode('utf-8'))
+
+    return fixture['constants'], fixture['sequences'][0]
+
+
+def frames(deltas, repeat=1):
+    """Serializes deltas the way the server sends them.
+
+    Args:
+        deltas (list[dict]): the deltas to send
+        repeat (int): how many times to send them all, for a longer stream
+
+    Returns:
+        list[bytes]: a 'delta' event frame for each, without its EOT byte
+    """
+    sent = [
+        json.dumps({'event': 'delta', 'data': delta}, separators=(',', ':')).encode('utf-8')
+        for delta in deltas
+    ]
+    return sent * repeat
+
+
+def necrowar(turns=None, manager_class=GameManager):
+    """Merges the recorded game into a new Necrowar game.
+
+    Args:
+        turns (int): how many deltas after the initial state to merge, or
+            None for all of them
+        manager_class (class): the GameManager to merge them with
+
+    Returns:
+        tuple[Game, GameManager]: the game, and its manager
+    """
+    constants, deltas = recorded()
+    game = games.necrowar.Game()
+    manager = manager_class(game)
+    manager.set_constants(constants)
+    for delta in deltas[:None if turns is None else turns + 1]:
+        manager.apply_delta_state(copy.deepcopy(delta))
+
+    return game, manager
+
+
+def best(function, number=1, repeat=5, setup=None):
+    """Times a function, the best of several runs to discount noise.
+
+    Args:
+        function (function): what to time
+        number (int): how many calls each run makes
+        repeat (int): how many runs
+        setup (function): called before each run, untimed
+
+    Returns:
+        float: the seconds a call took, in the best run
+    """
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        times.append(timeit.timeit(function, number=number))
+
+    return min(times) / number
+
+
+def report(label, seconds, before=None):
+    """Prints a result, and how much faster it is than a result before.
+
+    Args:
+        label (str): what was timed
+        seconds (float): how long it took
+        before (float): how long it took before, to compare to
+    """
+    line = '  {:<44} {:>10.3f} ms'.format(label, seconds * 1e3)
+    if before:
+        line += '  {:>6.2f}x'.format(before / seconds)
+    print(line)
@@ -16,6 +16,22 @@ class Building(GameObject):
     A basic building. It does nothing besides burn down. Other Buildings inherit from this class.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_bribed',
+        '_building_east',
+        '_building_north',
+        '_building_south',
+        '_building_west',
+        '_fire',
+        '_health',
+        '_is_headquarters',
+        '_owner',
+        '_x',
+        '_y',
+    )
+
     def __init__(self):
         """Initializes a Building with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
@@ -16,6 +16,12 @@ class FireDepartment(Building):
     Can put out fires completely.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_fire_extinguished',
+    )
+
     def __init__(self):
         """Initializes a FireDepartment with basic logic as provided by the Creer code generator."""
         Building.__init__(self)
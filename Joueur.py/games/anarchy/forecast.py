@@ -16,6 +16,14 @@ class Forecast(GameObject):
     The weather effect that will be applied at the end of a turn, which causes fires to spread.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_controlling_player',
+        '_direction',
+        '_intensity',
+    )
+
     def __init__(self):
         """Initializes a Forecast with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
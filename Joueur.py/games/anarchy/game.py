@@ -26,6 +26,29 @@ class Game(BaseGame):
     Two player grid based game where each player tries to burn down the other player's buildings. Let it burn.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_base_bribes_per_turn',
+        '_buildings',
+        '_current_forecast',
+        '_current_player',
+        '_current_turn',
+        '_forecasts',
+        '_game_objects',
+        '_map_height',
+        '_map_width',
+        '_max_fire',
+        '_max_forecast_intensity',
+        '_max_turns',
+        '_next_forecast',
+        '_players',
+        '_session',
+        '_time_added_per_turn',
+        'name',
+        '_game_object_classes',
+    )
+
     def __init__(self):
         """Initializes a Game with basic logic as provided by the Creer code generator."""
         BaseGame.__init__(self)
@@ -16,6 +16,26 @@ class Player(GameObject):
     A player in this game. Every AI controls one player.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_bribes_remaining',
+        '_buildings',
+        '_client_type',
+        '_fire_departments',
+        '_headquarters',
+        '_lost',
+        '_name',
+        '_opponent',
+        '_police_departments',
+        '_reason_lost',
+        '_reason_won',
+        '_time_remaining',
+        '_warehouses',
+        '_weather_stations',
+        '_won',
+    )
+
     def __init__(self):
         """Initializes a Player with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
@@ -16,6 +16,11 @@ class PoliceDepartment(Building):
     Used to keep cities under control and raid Warehouses.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+    )
+
     def __init__(self):
         """Initializes a PoliceDepartment with basic logic as provided by the Creer code generator."""
         Building.__init__(self)
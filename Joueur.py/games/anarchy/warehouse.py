@@ -16,6 +16,13 @@ class Warehouse(Building):
     A typical abandoned warehouse... that anarchists hang out in and can be bribed to burn down Buildings.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_exposure',
+        '_fire_added',
+    )
+
     def __init__(self):
         """Initializes a Warehouse with basic logic as provided by the Creer code generator."""
         Building.__init__(self)
@@ -16,6 +16,11 @@ class WeatherStation(Building):
     Can be bribed to change the next Forecast in some way.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+    )
+
     def __init__(self):
         """Initializes a WeatherStation with basic logic as provided by the Creer code generator."""
         Building.__init__(self)
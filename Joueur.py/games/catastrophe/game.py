@@ -24,6 +24,39 @@ class Game(BaseGame):
     Convert as many humans to as you can to survive in this post-apocalyptic wasteland.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_cat_energy_mult',
+        '_current_player',
+        '_current_turn',
+        '_game_objects',
+        '_harvest_cooldown',
+        '_jobs',
+        '_lower_harvest_amount',
+        '_map_height',
+        '_map_width',
+        '_max_turns',
+        '_monument_cost_mult',
+        '_monument_materials',
+        '_neutral_materials',
+        '_players',
+        '_session',
+        '_shelter_materials',
+        '_starting_food',
+        '_starving_energy_mult',
+        '_structures',
+        '_tiles',
+        '_time_added_per_turn',
+        '_turns_between_harvests',
+        '_turns_to_create_human',
+        '_turns_to_lower_harvest',
+        '_units',
+        '_wall_materials',
+        'name',
+        '_game_object_classes',
+    )
+
     def __init__(self):
         """Initializes a Game with basic logic as provided by the Creer code generator."""
         BaseGame.__init__(self)
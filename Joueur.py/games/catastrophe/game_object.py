@@ -16,6 +16,14 @@ class GameObject(BaseGameObject):
     An object in the game. The most basic class that all game classes should inherit from automatically.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_game_object_name',
+        '_id',
+        '_logs',
+    )
+
     def __init__(self):
         """Initializes a GameObject with basic logic as provided by the Creer code generator."""
         BaseGameObject.__init__(self)
@@ -16,6 +16,17 @@ class Job(GameObject):
     Information about a Unit's job.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_action_cost',
+        '_carry_limit',
+        '_moves',
+        '_regen_rate',
+        '_title',
+        '_upkeep',
+    )
+
     def __init__(self):
         """Initializes a Job with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
@@ -16,6 +16,24 @@ class Player(GameObject):
     A player in this game. Every AI controls one player.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_cat',
+        '_client_type',
+        '_food',
+        '_lost',
+        '_name',
+        '_opponent',
+        '_reason_lost',
+        '_reason_won',
+        '_structures',
+        '_time_remaining',
+        '_units',
+        '_upkeep',
+        '_won',
+    )
+
     def __init__(self):
         """Initializes a Player with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
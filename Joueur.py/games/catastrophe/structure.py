@@ -16,6 +16,16 @@ class Structure(GameObject):
     A structure on a Tile.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_effect_radius',
+        '_materials',
+        '_owner',
+        '_tile',
+        '_type',
+    )
+
     def __init__(self):
         """Initializes a Structure with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
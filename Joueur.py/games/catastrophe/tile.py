@@ -16,6 +16,24 @@ class Tile(GameObject):
     A Tile in the game that makes up the 2D map grid.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_food',
+        '_harvest_rate',
+        '_materials',
+        '_structure',
+        '_tile_east',
+        '_tile_north',
+        '_tile_south',
+        '_tile_west',
+        '_turns_to_harvest',
+        '_unit',
+        '_x',
+        '_y',
+        '_neighbors',
+    )
+
     def __init__(self):
         """Initializes a Tile with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
@@ -34,6 +52,8 @@ class Tile(GameObject):
         self._x = 0
         self._y = 0
 
+        self._neighbors = None  # cached by the neighbors property
+
     @property
     def food(self):
         """The number of food dropped on this Tile.
@@ -135,19 +155,31 @@ class Tile(GameObject):
     """int: The valid directions that tiles can be in, "North", "East", "South", or "West"
     """
 
+    # the neighbors are cached until a delta changes one of the links to them
+    _cached_from = {
+        '_neighbors': ('_tile_north', '_tile_east', '_tile_south', '_tile_west')
+    }
+
+    @property
+    def neighbors(self):
+        """The neighbors of this Tile, in the order of directions, without copying them
+
+        :rtype: tuple[games.catastrophe.tile.Tile]
+        """
+        if self._neighbors is None:
+            self._neighbors = tuple(
+                neighbor for neighbor in (self._tile_north, self._tile_east, self._tile_south, self._tile_west)
+                if neighbor
+            )
+
+        return self._neighbors
+
     def get_neighbors(self):
         """Gets the neighbors of this Tile
 
         :rtype list[games.catastrophe.tile.Tile]
         """
-        neighbors = []
-
-        for direction in Tile.directions:
-            neighbor = getattr(self, "tile_" + direction.lower())
-            if neighbor:
-                neighbors.append(neighbor)
-
-        return neighbors
+        return list(self.neighbors)
 
     def is_pathable(self):
         """Checks if a Tile is pathable to units
@@ -166,7 +198,7 @@ class Tile(GameObject):
         Returns:
             bool: True if the tile is a neighbor of this Tile, False otherwise
         """
-        return bool(tile and tile in self.get_neighbors())
+        return bool(tile and tile in self.neighbors)
 
     # <<-- Creer-Merge: functions -->> - Code you add between this comment and the end comment will be preserved between Creer re-runs.
     # if you want to add any client side logic (such as state checking functions) this is where you can add them
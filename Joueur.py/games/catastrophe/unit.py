@@ -16,6 +16,23 @@ class Unit(GameObject):
     A unit in the game.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_acted',
+        '_energy',
+        '_food',
+        '_job',
+        '_materials',
+        '_movement_target',
+        '_moves',
+        '_owner',
+        '_squad',
+        '_starving',
+        '_tile',
+        '_turns_to_die',
+    )
+
     def __init__(self):
         """Initializes a Unit with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
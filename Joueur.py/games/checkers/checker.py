@@ -16,6 +16,15 @@ class Checker(GameObject):
     A checker on the game board.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_kinged',
+        '_owner',
+        '_x',
+        '_y',
+    )
+
     def __init__(self):
         """Initializes a Checker with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
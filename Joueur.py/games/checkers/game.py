@@ -21,6 +21,25 @@ class Game(BaseGame):
     The simple version of American Checkers. An 8x8 board with 12 checkers on each side that must move diagonally to the opposing side until kinged.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_board_height',
+        '_board_width',
+        '_checker_moved',
+        '_checker_moved_jumped',
+        '_checkers',
+        '_current_player',
+        '_current_turn',
+        '_game_objects',
+        '_max_turns',
+        '_players',
+        '_session',
+        '_time_added_per_turn',
+        'name',
+        '_game_object_classes',
+    )
+
     def __init__(self):
         """Initializes a Game with basic logic as provided by the Creer code generator."""
         BaseGame.__init__(self)
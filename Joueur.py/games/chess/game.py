@@ -20,6 +20,18 @@ class Game(BaseGame):
     The traditional 8x8 chess board with pieces.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_fen',
+        '_game_objects',
+        '_history',
+        '_players',
+        '_session',
+        'name',
+        '_game_object_classes',
+    )
+
     def __init__(self):
         """Initializes a Game with basic logic as provided by the Creer code generator."""
         BaseGame.__init__(self)
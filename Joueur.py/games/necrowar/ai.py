@@ -89,10 +89,12 @@ class AI(BaseAI):
         else:
             self.river_spots = [self.game.get_tile_at(29,7),self.game.get_tile_at(29,8),self.game.get_tile_at(29,9),self.game.get_tile_at(29,10),self.game.get_tile_at(29,11),self.game.get_tile_at(29,12),self.game.get_tile_at(29,13),self.game.get_tile_at(29,19),self.game.get_tile_at(29,20),self.game.get_tile_at(29,21),self.game.get_tile_at(29,22)]
 
-        self.past_tower_list = [] # How many towers we built last round
-        self.past_tower_num = 0 # Number of towers that we last had
         self.destroyed_towers = [] # Towers that we lost
         self.new_towers = [] # Towers that we just built
+        self.tower_ids = set(tower.id for tower in self.player.towers) # Ids of our towers as of the last update
+
+        # Tiles with corpses on them, kept up to date from what changes
+        self.corpse_tiles = set(tile for tile in self.game.tiles if tile.corpses)
 
         # TODO: Initialize our AI here!!!!!
 
@@ -105,27 +107,27 @@ class AI(BaseAI):
         """
         # <<-- Creer-Merge: game-updated -->> - Code you add between this comment and the end comment will be preserved between Creer re-runs.
         '''
-        This code detects any new or destroyed towers
+        This code detects any new or destroyed towers, from what this update changed
+        '''
+        # Reset every update, so they only ever hold what this update changed
+        tower_ids = set(tower.id for tower in self.player.towers)
+        self.new_towers = [tower for tower in self.player.towers if tower.id not in self.tower_ids]
+
+        # Our towers taken out of the game's lists, and any others no longer in our list
+        removed = [self.game.get_game_object(id) for id in self.changes.removed]
+        destroyed_ids = set(tower.id for tower in removed if tower.game_object_name == "Tower" and tower.owner == self.player)
+        destroyed_ids |= self.tower_ids - tower_ids
+        self.destroyed_towers = [self.game.get_game_object(id) for id in sorted(destroyed_ids, key=int)]
+        self.tower_ids = tower_ids
+
+        '''
+        Keep track of the tiles with corpses on them, instead of checking every tile each turn
         '''
-        # Runs when our number of towers are different from last round
-        if self.past_tower_num != self.towers:
-            self.destroyed_towers = []
-            self.new_towers = []
-
-            # For all current towers...
-            for cur_tower in self.player.towers:
-                # If it is not in past towers, that means that this is a new tower
-                if cur_tower not in self.past_tower_list:
-                    self.new_towers.append(cur_tower)
-
-            # For all past past towers...
-            for past_tower in self.past_tower_list:
-                # If past tower isn't in current tower list, we lost that tower
-                if past_tower not in self.player.towers:
-                    self.destroyed_towers.append(past_tower)
-
-        self.past_tower_num = self.towers # Update our number of towers
-        self.past_tower_list = self.player.towers # Update our tower list
+        for tile in self.changes.game_objects('corpses'):
+            if tile.corpses:
+                self.corpse_tiles.add(tile)
+            else:
+                self.corpse_tiles.discard(tile)
 
         '''
         Check for phase 1 to 2: When 25 workers have been made
@@ -576,7 +578,7 @@ class AI(BaseAI):
             '''
             if self.right:
                 if self.game.current_turn > 50 and ((self.game.current_turn % 10) < 2):
-                    for tile in self.game.tiles:
+                    for tile in sorted(self.corpse_tiles, key=lambda tile: (tile.y, tile.x)):
                         if tile.corpses:
                             if self.unit_spawn.tile_west.num_zombies < 10 and self.unit_spawn.tile_west.tile_south.unit == None:
                                 for zombies in range(tile.corpses):
@@ -590,7 +592,7 @@ class AI(BaseAI):
 
             else:
                 if self.game.current_turn > 50 and ((self.game.current_turn % 10) < 2):
-                    for tile in self.game.tiles:
+                    for tile in sorted(self.corpse_tiles, key=lambda tile: (tile.y, tile.x)):
                         if tile.corpses:
                             if self.player.mana >= 2 and self.unit_spawn.tile_east.num_zombies < 10 and self.unit_spawn.tile_east.tile_north.unit == None:
                                 for zombies in range(tile.corpses):
@@ -665,19 +667,35 @@ class AI(BaseAI):
         best_distance = 9999
         best_worker = None
         worker_count = 0
+        # how far every tile is from this one, found once for all the workers
+        # (and cached until units move) instead of a path per worker
+        distances = None
         for unit in self.game.units:
             if unit.job.title == "worker" and unit.owner == self.player:
                 worker_count += 1
                 if unit.tile == tile:
                     return unit
                 if worker_count >= low and worker_count <= high and not unit.acted and unit.moves > 0:
-                    distance = len(self.find_path(unit.tile, tile))
+                    if distances is None:
+                        distances = self.pathfinder.distances(tile, self.walkable)
+                    # 0 when there is no path, as the empty path find_path gives was
+                    distance = max(distances[self.pathfinder.index(unit.tile)], 0)
                     if distance < best_distance:
                         best_distance = distance
                         best_worker = unit
 
         return best_worker
 
+    def walkable(self, tile):
+        """Checks if workers can walk through a tile on their way somewhere.
+
+        Args:
+            tile (games.necrowar.tile.Tile): the tile to check
+        Returns:
+            bool: True if it has no unit, and is not the river or a unit spawn
+        """
+        return tile.unit == None and not tile.is_river and not tile.is_unit_spawn
+
     def find_path(self, start, goal):
         """A very basic path finding algorithm (Breadth First Search) that when
             given a starting Tile, will return a valid path to the goal Tile.
@@ -691,52 +709,8 @@ class AI(BaseAI):
             Tile to the start, and the last element being the goal.
         """
 
-        if start == goal:
-            # no need to make a path to here...
-            return []
-
-        # queue of the tiles that will have their neighbors searched for 'goal'
-        fringe = []
-
-        # How we got to each tile that went into the fringe.
-        came_from = {}
-
-        # Enqueue start as the first tile to have its neighbors searched.
-        fringe.append(start)
-
-        # keep exploring neighbors of neighbors... until there are no more.
-        while len(fringe) > 0:
-            # the tile we are currently exploring.
-            inspect = fringe.pop(0)
-
-            # cycle through the tile's neighbors.
-            for neighbor in inspect.get_neighbors():
-                # if we found the goal, we have the path!
-                if neighbor == goal:
-                    # Follow the path backward to the start from the goal and
-                    # # return it.
-                    path = [goal]
-
-                    # Starting at the tile we are currently at, insert them
-                    # retracing our steps till we get to the starting tile
-                    while inspect != start:
-                        path.insert(0, inspect)
-                        inspect = came_from[inspect.id]
-                    return path
-                # else we did not find the goal, so enqueue this tile's
-                # neighbors to be inspected
-
-                # if the tile exists, has not been explored or added to the
-                # fringe yet, and it is pathable
-                if neighbor and neighbor.id not in came_from and neighbor.unit == None and not neighbor.is_river and not neighbor.is_unit_spawn:
-                    # add it to the tiles to be explored and add where it came
-                    # from for path reconstruction.
-                    fringe.append(neighbor)
-                    came_from[neighbor.id] = inspect
-
-        # if you're here, that means that there was not a path to get to where
-        # you want to go; in that case, we'll just return an empty path.
-        return []
+        # see joueur.pathfinding for the other searches, e.g. search='a_star'
+        return self.pathfinder.find_path(start, goal, self.walkable)
 
     # <<-- Creer-Merge: functions -->> - Code you add between this comment and the end comment will be preserved between Creer re-runs.
     # if you need additional functions for your AI you can add them here
@@ -25,6 +25,31 @@ class Game(BaseGame):
     Send hordes of the undead at your opponent while defending yourself against theirs to win.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_current_player',
+        '_current_turn',
+        '_game_objects',
+        '_gold_income_per_unit',
+        '_island_income_per_unit',
+        '_mana_income_per_unit',
+        '_map_height',
+        '_map_width',
+        '_max_turns',
+        '_players',
+        '_river_phase',
+        '_session',
+        '_tiles',
+        '_time_added_per_turn',
+        '_tower_jobs',
+        '_towers',
+        '_unit_jobs',
+        '_units',
+        'name',
+        '_game_object_classes',
+    )
+
     def __init__(self):
         """Initializes a Game with basic logic as provided by the Creer code generator."""
         BaseGame.__init__(self)
@@ -16,6 +16,26 @@ class Player(GameObject):
     A player in this game. Every AI controls one player.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_client_type',
+        '_gold',
+        '_health',
+        '_home_base',
+        '_lost',
+        '_mana',
+        '_name',
+        '_opponent',
+        '_reason_lost',
+        '_reason_won',
+        '_side',
+        '_time_remaining',
+        '_towers',
+        '_units',
+        '_won',
+    )
+
     def __init__(self):
         """Initializes a Player with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
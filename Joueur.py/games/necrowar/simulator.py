@@ -0,0 +1,1009 @@
+# Simulator: plays Necrowar between AIs in this process, without a server or
+# a socket, using the same rules as the game server's Necrowar
+# (Cerveau/src/games/necrowar), quirks included, so AIs play the same as they
+# would against it.
+# The rules act on a Game of the same classes the AIs play with, and what they
+# change is sent to each AI's own Game as deltas merged by a GameManager, the
+# way the server's are, so the AIs' changes, pathfinder, and game_updated all
+# work as they do over a socket.
+import math
+import random
+import sys
+import time
+import traceback
+from contextlib import contextmanager
+import joueur.client
+from joueur.base_game_object import BaseGameObject
+from joueur.game_manager import GameManager
+from games.necrowar.ai import AI
+from games.necrowar.game import Game
+
+# the constants the server sends in its lobbied event
+_constants = {
+    'DELTA_REMOVED': '&RM',
+    'DELTA_LIST_LENGTH': '&LEN'
+}
+
+# the game settings the server uses by default
+default_settings = {
+    'gold_income_per_unit': 5,
+    'island_income_per_unit': 10,
+    'mana_income_per_unit': 5,
+    'river_phase': 25,
+    'map_width': 63,
+    'map_height': 32,
+    'max_turns': 200,
+    'time_added_per_turn': 1000000000,
+    'player_starting_time': 60000000000
+}
+
+# the unit and tower jobs the server creates, in the same order
+_unit_job_fields = ('title', 'gold_cost', 'mana_cost', 'damage', 'health', 'moves', 'range', 'per_tile')
+_unit_jobs = [
+    ('worker', 10, 0, 0, 1, 8, 1, 1),
+    ('zombie', 0, 2, 1, 5, 3, 1, 10),
+    ('ghoul', 20, 5, 5, 15, 3, 1, 2),
+    ('abomination', 25, 10, 10, 60, 1, 1, 1),
+    ('hound', 15, 4, 5, 5, 5, 1, 3),
+    ('wraith', 40, 20, 10, 10, 6, 1, 1),
+    ('horseman', 150, 50, 15, 75, 5, 1, 1)
+]
+_tower_job_fields = ('title', 'gold_cost', 'mana_cost', 'health', 'range', 'turns_between_attacks', 'all_units', 'damage')
+_tower_jobs = [
+    ('castle', 9999, 9999, 100, 3, 1, True, 3),
+    ('arrow', 50, 0, 30, 3, 1, False, 5),
+    ('ballista', 75, 0, 30, 3, 3, False, 20),
+    ('cleansing', 30, 30, 30, 3, 1, False, 5),
+    ('aoe', 40, 15, 30, 3, 1, True, 3)
+]
+
+# the indexes in the jobs above of the titles that can be built or spawned
+_tower_indexes = {'arrow': 1, 'ballista': 2, 'cleansing': 3, 'aoe': 4}
+_unit_indexes = {'ghoul': 2, 'abomination': 3, 'hound': 4, 'wraith': 5, 'horseman': 6}
+
+# how far towers can attack, in a straight line
+_tower_range = 2.2
+
+# what each function returns when the command is invalid, if not False
+_invalid_values = {'log': None}
+
+# the names of the fields sent for each class, and the server's key for each
+_field_names_by_class = {}
+_keys = {}
+
+
+class _Invalid(Exception):
+    """Raised by the rules when a command is invalid, with why."""
+
+
+class _TimedOut(BaseException):
+    """Raised out of an AI's code once its player runs out of time, or runs
+    too many invalid commands, as its client would be disconnected. Not an
+    Exception, so AIs catching those do not keep playing.
+    """
+
+
+class Simulator():
+    """Plays games of Necrowar between two AIs in this process, with the same
+    rules as the game server. AIs play the same as they do against it, as
+    long as they are not asyncio ones (async def).
+
+    Example:
+        from games.necrowar.simulator import Simulator
+
+        ais = Simulator().play()
+        print(ais[0].player.won, ais[0].player.reason_won)
+    """
+
+    def __init__(self, ai_classes=(AI, AI), settings=None, ai_settings=None, seed=None, max_invalid=1000):
+        """Sets up the games to play.
+
+        Args:
+            ai_classes (tuple): the classes of the AIs of the first and second
+                player, each created with its game, like games.necrowar.AI
+            settings (dict): the game settings to change from
+                default_settings, e.g. {'max_turns': 100}
+            ai_settings (tuple[str]): the settings of each AI, as given via
+                the --aiSettings flag, e.g. 'depth=3&log', or None
+            seed (int): the seed of the coin flip that decides ties, or None
+                for a random one
+            max_invalid (int): the most invalid commands an AI may run in a
+                turn before its player is disconnected, as one that keeps
+                running them would otherwise only stop once its clock runs
+                out, minutes later, or None for no limit, as the server has none
+        """
+        self.ai_classes = tuple(ai_classes)
+        self.settings = dict(default_settings, **(settings or {}))
+        self.ai_settings = tuple(ai_settings or (None,) * len(self.ai_classes))
+        self.random = random.Random(seed)
+        self.max_invalid = max_invalid
+
+        self.game = None  # the game the rules act on, with the truth of it
+        self.errors = {}  # the traceback of each AI that errored, by index
+        self._clients = []  # (game, ai, manager) of each AI
+        self._playing = None  # the index of the AI whose code is running
+        self._ticking = None  # since when the player whose turn it is has been taking time
+        self._invalid = []  # how many invalid commands each AI ran this turn
+        self._over = False
+        self._next_id = 0
+        self._created = []  # the game objects created since the last delta
+        self._dirty = {}  # the names of the fields changed since the last delta, by game or game object
+        self._unit_spawns = {}  # the tile each player resurrects zombies on
+
+    def play(self):
+        """Plays a game until it is over.
+
+        Returns:
+            list[BaseAI]: the AIs that played, in the order of ai_classes,
+            whose players have if they won and why
+        """
+        token = joueur.client.use(self)
+        try:
+            self._setup()
+            self._flush()
+            for index, (game, ai, manager) in enumerate(self._clients):
+                ai.set_player(game.get_game_object(self.game.players[index].id))
+                self._call(index, ai.start)
+                self._call(index, ai.game_updated)
+
+            while not self._over:
+                self._run_current_turn()
+
+            self._flush()
+            for index, (game, ai, manager) in enumerate(self._clients):
+                won = ai.player.won
+                self._call(index, ai.end, won, ai.player.reason_won if won else ai.player.reason_lost)
+        finally:
+            joueur.client.reset(token)
+
+        return [ai for game, ai, manager in self._clients]
+
+    # the functions game objects call on the current client
+
+    def run_on_server(self, caller, function_name, args=None):
+        """Runs a game function an AI called, as the server would, returning
+        what it returns. Called by game objects, not AIs.
+        """
+        if self._over:
+            return None  # as a client does once the game is over
+
+        index = self._playing
+        # as the server, only count the time the player takes, not the rules
+        ticking = self._ticking is not None and index == self.game.players.index(self.game.current_player)
+        if ticking and self._pause_ticking():
+            raise _TimedOut()
+
+        try:
+            returned = self._run(index, caller, function_name, args or {})
+        except _Invalid as invalid:
+            if ticking:
+                self._start_ticking()
+            if index is not None:
+                self._ran_invalid(index)
+                self._call(index, self._clients[index][1].invalid, str(invalid))
+            return _invalid_values.get(function_name, False)
+
+        if ticking:
+            self._start_ticking()
+        self._flush()
+        if isinstance(returned, BaseGameObject):
+            return self._clients[index][0].get_game_object(returned.id)
+
+        return returned
+
+    @contextmanager
+    def batch(self):
+        """Does nothing, as commands are run right away."""
+        yield
+
+    def flush_runs(self):
+        """Does nothing, as commands are run right away."""
+
+    def disconnect(self, exit_code=None):
+        """Does nothing, as there is no server to disconnect from."""
+
+    # checks a command, and runs it if it is valid, raising _Invalid if not
+    def _run(self, index, caller, function_name, args):
+        if index is None or self.game.players[index] is not self.game.current_player:
+            raise _Invalid('It is not your turn.')
+
+        game_objects = self.game._game_objects
+        state = game_objects.get(caller.id)
+        rule = self._rules.get((caller.game_object_name, function_name)) or \
+            self._rules.get(('GameObject', function_name))
+        if state is None or rule is None:
+            raise _Invalid('{} cannot {}.'.format(caller, function_name))
+
+        kwargs = {
+            name: game_objects.get(value.id) if isinstance(value, BaseGameObject) else value
+            for name, value in args.items()
+        }
+        return getattr(self, rule)(self.game.players[index], state, **kwargs)
+
+    # setting up the game
+
+    def _setup(self):
+        self.errors = {}
+        self._over = False
+        self._ticking = None
+        self._next_id = 0
+        self._created = []
+        self._dirty = {}
+
+        self._clients = []
+        self._invalid = [0] * len(self.ai_classes)
+        for index, ai_class in enumerate(self.ai_classes):
+            game = Game()
+            ai = ai_class(game)
+            manager = GameManager(game)
+            manager.set_constants(_constants)
+            ai.set_changes(manager.changes)
+            ai.set_settings(self.ai_settings[index])
+            self._clients.append((game, ai, manager))
+
+        game = self.game = Game()
+        for name, value in self.settings.items():
+            if name != 'player_starting_time':
+                setattr(game, '_' + name, value)
+        game._session = 'simulated'
+
+        players = []
+        for game_, ai, manager in self._clients:
+            players.append(self._create(
+                'Player',
+                name=ai.get_name() or 'Python Player',
+                client_type='Python',
+                time_remaining=self.settings['player_starting_time']
+            ))
+        players[0]._opponent = players[1]
+        players[1]._opponent = players[0]
+        game._players = players
+        game._current_player = players[0]
+
+        self._create_tiles()
+        game._unit_jobs = [self._create('UnitJob', **dict(zip(_unit_job_fields, job))) for job in _unit_jobs]
+        game._tower_jobs = [self._create('TowerJob', **dict(zip(_tower_job_fields, job))) for job in _tower_jobs]
+        self._create_map()
+
+        for player in players:
+            self._set(player, 'gold', 100)
+            self._set(player, 'mana', 100)
+
+        # the server looks for it each time, but it never changes
+        self._unit_spawns = {}
+        for tile in game.tiles:
+            if tile.is_unit_spawn and tile.owner:
+                self._unit_spawns[tile.owner] = tile
+
+        self._dirty[game] = {name for name in _field_names(Game) if name != 'game_objects'}
+
+    def _create_tiles(self):
+        game = self.game
+        width, height = game.map_width, game.map_height
+        game._tiles = [None] * (width * height)
+        for x in range(width):
+            for y in range(height):
+                game._tiles[x + y * width] = self._create('Tile', x=x, y=y)
+
+        for tile in game._tiles:
+            tile._tile_north = game.get_tile_at(tile.x, tile.y - 1)
+            tile._tile_east = game.get_tile_at(tile.x + 1, tile.y)
+            tile._tile_south = game.get_tile_at(tile.x, tile.y + 1)
+            tile._tile_west = game.get_tile_at(tile.x - 1, tile.y)
+
+    def _create_map(self):
+        game = self.game
+        width, height = game.map_width, game.map_height
+        players = game.players
+        tile = self._tile
+        sides = ([], [])
+
+        # cover a whole side in grass tiles
+        for x in _steps(0, width / 2 - 1.5):
+            for y in range(height):
+                self._set(tile(x, y), 'is_grass', True)
+                sides[0].append(tile(x, y))
+
+        # cover the middle stripe in river tiles
+        for x in _steps(width / 2 - 1.5, width / 2 + 1.5):
+            for y in range(height):
+                self._set(tile(x, y), 'is_river', True)
+                self._set(tile(x, y), 'is_grass', False)
+
+        # the paths going around the map
+        for x in _steps(0, width / 2):
+            for y in range(height):
+                if ((y == height - 6 and x > 5) or (y == height - 7 and x > 5)
+                        or (y == 6 and x > 15) or (y == 5 and x > 15)
+                        or (4 < y < height - 5 and x == 5)
+                        or (4 < y < height - 5 and x == 6)):
+                    self._set(tile(x, y), 'is_path', True)
+                    self._set(tile(x, y), 'is_grass', False)
+
+        # the extra paths around the castle
+        for y in (7, 6, 5):
+            self._set(tile(7, y), 'is_path', True)
+            self._set(tile(7, y), 'is_grass', False)
+
+        self._set(tile(6, 6), 'is_castle', True)
+        self._set(tile(6, 6), 'is_path', False)
+        self._set(tile(6, 6), 'owner', players[0])
+
+        for x in _steps(15, 16, inclusive=True):
+            for y in _steps(height - 16, height - 15, inclusive=True):
+                self._set(tile(x, y), 'is_gold_mine', True)
+
+        self._set(tile(8, 9), 'is_worker_spawn', True)
+        self._set(tile(8, 9), 'owner', players[0])
+        self._set(tile(15, 6), 'is_unit_spawn', True)
+        self._set(tile(15, 6), 'is_grass', False)
+        self._set(tile(11, 6), 'owner', players[0])
+
+        # mirror it for the other side, flipping both x and y
+        for x in _steps(0, width / 2):
+            for y in range(height):
+                mirrored = tile(width - x - 1, height - y - 1)
+                sides[1].append(mirrored)
+                for name in ('is_grass', 'is_path', 'is_gold_mine', 'is_castle', 'is_worker_spawn', 'is_unit_spawn'):
+                    if getattr(tile(x, y), name):
+                        self._set(mirrored, name, True)
+
+        # the island, a square of grass in a square of river, the "lake"
+        for x in _steps(width / 2 - 2.5, width / 2 + 1.5, inclusive=True):
+            for y in _steps(height / 2 - 2, height / 2 + 2, inclusive=True):
+                self._set(tile(x, y), 'is_river', True)
+                self._set(tile(x, y), 'is_grass', False)
+        for x in _steps(width / 2 - 1.5, width / 2 + 0.5, inclusive=True):
+            for y in _steps(height / 2 - 1, height / 2 + 2):
+                self._set(tile(x, y), 'is_grass', True)
+                self._set(tile(x, y), 'is_river', False)
+        for x in (width / 2 - 2.5, width / 2 + 1.5):
+            self._set(tile(x, height / 2), 'is_grass', True)
+            self._set(tile(x, height / 2), 'is_river', False)
+        for x in _steps(width / 2 - 0.5, width / 2 - 0.5, inclusive=True):
+            for y in _steps(height / 2 - 1, height / 2 + 2):
+                self._set(tile(x, y), 'is_island_gold_mine', True)
+
+        # the sides' owners
+        for player, xs in ((players[0], _steps(0, width / 2 - 0.5)), (players[1], _steps(width / 2 + 0.5, width))):
+            for x in xs:
+                for y in range(height):
+                    owned = tile(x, y)
+                    if (owned.is_grass or owned.is_gold_mine or owned.is_castle
+                            or owned.is_worker_spawn or owned.is_unit_spawn):
+                        self._set(owned, 'owner', player)
+
+        for player, side in zip(players, sides):
+            self._set(player, 'side', side)
+
+        # the castles
+        castle = game.tower_jobs[0]
+        for x in range(width):
+            for y in range(height):
+                owned = tile(x, y)
+                if owned.is_castle and owned.owner in players:
+                    self._create_tower(owned.owner, owned, castle)
+                    self._set(owned, 'is_castle', True)
+
+    # gets a tile for making the map, which must exist
+    def _tile(self, x, y):
+        game = self.game
+        if x != int(x) or not (0 <= x < game.map_width and 0 <= y < game.map_height) or y != int(y):
+            raise ValueError('Cannot get a tile for map generation at ({}, {})'.format(x, y))
+
+        return game.tiles[int(x) + int(y) * game.map_width]
+
+    # the turns
+
+    def _run_current_turn(self):
+        game = self.game
+        self._before_turn()
+        self._flush()
+
+        index = game.players.index(game.current_player)
+        self._invalid = [0] * len(self._invalid)
+        self._start_ticking()
+        done = self._call(index, self._clients[index][1].run_turn)
+        if self._pause_ticking() or self._over or not done:
+            return  # the same player runs their turn again
+
+        self._after_turn()
+        if game.current_turn + 1 >= game.max_turns:
+            self._secondary_win_conditions('Max turns reached ({})'.format(game.max_turns))
+        elif self._primary_win_conditions_check() or self._over:
+            self._end_game()
+        else:
+            self._set(game, 'current_turn', game.current_turn + 1)
+            next_player = game.players[(index + 1) % len(game.players)]
+            self._set(game, 'current_player', next_player)
+            self._set(next_player, 'time_remaining', next_player.time_remaining + game.time_added_per_turn)
+
+    def _before_turn(self):
+        game = self.game
+        for unit in game.units:
+            if not unit.owner or unit.owner is game.current_player:
+                self._set(unit, 'acted', False)
+                self._set(unit, 'moves', unit.job.moves)
+
+            if unit.tile and unit.tile.owner is unit.owner and unit.health > unit.job.health:
+                self._set(unit, 'health', unit.job.health)
+
+        # the river phases, clearing out the island gold mine every 15 turns
+        if game.current_turn % 15 == 0:
+            for unit in game.units:
+                if unit.tile and unit.tile.is_island_gold_mine:
+                    self._set(unit.tile, 'unit', None)
+                    self._set(unit, 'tile', None)
+                    self._set(unit, 'health', 0)
+
+        self._update_units()
+
+    def _after_turn(self):
+        self._update_units()
+        self._update_towers()
+        for unit in self.game.current_player.units:
+            self._set(unit, 'acted', False)
+            self._set(unit, 'moves', unit.job.moves)
+            if unit.health > unit.job.health:
+                self._set(unit, 'health', unit.job.health)
+
+        for tower in self.game.current_player.towers:
+            if tower.cooldown > 0:
+                self._set(tower, 'cooldown', tower.cooldown - 1)
+
+    def _update_units(self):
+        game = self.game
+        dead = [unit for unit in game.units if not unit.tile or unit.health <= 0]
+        if not dead:
+            return
+
+        dead_set = set(dead)
+        for player in game.players:
+            self._set(player, 'units', [unit for unit in player.units if unit not in dead_set])
+        self._set(game, 'units', [unit for unit in game.units if unit not in dead_set])
+
+        for unit in dead:
+            tile = unit.tile
+            if tile:
+                title = unit.job.title
+                if title == 'zombie':
+                    self._set(tile, 'num_zombies', tile.num_zombies - 1)
+                else:
+                    self._set(tile, 'corpses', tile.corpses + 1)
+                if title == 'ghoul':
+                    self._set(tile, 'num_ghouls', tile.num_ghouls - 1)
+                if title == 'hound':
+                    self._set(tile, 'num_hounds', tile.num_hounds - 1)
+                self._set(tile, 'unit', None)
+                self._set(unit, 'tile', None)
+
+    def _update_towers(self):
+        game = self.game
+        dead = [tower for tower in game.towers if not tower.tile or tower.health <= 0]
+        if not dead:
+            return
+
+        dead_set = set(dead)
+        for player in game.players:
+            self._set(player, 'towers', [tower for tower in player.towers if tower not in dead_set])
+        self._set(game, 'towers', [tower for tower in game.towers if tower not in dead_set])
+
+        for tower in dead:
+            if tower.tile:
+                self._set(tower.tile, 'tower', None)
+
+    # winning and losing
+
+    def _primary_win_conditions_check(self):
+        players = self.game.players
+        standing = [bool(player.towers) and player.towers[0].job.title == 'castle' for player in players]
+        if not standing[0] and not standing[1]:
+            self._secondary_win_conditions('Both castles fell at the same time.')
+            return False
+
+        for winner in (0, 1):
+            if standing[winner] and not standing[1 - winner]:
+                self._declare_winner('You defeated the enemy Necromancer!', players[winner])
+                self._declare_loser('The enemy Necromancer has bested you!', players[1 - winner])
+                return True
+
+        return False
+
+    def _secondary_win_conditions(self, reason):
+        # the health of the castle, or what the server reads as it, where it
+        # would crash as neither player has a tower left
+        healths = [player.towers[0].health if player.towers else 0 for player in self.game.players]
+        for winner in (0, 1):
+            if healths[winner] > healths[1 - winner]:
+                self._declare_winner('{}: You had higher castle health!'.format(reason), self.game.players[winner])
+                self._declare_loser("{}: Your opponent's castle had higher health!".format(reason), self.game.players[1 - winner])
+
+        self._coin_flip('{}, Identical AIs played the game'.format(reason))
+
+    def _coin_flip(self, reason):
+        players = [player for player in self.game.players if not player.won and not player.lost]
+        if players:
+            if len(players) == len(self.game.players):
+                winner = players.pop(self.random.randrange(len(players)))
+                self._declare_winner('{} - Won via coin flip.'.format(reason), winner)
+
+            for player in players:
+                self._declare_loser('{} - Lost via coin flip.'.format(reason), player)
+
+        self._end_game()
+
+    def _declare_winner(self, reason, winner):
+        self._set(winner, 'lost', False)
+        self._set(winner, 'reason_lost', '')
+        self._set(winner, 'won', True)
+        self._set(winner, 'reason_won', reason)
+        for player in self.game.players:
+            if not player.won and not player.lost:
+                self._declare_loser('Other player won', player)
+
+    def _declare_loser(self, reason, loser):
+        self._set(loser, 'lost', True)
+        self._set(loser, 'reason_lost', reason)
+        self._set(loser, 'won', False)
+        self._set(loser, 'reason_won', '')
+
+    def _end_game(self, reason='Draw'):
+        if not self._over:
+            for player in self.game.players:
+                if not player.won and not player.lost:
+                    self._declare_loser(reason, player)
+            self._over = True
+
+    # the AI's player loses when its client would be disconnected, as its
+    # code errored or it ran out of time
+    def _disconnected(self, index, reason_won):
+        if self._over:
+            return
+
+        self._declare_loser('Disconnected during gameplay.', self.game.players[index])
+        playing = [player for player in self.game.players if not player.lost]
+        if len(playing) == 1:
+            self._declare_winner(reason_won, playing[0])
+            self._end_game()
+
+    # counts an invalid command an AI ran, disconnecting its player once it
+    # has run more this turn than max_invalid, as it is most likely stuck
+    # trying the same ones over and over
+    def _ran_invalid(self, index):
+        self._invalid[index] += 1
+        if self.max_invalid is None or self._invalid[index] <= self.max_invalid:
+            return
+
+        self.errors[index] = 'Ran more than {} invalid commands in one turn.\n'.format(self.max_invalid)
+        sys.stderr.write(self.errors[index])
+        self._disconnected(index, 'All other players disconnected.')
+        raise _TimedOut()
+
+    # calls a function of an AI, the way its client would
+    def _call(self, index, function, *args):
+        playing = self._playing
+        self._playing = index
+        try:
+            return function(*args)
+        except _TimedOut:
+            pass  # already lost
+        except Exception:
+            self.errors[index] = traceback.format_exc()
+            sys.stderr.write(self.errors[index])
+            self._disconnected(index, 'All other players disconnected.')
+        finally:
+            self._playing = playing
+
+    # starts the clock of the player whose turn it is, as the server does
+    # while it waits on them
+    def _start_ticking(self):
+        self._ticking = time.perf_counter_ns()
+
+    # stops the clock, taking the time since it started from the player's,
+    # returning True if that ran out, which times them out
+    def _pause_ticking(self):
+        if self._ticking is None:
+            return False
+
+        player = self.game.current_player
+        self._set(player, 'time_remaining', player.time_remaining - (time.perf_counter_ns() - self._ticking))
+        self._ticking = None
+        if player.time_remaining > 0:
+            return False
+
+        self._disconnected(self.game.players.index(player), 'All other players timed out.')
+        return True
+
+    # the rules of each function AIs can run, the name of the method
+    # checking and running it by game object and function name
+
+    _rules = {
+        ('GameObject', 'log'): '_game_object_log',
+        ('Tile', 'res'): '_tile_res',
+        ('Tile', 'spawnUnit'): '_tile_spawn_unit',
+        ('Tile', 'spawnWorker'): '_tile_spawn_worker',
+        ('Tower', 'attack'): '_tower_attack',
+        ('Unit', 'attack'): '_unit_attack',
+        ('Unit', 'build'): '_unit_build',
+        ('Unit', 'fish'): '_unit_fish',
+        ('Unit', 'mine'): '_unit_mine',
+        ('Unit', 'move'): '_unit_move'
+    }
+
+    def _game_object_log(self, player, game_object, message):
+        self._set(game_object, 'logs', game_object.logs + [message])
+
+    def _unit_attack(self, player, unit, tile):
+        self._check_unit(player, unit)
+        if not tile:
+            raise _Invalid("{} is trying to attack a tile that doesn't exist".format(unit))
+        if unit.tile not in (tile.tile_east, tile.tile_south, tile.tile_west, tile.tile_north):
+            raise _Invalid('{} is trying to attack {}, which is too far away.'.format(unit, tile))
+        if not tile.tower:
+            raise _Invalid("{} is attacking {}, which doesn't have a tower.".format(unit, tile))
+        if tile.tower.owner is player:
+            raise _Invalid('{} is trying to attack the allied tower: {} on tile {}'.format(unit, tile.tower, tile))
+
+        self._set(tile.tower, 'health', tile.tower.health - unit.job.damage)
+        self._set(unit, 'acted', True)
+        return True
+
+    def _unit_build(self, player, unit, title):
+        if title not in _tower_indexes:
+            raise _Invalid('Invalid tower type!')
+        self._check_unit(player, unit)
+        job = self.game.tower_jobs[_tower_indexes[title]]
+        if player.gold < job.gold_cost or player.mana < job.mana_cost:
+            raise _Invalid("You don't have enough gold or mana to build this tower.")
+        for name, message in (('is_gold_mine', 'You can not build on a gold mine.'),
+                              ('is_island_gold_mine', 'You can not build on the island.'),
+                              ('is_path', 'You can not build on the path.'),
+                              ('is_river', 'You can not build on the river.'),
+                              ('is_tower', 'You can not build on top another tower.'),
+                              ('is_wall', 'You can not build on a wall.')):
+            if getattr(unit.tile, name):
+                raise _Invalid(message)
+
+        self._create_tower(player, unit.tile, job)
+        self._set(player, 'gold', player.gold - job.gold_cost)
+        self._set(player, 'mana', player.mana - job.mana_cost)
+        return True
+
+    def _unit_fish(self, player, unit, tile):
+        self._check_owner(player, unit)
+        if unit.acted:
+            raise _Invalid('{} has already acted this turn.'.format(unit))
+        if not unit.tile:
+            raise _Invalid('{} is not on a tile! Could they be behind you..?'.format(unit))
+        if not any(neighbor.is_river for neighbor in unit.tile.neighbors):
+            raise _Invalid('{} is not near any river tiles!'.format(unit))
+        if not tile:
+            raise _Invalid('Target tile does not exist.')
+        if not tile.is_river:
+            raise _Invalid('{} unit is trying to fish on land.'.format(unit))
+        if unit.job.title != 'worker':
+            raise _Invalid('{} must be a worker.'.format(unit))
+
+        self._set(unit, 'acted', True)
+        self._set(player, 'mana', player.mana + self.game.mana_income_per_unit)
+        return True
+
+    def _unit_mine(self, player, unit, tile):
+        self._check_owner(player, unit)
+        if unit.acted:
+            raise _Invalid('{} has already acted this turn.'.format(unit))
+        if not unit.tile:
+            raise _Invalid('{} is not on a tile! Could they be behind you..?'.format(unit))
+        if tile is not unit.tile:
+            raise _Invalid('{} must be standing in the gold mine!'.format(unit))
+        if not tile.is_gold_mine and not tile.is_island_gold_mine:
+            raise _Invalid('{} must be a gold mine!'.format(tile))
+        if not tile.unit:
+            raise _Invalid('You are not on the target tile!')
+        if tile.unit.owner is not player:
+            raise _Invalid("You are trying to mine where another player's unit is!")
+        if unit.job.title != 'worker':
+            raise _Invalid('{} must be a worker to mine!'.format(unit))
+
+        if tile.is_island_gold_mine:
+            gold = self.game.island_income_per_unit
+        else:
+            gold = self.game.gold_income_per_unit
+        self._set(player, 'gold', player.gold + gold)
+        self._set(unit, 'acted', True)
+        return True
+
+    def _unit_move(self, player, unit, tile):
+        title = unit.job.title
+        # as the server's, only workers have to be your own, and any tile
+        # can be moved to, not only those next to the unit
+        if title == 'worker' and unit.owner is not player:
+            raise _Invalid("{} isn't owned by you.".format(unit))
+        if unit.acted:
+            raise _Invalid('{} has already acted this turn.'.format(unit))
+        if not unit.tile:
+            raise _Invalid('{} is not on a tile! Could they be behind you..?'.format(unit))
+        if not tile:
+            raise _Invalid('{}, unit cannot plane shift, tile does not exist in this plane.'.format(unit))
+        if unit.moves <= 0:
+            raise _Invalid('{} has no more moves and might fall apart!'.format(unit))
+        if not tile.is_path and title != 'worker':
+            raise _Invalid('{}, going off the path is dangerous!'.format(unit))
+        if tile.is_path and title == 'worker':
+            raise _Invalid('{}, workers are not allowed on the path!'.format(unit))
+        if tile.is_river:
+            raise _Invalid('{} cannot swim.'.format(unit))
+        if tile.unit:
+            if tile.unit.job is not unit.job:
+                raise _Invalid('{} is not allowed to walk on {}!'.format(unit, tile.unit))
+
+            unit_jobs = self.game.unit_jobs
+            if ((title == 'zombie' and tile.num_zombies >= unit_jobs[1].per_tile)
+                    or (title == 'hound' and tile.num_hounds >= unit_jobs[4].per_tile)
+                    or (title == 'ghoul' and tile.num_ghouls >= unit_jobs[2].per_tile)):
+                raise _Invalid('{} cannot walk on a fully occupied tile!'.format(unit))
+            if title in ('worker', 'abomination', 'horseman', 'wraith'):
+                raise _Invalid('{} cannot walk on an occupied tile!'.format(unit))
+        if tile.is_tower:
+            raise _Invalid('{} cannot hide in the tower.'.format(unit))
+        if tile.is_wall:
+            raise _Invalid('{} cannot move through, under, over or around walls..we are sorry.'.format(unit))
+
+        counter = {'ghoul': 'num_ghouls', 'hound': 'num_hounds', 'zombie': 'num_zombies'}.get(title)
+        if counter:
+            self._set(tile, counter, getattr(tile, counter) + 1)
+            self._set(unit.tile, counter, getattr(unit.tile, counter) - 1)
+
+        replacement = None
+        for other in player.units:
+            if other is not unit and other.tile is unit.tile:
+                replacement = other
+        self._set(unit.tile, 'unit', replacement)
+        self._set(unit, 'tile', tile)
+        self._set(tile, 'unit', unit)
+        self._set(unit, 'moves', unit.moves - 1)
+        return True
+
+    def _tile_res(self, player, tile, num):
+        if tile.corpses < num:
+            raise _Invalid("{} doesn't have {} corpses, it only has {}!".format(tile, num, tile.corpses))
+        if num <= 0:
+            raise _Invalid('Why are you trying to resurrect {} corpses?!'.format(num))
+        zombie = self.game.unit_jobs[1]
+        cost = num * zombie.mana_cost
+        if player.mana < cost:
+            raise _Invalid('You do not have enough mana to resurrect {} corpses!'.format(num))
+        spawn = self._unit_spawns.get(player)
+        if not spawn:
+            raise _Invalid('You do not have a unit spawn tile. This is probably a bug.')
+        # as the server's, this looks at the tile of the corpses, not the
+        # unit spawn tile
+        if max(tile.num_ghouls, tile.num_hounds) > 0 or (tile.unit and tile.unit.job.title != 'zombie'):
+            raise _Invalid('Your unit spawn tile is already occupied by another unit!')
+        if spawn.num_zombies + num > zombie.per_tile:
+            raise _Invalid('Your spawn tile cannot fit an additional {} zombies!'.format(num))
+
+        self._set(player, 'mana', player.mana - cost)
+        for i in range(num):
+            unit = self._create_unit(player, spawn, zombie)
+            if not spawn.unit:
+                self._set(spawn, 'unit', unit)
+        self._set(spawn, 'num_zombies', spawn.num_zombies + num)
+        self._set(tile, 'corpses', tile.corpses - num)
+        return True
+
+    def _tile_spawn_unit(self, player, tile, title):
+        if title not in _unit_indexes:
+            raise _Invalid('Invalid unit type!')
+        job = self.game.unit_jobs[_unit_indexes[title]]
+        if player.gold < job.gold_cost or player.mana < job.mana_cost:
+            raise _Invalid('You cannot afford to spawn this unit.')
+        if not tile.is_unit_spawn:
+            raise _Invalid('This tile cannot spawn units!')
+        if tile.unit:
+            on_tile = tile.unit.job.title
+            if on_tile in ('zombie', 'horseman', 'abomination', 'wraith') or on_tile != title:
+                raise _Invalid('You cannot fit another unit on this tile!')
+            if on_tile == 'ghoul' and tile.num_ghouls >= self.game.unit_jobs[2].per_tile:
+                raise _Invalid('The maximum number of ghouls are already on this tile!')
+            if on_tile == 'hound' and tile.num_hounds >= self.game.unit_jobs[4].per_tile:
+                raise _Invalid('The maximum number of hounds are already on this tile!')
+
+        self._set(player, 'gold', player.gold - job.gold_cost)
+        self._set(player, 'mana', player.mana - job.mana_cost)
+        unit = self._create_unit(player, tile, job)
+        if tile.unit:
+            if tile.num_ghouls != 0:
+                self._set(tile, 'num_ghouls', tile.num_ghouls + 1)
+            else:
+                self._set(tile, 'num_hounds', tile.num_hounds + 1)
+        else:
+            self._set(tile, 'unit', unit)
+            if title == 'hound':
+                self._set(tile, 'num_hounds', 1)
+            elif title == 'ghoul':
+                self._set(tile, 'num_ghouls', 1)
+        return True
+
+    def _tile_spawn_worker(self, player, tile):
+        job = self.game.unit_jobs[0]
+        if player.gold < job.gold_cost or player.mana < job.mana_cost:
+            raise _Invalid('You cannot afford to spawn a worker.')
+        if not tile.is_worker_spawn:
+            raise _Invalid('This tile cannot spawn workers!')
+        if tile.unit:
+            raise _Invalid('You cannot fit another worker on this tile!')
+
+        self._set(player, 'gold', player.gold - job.gold_cost)
+        self._set(player, 'mana', player.mana - job.mana_cost)
+        self._set(tile, 'unit', self._create_unit(player, tile, job))
+        return True
+
+    def _tower_attack(self, player, tower, tile):
+        # as the server's, the tower does not have to be your own
+        if tower.attacked:
+            raise _Invalid('{}, cannot attack becuase has already attacked this turn'.format(tower))
+        if not tile:
+            raise _Invalid("{}, cannot attack a tile that doesn't exist!".format(tower))
+        if tile.unit and tile.unit.owner is player:
+            raise _Invalid('{}, cannot attack allied units!'.format(tower))
+        if tower.cooldown > 0:
+            raise _Invalid('{} is not ready to attack yet!'.format(tower))
+        if not tile.unit:
+            raise _Invalid('{}, cannot attack a tile with no units!'.format(tower))
+        target = tile.unit.job.title
+        if target == 'worker':
+            raise _Invalid('Towers may not attack workers!')
+        if tower.job.title == 'cleansing':
+            if target != 'wraith' and target != 'abomination':
+                raise _Invalid('Cleansing towers can only attack wraiths and abominations!')
+        elif target == 'wraith':
+            raise _Invalid('{} cannot attack wraiths! They are incorporeal!'.format(tower))
+        if tower.health <= 0:
+            raise _Invalid('{}, cannot attack because it has been destroyed!'.format(tower))
+        if not tower.tile:
+            raise _Invalid('{} is not on a tile!'.format(tower))
+        if math.hypot(tower.tile.x - tile.x, tower.tile.y - tile.y) > _tower_range:
+            raise _Invalid('{}, cannot attack because target tile is out of range'.format(tower))
+
+        self._set(tower, 'cooldown', tower.job.turns_between_attacks)
+        damage = tower.job.damage
+        if tower.job.title in ('aoe', 'castle'):
+            targets = [unit for unit in self.game.units if unit.tile is tile]
+        else:
+            targets = [tile.unit]
+        for unit in targets:
+            self._set(unit, 'health', max(0, unit.health - damage))
+        return True
+
+    # the checks before a unit attacks or builds
+    def _check_unit(self, player, unit):
+        self._check_owner(player, unit)
+        if unit.acted:
+            raise _Invalid('{} has already acted this turn.'.format(unit))
+        if unit.health <= 0:
+            raise _Invalid('{} is dead, for now.'.format(unit))
+        if not unit.tile:
+            raise _Invalid('{} is not on a tile.'.format(unit))
+
+    def _check_owner(self, player, unit):
+        if unit.owner is not player or unit.owner is None:
+            raise _Invalid("{} isn't owned by you.".format(unit))
+
+    # changing the game
+
+    def _create(self, game_object_name, **fields):
+        game_object = self.game._game_object_classes[game_object_name]()
+        game_object._id = str(self._next_id)
+        game_object._game_object_name = game_object_name
+        self._next_id += 1
+        for name, value in fields.items():
+            setattr(game_object, '_' + name, value)
+
+        self.game._game_objects[game_object.id] = game_object
+        self._created.append(game_object)
+        return game_object
+
+    def _create_unit(self, player, tile, job):
+        unit = self._create('Unit', acted=False, health=job.health, owner=player, tile=tile, job=job, moves=job.moves)
+        self._set(self.game, 'units', self.game.units + [unit])
+        self._set(player, 'units', player.units + [unit])
+        return unit
+
+    def _create_tower(self, player, tile, job):
+        tower = self._create('Tower', attacked=False, health=job.health, owner=player, tile=tile, job=job)
+        self._set(tile, 'tower', tower)
+        self._set(self.game, 'towers', self.game.towers + [tower])
+        self._set(player, 'towers', player.towers + [tower])
+        self._set(tile, 'is_tower', True)
+        return tower
+
+    # sets a field of the game or a game object, to be sent in the next delta
+    def _set(self, state, name, value):
+        attribute = '_' + name
+        if getattr(state, attribute) == value:
+            return  # as the server only sends what changed
+
+        setattr(state, attribute, value)
+        names = self._dirty.get(state)
+        if names is None:
+            names = self._dirty[state] = set()
+        names.add(name)
+
+    # sends each AI a delta of what changed, as the server does before it
+    # sends them anything else
+    def _flush(self):
+        if not self._created and not self._dirty:
+            return
+
+        delta = {}
+        game_objects = {}
+        for game_object in self._created:
+            game_objects[game_object.id] = {
+                _key(name): _encode(getattr(game_object, name))
+                for name in _field_names(game_object.__class__)
+            }
+
+        for state, names in self._dirty.items():
+            encoded = {_key(name): _encode(getattr(state, name)) for name in names}
+            if state is self.game:
+                delta.update(encoded)
+            else:
+                game_objects.setdefault(state.id, {}).update(encoded)
+
+        if game_objects:
+            delta['gameObjects'] = game_objects
+        self._created = []
+        self._dirty = {}
+
+        for index, (game, ai, manager) in enumerate(self._clients):
+            manager.apply_delta_state(delta)
+            if ai.player:
+                self._call(index, ai.game_updated)
+
+
+# the values of a loop the way the server writes them, e.g. for (let x =
+# start; x < stop; x++), where start and stop may be halves
+def _steps(start, stop, inclusive=False):
+    while start < stop or (inclusive and start == stop):
+        yield start
+        start += 1
+
+
+# the names of the fields of a class the server sends, e.g. 'num_zombies'
+def _field_names(cls):
+    names = _field_names_by_class.get(cls)
+    if names is None:
+        names = []
+        for klass in cls.__mro__:
+            slots = getattr(klass, '__slots__', ())
+            for name, value in vars(klass).items():
+                if (isinstance(value, property) and name not in names and '_' + name in slots
+                        and '_' + name not in cls._cached_from):
+                    names.append(name)
+        _field_names_by_class[cls] = names
+
+    return names
+
+
+# the server's key for a field, e.g. 'numZombies' for 'num_zombies'
+def _key(name):
+    key = _keys.get(name)
+    if key is None:
+        parts = name.split('_')
+        key = _keys[name] = parts[0] + ''.join(part.capitalize() for part in parts[1:])
+
+    return key
+
+
+# a value as the server sends it in a delta
+def _encode(value):
+    if isinstance(value, BaseGameObject):
+        return {'id': value.id}
+
+    if isinstance(value, list):
+        encoded = {str(i): _encode(item) for i, item in enumerate(value)}
+        encoded[_constants['DELTA_LIST_LENGTH']] = len(value)
+        return encoded
+
+    return value
@@ -16,6 +16,19 @@ class tJob(GameObject):
     Information about a tower's job/type.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_all_units',
+        '_damage',
+        '_gold_cost',
+        '_health',
+        '_mana_cost',
+        '_range',
+        '_title',
+        '_turns_between_attacks',
+    )
+
     def __init__(self):
         """Initializes a tJob with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
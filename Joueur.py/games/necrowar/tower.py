@@ -16,6 +16,17 @@ class Tower(GameObject):
     A tower in the game. Used to combat enemy waves.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_attacked',
+        '_cooldown',
+        '_health',
+        '_job',
+        '_owner',
+        '_tile',
+    )
+
     def __init__(self):
         """Initializes a Tower with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
@@ -16,6 +16,19 @@ class uJob(GameObject):
     Information about a unit's job/type.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_damage',
+        '_gold_cost',
+        '_health',
+        '_mana_cost',
+        '_moves',
+        '_per_tile',
+        '_range',
+        '_title',
+    )
+
     def __init__(self):
         """Initializes a uJob with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
@@ -16,6 +16,17 @@ class Unit(GameObject):
     A unit in the game. May be a worker, zombie, ghoul, hound, abomination, wraith or horseman.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_acted',
+        '_health',
+        '_job',
+        '_moves',
+        '_owner',
+        '_tile',
+    )
+
     def __init__(self):
         """Initializes a Unit with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
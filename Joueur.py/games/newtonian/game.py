@@ -24,6 +24,36 @@ class Game(BaseGame):
     Combine elements and be the first scientists to create fusion.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_current_player',
+        '_current_turn',
+        '_game_objects',
+        '_intern_cap',
+        '_jobs',
+        '_machines',
+        '_manager_cap',
+        '_map_height',
+        '_map_width',
+        '_material_spawn',
+        '_max_turns',
+        '_physicist_cap',
+        '_players',
+        '_refined_value',
+        '_regenerate_rate',
+        '_session',
+        '_spawn_time',
+        '_stun_time',
+        '_tiles',
+        '_time_added_per_turn',
+        '_time_immune',
+        '_units',
+        '_victory_amount',
+        'name',
+        '_game_object_classes',
+    )
+
     def __init__(self):
         """Initializes a Game with basic logic as provided by the Creer code generator."""
         BaseGame.__init__(self)
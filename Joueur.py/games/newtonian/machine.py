@@ -16,6 +16,17 @@ class Machine(GameObject):
     A machine in the game. Used to refine ore.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_ore_type',
+        '_refine_input',
+        '_refine_output',
+        '_refine_time',
+        '_tile',
+        '_worked',
+    )
+
     def __init__(self):
         """Initializes a Machine with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
@@ -16,6 +16,23 @@ class Unit(GameObject):
     A unit in the game. May be a manager, intern, or physicist.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_acted',
+        '_blueium',
+        '_blueium_ore',
+        '_health',
+        '_job',
+        '_moves',
+        '_owner',
+        '_redium',
+        '_redium_ore',
+        '_stun_immune',
+        '_stun_time',
+        '_tile',
+    )
+
     def __init__(self):
         """Initializes a Unit with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
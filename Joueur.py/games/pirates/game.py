@@ -23,6 +23,41 @@ class Game(BaseGame):
     Steal from merchants and become the most infamous pirate.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_bury_interest_rate',
+        '_crew_cost',
+        '_crew_damage',
+        '_crew_health',
+        '_crew_moves',
+        '_crew_range',
+        '_current_player',
+        '_current_turn',
+        '_game_objects',
+        '_heal_factor',
+        '_map_height',
+        '_map_width',
+        '_max_turns',
+        '_merchant_gold_rate',
+        '_merchant_interest_rate',
+        '_min_interest_distance',
+        '_players',
+        '_ports',
+        '_rest_range',
+        '_session',
+        '_ship_cost',
+        '_ship_damage',
+        '_ship_health',
+        '_ship_moves',
+        '_ship_range',
+        '_tiles',
+        '_time_added_per_turn',
+        '_units',
+        'name',
+        '_game_object_classes',
+    )
+
     def __init__(self):
         """Initializes a Game with basic logic as provided by the Creer code generator."""
         BaseGame.__init__(self)
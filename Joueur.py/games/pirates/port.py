@@ -16,6 +16,15 @@ class Port(GameObject):
     A port on a Tile.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_gold',
+        '_investment',
+        '_owner',
+        '_tile',
+    )
+
     def __init__(self):
         """Initializes a Port with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
@@ -16,6 +16,22 @@ class Unit(GameObject):
     A unit group in the game. This may consist of a ship and any number of crew.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_acted',
+        '_crew',
+        '_crew_health',
+        '_gold',
+        '_moves',
+        '_owner',
+        '_path',
+        '_ship_health',
+        '_stun_turns',
+        '_target_port',
+        '_tile',
+    )
+
     def __init__(self):
         """Initializes a Unit with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
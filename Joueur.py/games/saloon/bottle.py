@@ -16,6 +16,15 @@ class Bottle(GameObject):
     A bottle thrown by a bartender at a Tile.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_direction',
+        '_drunk_direction',
+        '_is_destroyed',
+        '_tile',
+    )
+
     def __init__(self):
         """Initializes a Bottle with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
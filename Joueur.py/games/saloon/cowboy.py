@@ -16,6 +16,22 @@ class Cowboy(GameObject):
     A person on the map that can move around and interact within the saloon.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_can_move',
+        '_drunk_direction',
+        '_focus',
+        '_health',
+        '_is_dead',
+        '_is_drunk',
+        '_job',
+        '_owner',
+        '_tile',
+        '_tolerance',
+        '_turns_busy',
+    )
+
     def __init__(self):
         """Initializes a Cowboy with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
@@ -16,6 +16,16 @@ class Furnishing(GameObject):
     An furnishing in the Saloon that must be pathed around, or destroyed.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_health',
+        '_is_destroyed',
+        '_is_piano',
+        '_is_playing',
+        '_tile',
+    )
+
     def __init__(self):
         """Initializes a Furnishing with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
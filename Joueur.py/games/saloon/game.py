@@ -25,6 +25,34 @@ class Game(BaseGame):
     Use cowboys to have a good time and play some music on a Piano, while brawling with enemy Cowboys.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_bartender_cooldown',
+        '_bottles',
+        '_brawler_damage',
+        '_cowboys',
+        '_current_player',
+        '_current_turn',
+        '_furnishings',
+        '_game_objects',
+        '_jobs',
+        '_map_height',
+        '_map_width',
+        '_max_cowboys_per_job',
+        '_max_turns',
+        '_players',
+        '_rowdiness_to_siesta',
+        '_session',
+        '_sharpshooter_damage',
+        '_siesta_length',
+        '_tiles',
+        '_time_added_per_turn',
+        '_turns_drunk',
+        'name',
+        '_game_object_classes',
+    )
+
     def __init__(self):
         """Initializes a Game with basic logic as provided by the Creer code generator."""
         BaseGame.__init__(self)
@@ -16,6 +16,15 @@ class YoungGun(GameObject):
     An eager young person that wants to join your gang, and will call in the veteran Cowboys you need to win the brawl in the saloon.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_call_in_tile',
+        '_can_call_in',
+        '_owner',
+        '_tile',
+    )
+
     def __init__(self):
         """Initializes a YoungGun with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
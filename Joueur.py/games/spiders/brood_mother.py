@@ -16,6 +16,13 @@ class BroodMother(Spider):
     The Spider Queen. She alone can spawn Spiderlings for each Player, and if she dies the owner loses.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_eggs',
+        '_health',
+    )
+
     def __init__(self):
         """Initializes a BroodMother with basic logic as provided by the Creer code generator."""
         Spider.__init__(self)
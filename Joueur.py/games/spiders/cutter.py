@@ -16,6 +16,12 @@ class Cutter(Spiderling):
     A Spiderling that can cut existing Webs.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_cutting_web',
+    )
+
     def __init__(self):
         """Initializes a Cutter with basic logic as provided by the Creer code generator."""
         Spiderling.__init__(self)
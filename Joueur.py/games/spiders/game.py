@@ -28,6 +28,30 @@ class Game(BaseGame):
     There's an infestation of enemy spiders challenging your queen broodmother spider! Protect her and attack the other broodmother in this turn based, node based, game.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_current_player',
+        '_current_turn',
+        '_cut_speed',
+        '_eggs_scalar',
+        '_game_objects',
+        '_initial_web_strength',
+        '_max_turns',
+        '_max_web_strength',
+        '_movement_speed',
+        '_nests',
+        '_players',
+        '_session',
+        '_spit_speed',
+        '_time_added_per_turn',
+        '_weave_power',
+        '_weave_speed',
+        '_webs',
+        'name',
+        '_game_object_classes',
+    )
+
     def __init__(self):
         """Initializes a Game with basic logic as provided by the Creer code generator."""
         BaseGame.__init__(self)
@@ -16,6 +16,16 @@ class Nest(GameObject):
     A location (node) connected to other Nests via Webs (edges) in the game that Spiders can converge on, regardless of owner.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_controlling_player',
+        '_spiders',
+        '_webs',
+        '_x',
+        '_y',
+    )
+
     def __init__(self):
         """Initializes a Nest with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
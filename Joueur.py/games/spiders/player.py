@@ -16,6 +16,23 @@ class Player(GameObject):
     A player in this game. Every AI controls one player.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_brood_mother',
+        '_client_type',
+        '_lost',
+        '_max_spiderlings',
+        '_name',
+        '_number_of_nests_controlled',
+        '_opponent',
+        '_reason_lost',
+        '_reason_won',
+        '_spiders',
+        '_time_remaining',
+        '_won',
+    )
+
     def __init__(self):
         """Initializes a Player with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
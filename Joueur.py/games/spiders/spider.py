@@ -16,6 +16,14 @@ class Spider(GameObject):
     A Spider in the game. The most basic unit.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_is_dead',
+        '_nest',
+        '_owner',
+    )
+
     def __init__(self):
         """Initializes a Spider with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
@@ -16,6 +16,16 @@ class Spiderling(Spider):
     A Spider spawned by the BroodMother.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_busy',
+        '_moving_on_web',
+        '_moving_to_nest',
+        '_number_of_coworkers',
+        '_work_remaining',
+    )
+
     def __init__(self):
         """Initializes a Spiderling with basic logic as provided by the Creer code generator."""
         Spider.__init__(self)
@@ -16,6 +16,12 @@ class Spitter(Spiderling):
     A Spiderling that creates and spits new Webs from the Nest it is on to another Nest, connecting them.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_spitting_web_to_nest',
+    )
+
     def __init__(self):
         """Initializes a Spitter with basic logic as provided by the Creer code generator."""
         Spiderling.__init__(self)
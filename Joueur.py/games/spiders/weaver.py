@@ -16,6 +16,13 @@ class Weaver(Spiderling):
     A Spiderling that can alter existing Webs by weaving to add or remove silk from the Webs, thus altering its strength.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_strengthening_web',
+        '_weakening_web',
+    )
+
     def __init__(self):
         """Initializes a Weaver with basic logic as provided by the Creer code generator."""
         Spiderling.__init__(self)
@@ -16,6 +16,17 @@ class Web(GameObject):
     A connection (edge) to a Nest (node) in the game that Spiders can converge on (regardless of owner). Spiders can travel in either direction on Webs.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_length',
+        '_load',
+        '_nest_a',
+        '_nest_b',
+        '_spiderlings',
+        '_strength',
+    )
+
     def __init__(self):
         """Initializes a Web with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
@@ -16,6 +16,18 @@ class Body(GameObject):
     A celestial body located within the game.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_amount',
+        '_body_type',
+        '_material_type',
+        '_owner',
+        '_radius',
+        '_x',
+        '_y',
+    )
+
     def __init__(self):
         """Initializes a Body with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
@@ -24,6 +24,46 @@ class Game(BaseGame):
     Collect of the most of the rarest mineral orbiting aroung the sun and outcompete your competetor.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_bodies',
+        '_current_player',
+        '_current_turn',
+        '_dash_cost',
+        '_dash_distance',
+        '_game_objects',
+        '_genarium_value',
+        '_jobs',
+        '_legendarium_value',
+        '_max_asteroid',
+        '_max_turns',
+        '_min_asteroid',
+        '_mining_speed',
+        '_mythicite_amount',
+        '_orbits_protected',
+        '_ore_rarity_genarium',
+        '_ore_rarity_legendarium',
+        '_ore_rarity_rarium',
+        '_planet_energy_cap',
+        '_planet_recharge_rate',
+        '_players',
+        '_projectile_radius',
+        '_projectile_speed',
+        '_projectiles',
+        '_rarium_value',
+        '_regenerate_rate',
+        '_session',
+        '_ship_radius',
+        '_size_x',
+        '_size_y',
+        '_time_added_per_turn',
+        '_turns_to_orbit',
+        '_units',
+        'name',
+        '_game_object_classes',
+    )
+
     def __init__(self):
         """Initializes a Game with basic logic as provided by the Creer code generator."""
         BaseGame.__init__(self)
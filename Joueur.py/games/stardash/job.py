@@ -16,6 +16,19 @@ class Job(GameObject):
     Information about a unit's job.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_carry_limit',
+        '_damage',
+        '_energy',
+        '_moves',
+        '_range',
+        '_shield',
+        '_title',
+        '_unit_cost',
+    )
+
     def __init__(self):
         """Initializes a Job with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
@@ -16,6 +16,24 @@ class Player(GameObject):
     A player in this game. Every AI controls one player.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_client_type',
+        '_home_base',
+        '_lost',
+        '_money',
+        '_name',
+        '_opponent',
+        '_projectiles',
+        '_reason_lost',
+        '_reason_won',
+        '_time_remaining',
+        '_units',
+        '_victory_points',
+        '_won',
+    )
+
     def __init__(self):
         """Initializes a Player with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
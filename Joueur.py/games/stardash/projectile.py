@@ -16,6 +16,17 @@ class Projectile(GameObject):
     Tracks any projectiles moving through space.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_energy',
+        '_fuel',
+        '_owner',
+        '_target',
+        '_x',
+        '_y',
+    )
+
     def __init__(self):
         """Initializes a Projectile with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
@@ -16,6 +16,27 @@ class Unit(GameObject):
     A unit in the game. May be a corvette, missleboat, martyr, transport, miner.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_acted',
+        '_dash_x',
+        '_dash_y',
+        '_energy',
+        '_genarium',
+        '_is_busy',
+        '_job',
+        '_legendarium',
+        '_moves',
+        '_mythicite',
+        '_owner',
+        '_protector',
+        '_rarium',
+        '_shield',
+        '_x',
+        '_y',
+    )
+
     def __init__(self):
         """Initializes a Unit with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
@@ -16,6 +16,21 @@ class Beaver(GameObject):
     A beaver in the game.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_actions',
+        '_branches',
+        '_food',
+        '_health',
+        '_job',
+        '_moves',
+        '_owner',
+        '_recruited',
+        '_tile',
+        '_turns_distracted',
+    )
+
     def __init__(self):
         """Initializes a Beaver with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
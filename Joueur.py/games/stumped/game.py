@@ -24,6 +24,31 @@ class Game(BaseGame):
     Gather branches and build up your lodge as beavers fight to survive.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_beavers',
+        '_current_player',
+        '_current_turn',
+        '_free_beavers_count',
+        '_game_objects',
+        '_jobs',
+        '_lodge_cost_constant',
+        '_lodges_to_win',
+        '_map_height',
+        '_map_width',
+        '_max_turns',
+        '_players',
+        '_session',
+        '_spawner',
+        '_spawner_harvest_constant',
+        '_spawner_types',
+        '_tiles',
+        '_time_added_per_turn',
+        'name',
+        '_game_object_classes',
+    )
+
     def __init__(self):
         """Initializes a Game with basic logic as provided by the Creer code generator."""
         BaseGame.__init__(self)
@@ -16,6 +16,21 @@ class Job(GameObject):
     Information about a beaver's job.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_actions',
+        '_carry_limit',
+        '_chopping',
+        '_cost',
+        '_damage',
+        '_distraction_power',
+        '_health',
+        '_moves',
+        '_munching',
+        '_title',
+    )
+
     def __init__(self):
         """Initializes a Job with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
@@ -16,6 +16,15 @@ class Spawner(GameObject):
     A resource spawner that generates branches or food.
     """
 
+    # only this class's own attributes, its parent classes declare theirs,
+    # so instances have no __dict__
+    __slots__ = (
+        '_has_been_harvested',
+        '_health',
+        '_tile',
+        '_type',
+    )
+
     def __init__(self):
         """Initializes a Spawner with basic logic as provided by the Creer code generator."""
         GameObject.__init__(self)
@@ -0,0 +1,473 @@
+import asyncio
+import inspect
+import sys
+import time
+from collections import deque
+from joueur.serializer import deserialize
+from joueur.transport import SocketTransport
+import joueur.error_code as error_code
+import joueur.ansi_color_coder as color
+
+
+# GameOver: raised into AI code that runs a game function once the game is
+# over, as the server will never reply, instead of handing the AI None to
+# carry on with. The client stops the AI's order with it, as the game ended.
+class GameOver(Exception):
+    pass
+
+
+# PendingRun: the result of a run command sent to the server, which is only
+# known once the server's matching 'ran' event has been handled
+class PendingRun():
+    def __init__(self, wait_until=None):
+        self._wait_until = wait_until
+        self._done = False
+        self._value = None
+
+    def done(self):
+        """Checks if the server has replied to this run command yet.
+
+        Returns:
+            bool: True if result() can return without waiting
+        """
+        return self._done
+
+    def result(self):
+        """Gets the value the server returned for this run command, handling
+        incoming events until its 'ran' event arrives.
+
+        Returns:
+            the deserialized value the game function returned
+
+        Raises:
+            GameOver: if the game ended before the server replied
+        """
+        if not self._done and self._wait_until:
+            self._wait_until(self.done)
+
+        if not self._done:  # waiting only stops early once the game is over
+            raise GameOver('The game ended before the server replied.')
+
+        return self._value
+
+    def __bool__(self):
+        # so `if unit.move(tile):` still works inside a batch
+        return bool(self.result())
+
+    def _resolve(self, value):
+        self._value = value
+        self._done = True
+
+
+# AsyncClient: talks to the server over asyncio, receiving game information
+# and sending commands to execute. Clients perform no game logic.
+# Awaiting the server only blocks the coroutine waiting on it, so an AI can
+# keep computing in other tasks, and several clients can share one loop.
+class AsyncClient():
+    def __init__(self):
+        self.transport = None  # what events are sent and received over
+        self.hostname = None
+        self.port = None
+        self.game = None
+        self.ai = None
+        self.manager = None
+        self.over = False  # if the server said the game is over
+
+        self.events = deque()  # FIFO, in the order the server sent them
+        self.pending_runs = deque()  # run commands awaiting their 'ran'
+
+        self._print_io = False
+        self._reading = False
+        self._progress = None  # set, then replaced, as events come in
+        self._event_counts = {}
+        self._event_seconds = {}
+
+        # the handlers for each event the server can send, by event name
+        self._event_handlers = {
+            'delta': [self._auto_handle_delta],
+            'fatal': [self._auto_handle_fatal],
+            'invalid': [self._auto_handle_invalid],
+            'order': [self._auto_handle_order],
+            'over': [self._auto_handle_over],
+            'ran': [self._auto_handle_ran]
+        }
+
+    async def connect(self, hostname='localhost', port=3000, print_io=False,
+                      recv_buffer=1024, no_delay=True, compress=None):
+        transport = SocketTransport(print_io, recv_buffer)
+        await transport.connect(hostname, port, no_delay, compress)
+        await self.attach(transport, print_io)
+
+    async def attach(self, transport, print_io=False):
+        """Plays over a transport instead of connecting to a server, e.g. a
+        joueur.transport.LoopbackTransport to a responder in this process.
+
+        Args:
+            transport: what to send events to and receive events from, with
+                the methods of joueur.transport.SocketTransport
+            print_io (bool): if the IO stats are printed when the game is over
+        """
+        self.transport = transport
+        self.hostname = transport.hostname
+        self.port = transport.port
+
+        self._print_io = print_io
+        self._progress = asyncio.Event()
+
+    def setup(self, game, ai, manager):
+        self.game = game
+        self.ai = ai
+        self.manager = manager
+
+    def is_over(self):
+        """Checks if the game this client played is over.
+
+        Returns:
+            bool: True once the server's 'over' event was handled
+        """
+        return self.over
+
+    # sends the server an event, buffered until the next flush
+    def send(self, event, data):
+        if self.transport is not None:
+            self.transport.send(event, data)
+
+    async def flush(self):
+        """Writes every buffered frame to the socket in as few syscalls as
+        possible. Done automatically before waiting on the server, so only
+        needed when sending without waiting.
+        """
+        await self.transport.flush()
+
+    def flush_nowait(self):
+        """Writes as much of the buffered frames as the socket will take
+        without blocking, leaving the rest for the next flush.
+        """
+        self.transport.flush_nowait()
+
+    def disconnect(self, exit_code=None):
+        if self.transport is not None:
+            self.transport.close()
+
+    def stats(self):
+        """Gets counters about the IO done this game, to help tune
+        --recvBuffer.
+
+        Returns:
+            dict: the counters by name, bytes_received being the compressed
+            bytes if the server's stream is compressed
+        """
+        counters = self.transport.stats() if self.transport else {}
+        # the time of an event includes the events handled while handling it,
+        # e.g. an 'order' includes the deltas received during that turn
+        counters['events'] = {
+            event: {
+                'count': count,
+                'seconds': self._event_seconds[event]
+            } for event, count in self._event_counts.items()
+        }
+        return counters
+
+    def register_event_handler(self, event, handler):
+        """Registers a function to call with the data of every event of the
+        given type the server sends, after the handlers already registered
+        for it. Use this to handle events the client does not know about, or
+        to observe ones it does (e.g. for metrics or recording).
+
+        Args:
+            event (str): the name of the event, e.g. 'delta'
+            handler (function): called with the event's data, if it returns
+                an awaitable that is awaited before the next handler runs
+        """
+        self._event_handlers.setdefault(event, []).append(handler)
+
+    def unregister_event_handler(self, event, handler):
+        """Removes a handler added via register_event_handler.
+
+        Args:
+            event (str): the name of the event the handler was registered for
+            handler (function): the handler to remove
+        """
+        if handler in self._event_handlers.get(event, ()):
+            self._event_handlers[event].remove(handler)
+
+    def peek_event(self, event):
+        """Looks through the events received but not yet handled for one of
+        the given type, without handling or removing any of them.
+
+        Args:
+            event (str): the name of the event to look for, e.g. 'ran'
+
+        Returns:
+            dict: the first queued event of that type, with its 'event' and
+            'data', or None if none are queued
+        """
+        for sent in self.events:
+            if sent['event'] == event:
+                return sent
+
+        return None
+
+    def send_run(self, caller, function_name, args=None, wait_until=None):
+        """Sends a run command without waiting for the server to reply.
+
+        Args:
+            caller (BaseGameObject): the game object running the function
+            function_name (str): the name of the function, in camelCase
+            args (dict): the arguments to the function, by name
+            wait_until (function): how the PendingRun waits for its reply,
+                given a condition to handle events until
+
+        Returns:
+            PendingRun: resolved once the server's 'ran' reply is handled
+
+        Raises:
+            GameOver: if the game is already over, so nothing can be run
+        """
+        if self.over:
+            raise GameOver('The game is over, so {} can not be run.'.format(
+                function_name))
+
+        self.send('run', {
+            'caller': caller,
+            'functionName': function_name,
+            'args': args
+        })
+
+        pending = PendingRun(wait_until)
+        self.pending_runs.append(pending)
+        return pending
+
+    async def run_on_server(self, caller, function_name, args=None):
+        pending = self.send_run(caller, function_name, args)
+        await self.handle_events_until(pending.done)
+        return pending.result()
+
+    async def play(self):
+        """Handles events until the game is over."""
+        await self.handle_events_until(self.is_over)
+
+    async def wait_for_event(self, event):
+        while not self.over:
+            await self.wait_for_events()
+
+            while len(self.events) > 0:
+                sent = self.events.popleft()
+                data = sent['data'] if 'data' in sent else None
+                if event is not None and sent['event'] == event:
+                    return data
+                else:
+                    await self._auto_handle(sent['event'], data)
+
+    # handles events as they come in until the condition is met, for pending
+    # run commands, whose 'ran' events are auto handled in the order sent
+    async def handle_events_until(self, condition):
+        # nothing more will come once the game is over, e.g. replies to run
+        # commands sent as the AI ran out of time
+        while not condition() and not self.over:
+            await self.wait_for_events(condition)
+
+            while len(self.events) > 0 and not condition():
+                sent = self.events.popleft()
+                await self._auto_handle(sent['event'], sent.get('data'))
+                self._notify_progress()
+
+    # reads from the transport until some events are found, or the condition
+    # (if given) is met by another coroutine handling events
+    async def wait_for_events(self, condition=None):
+        while (len(self.events) == 0 and not self.over and
+               not (condition and condition())):
+            # whatever we are waiting on may be a reply to what we buffered
+            await self.flush()
+
+            if self._reading:
+                # only one coroutine reads at a time, the others wait for it
+                # (or whoever handles its events) to make progress
+                await self._progress.wait()
+                continue
+
+            self._reading = True
+            try:
+                await self._read_events()
+            finally:
+                self._reading = False
+                self._notify_progress()
+
+    def _notify_progress(self):
+        self._progress.set()
+        self._progress = asyncio.Event()
+
+    async def _read_events(self):
+        self.events.extend(await self.transport.receive())
+
+    def read_events_nowait(self):
+        """Reads events from the transport if it can without waiting, as an
+        in-process one can.
+
+        Returns:
+            bool: True if read, False if the transport must be waited on
+        """
+        if self._reading or self.over:
+            return False
+
+        events = self.transport.receive_nowait()
+        if events is None:
+            return False
+
+        self.events.extend(events)
+        return True
+
+    def handlers_for(self, event):
+        """Gets the handlers registered for an event, reporting events the
+        client can not handle.
+
+        Args:
+            event (str): the name of the event
+
+        Returns:
+            list[function]: the handlers to call, in order
+        """
+        handlers = self._event_handlers.get(event)
+
+        if not handlers:
+            error_code.handle_error(
+                error_code.UNKNOWN_EVENT_FROM_SERVER,
+                message='Could not auto handle event "{}".'.format(event))
+
+        return handlers
+
+    def count_event(self, event, start):
+        """Records that an event was handled, for stats().
+
+        Args:
+            event (str): the name of the event handled
+            start (float): the time.perf_counter() when handling started
+        """
+        self._event_counts[event] = self._event_counts.get(event, 0) + 1
+        self._event_seconds[event] = self._event_seconds.get(event, 0) + (
+            time.perf_counter() - start)
+
+    # called via the client run loop when data is sent
+    async def _auto_handle(self, event, data=None):
+        start = time.perf_counter()
+        for handler in self.handlers_for(event):
+            handled = handler(data)
+            if inspect.isawaitable(handled):
+                await handled
+
+        self.count_event(event, start)
+
+    # the built in handlers below call into the AI, and return what the AI
+    # returned when it is awaitable (it was an async def) for the caller to
+    # await, so they work the same for blocking and asyncio AIs
+
+    def _auto_handle_delta(self, data):
+        try:
+            self.manager.apply_delta_state(data)
+        except:
+            error_code.handle_error(error_code.DELTA_MERGE_FAILURE,
+                                    sys.exc_info(), 'Error merging delta')
+
+        if self.ai.player:  # then the AI is ready for updates
+            return self.ai.game_updated()
+
+    def _auto_handle_ran(self, data):
+        if len(self.pending_runs) == 0:
+            error_code.handle_error(
+                error_code.UNKNOWN_EVENT_FROM_SERVER,
+                message='Got a "ran" event without having sent a run command.')
+
+        self.pending_runs.popleft()._resolve(deserialize(data, self.game))
+
+    def _auto_handle_order(self, data):
+        args = deserialize(data['args'], self.game)
+        try:
+            returned = self.ai._do_order(data['name'], args)
+        except GameOver:
+            return  # the game ended during the order, so nothing to finish
+        except:
+            error_code.handle_error(error_code.AI_ERRORED, sys.exc_info(),
+                                    'AI errored executing order "{}"'.format(
+                                        data['name']))
+
+        if inspect.isawaitable(returned):
+            return self._finish_order_async(data, returned)
+
+        self._finish_order(data, returned)
+
+    async def _finish_order_async(self, data, returning):
+        try:
+            returned = await returning
+        except GameOver:
+            return  # the game ended during the order, so nothing to finish
+        except:
+            error_code.handle_error(error_code.AI_ERRORED, sys.exc_info(),
+                                    'AI errored executing order "{}"'.format(
+                                        data['name']))
+
+        self._finish_order(data, returned)
+
+    def _finish_order(self, data, returned):
+        self.send("finished", {
+            'orderIndex': data['index'],
+            'returned': returned
+        })
+        self.flush_nowait()  # the turn is over, nothing left to coalesce
+
+    def _auto_handle_invalid(self, data):
+        try:
+            return self.ai.invalid(data['message'])
+        except:
+            error_code.handle_error(error_code.AI_ERRORED, sys.exc_info(),
+                                    'AI errored while handling invalid data.')
+
+    def _auto_handle_fatal(self, data):
+        error_code.handle_error(
+            error_code.FATAL_EVENT,
+            message='Got a fatal event from the server: ' + data['message']
+        )
+
+    def _auto_handle_over(self, data):
+        won = self.ai.player.won
+        reason = self.ai.player.reason_won \
+            if self.ai.player.won \
+            else self.ai.player.reason_lost
+
+        print('{}Game is Over. {} because {}{}'.format(
+            color.text('green'),
+            'I Won!' if won else 'I Lost :(',
+            reason,
+            color.reset()
+        ))
+
+        try:
+            ending = self.ai.end(won, reason)
+        except:
+            error_code.handle_error(error_code.AI_ERRORED, sys.exc_info(),
+                                    'AI errored during end.')
+
+        if inspect.isawaitable(ending):
+            return self._finish_over_async(data, ending)
+
+        self._finish_over(data)
+
+    async def _finish_over_async(self, data, ending):
+        try:
+            await ending
+        except:
+            error_code.handle_error(error_code.AI_ERRORED, sys.exc_info(),
+                                    'AI errored during end.')
+
+        self._finish_over(data)
+
+    def _finish_over(self, data):
+        if 'message' in data:
+            message = data['message'].replace('__HOSTNAME__', self.hostname)
+            print(color.text('cyan') + message + color.reset())
+
+        if self._print_io:
+            print(color.text('magenta') + 'IO stats: ' + str(self.stats()) +
+                  color.reset())
+
+        self.over = True
+        self.disconnect()
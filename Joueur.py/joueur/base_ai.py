@@ -1,5 +1,7 @@
 # NOTE: this file should not be modified by competitors
 from joueur.utilities import camel_case_converter
+from joueur.pathfinding import Pathfinder
+from joueur.async_client import GameOver
 import joueur.error_code as error_code
 import joueur.ansi_color_coder as color
 import sys
@@ -11,10 +13,15 @@ class BaseAI:
         self._game = game
         self._player = None
         self._settings = {}
+        self._changes = None
+        self._pathfinder = None
 
     def set_player(self, player):
         self._player = player
 
+    def set_changes(self, changes):
+        self._changes = changes
+
     @property
     def game(self):
         """The reference to the Game instance this AI is playing.
@@ -31,6 +38,35 @@ class BaseAI:
         """
         return self._player
 
+    @property
+    def changes(self):
+        """What the last update from the server changed in the game, so
+        game_updated can update what changed instead of rescanning the game.
+
+        Example:
+            for tile in self.changes.game_objects('num_zombies'):
+                ...
+
+        :rtype: joueur.changes.Changes
+        """
+        return self._changes
+
+    @property
+    def pathfinder(self):
+        """Finds paths between the tiles of the game, and distances to them,
+        for games with tiles. Built the first time it is used, once the game
+        has its tiles.
+
+        Example:
+            path = self.pathfinder.find_path(unit.tile, goal)
+
+        :rtype: joueur.pathfinding.Pathfinder
+        """
+        if self._pathfinder is None:
+            self._pathfinder = Pathfinder(self._game, self._changes)
+
+        return self._pathfinder
+
     def set_settings(self, ai_settings_str):
         if ai_settings_str:
             settings = ai_settings_str.split("&")
@@ -67,6 +103,8 @@ class BaseAI:
         if callback is not None:
             try:
                 return callback(*arguments)
+            except GameOver:
+                raise  # not the AI's error, the client ends the order
             except:
                 error_code.handle_error(
                     error_code.AI_ERRORED,
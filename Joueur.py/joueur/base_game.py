@@ -3,6 +3,8 @@ from joueur.delta_mergeable import DeltaMergeable
 
 # @class BaseGame: the basics of any game
 class BaseGame(DeltaMergeable):
+    __slots__ = ()
+
     def __init__(self):
         DeltaMergeable.__init__(self)
 
@@ -12,5 +14,4 @@ class BaseGame(DeltaMergeable):
         Returns:
             BaseGameObject in the game with the given id, or None if not found
         """
-        if id in self.game_objects:
-            return self.game_objects[id]
+        return self._game_objects.get(id)
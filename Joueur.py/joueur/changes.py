@@ -0,0 +1,167 @@
+from joueur.base_game_object import BaseGameObject
+
+
+# @class Changes: what the last delta from the server changed in the game, so
+# AIs (and indexes they keep) can update only what changed instead of
+# rescanning the whole game every update
+class Changes():
+    def __init__(self):
+        self.added = set()  # ids of the game objects created
+        self.removed = set()  # ids of the game objects taken out of the game's lists, or out of the game
+
+        # (game object or the game, its delta, its key map) for each merged,
+        # only turned into fields by id if they are asked for, so tracking
+        # costs the merge one append per object
+        self._merged = []
+        self._fields = None
+        self._game_fields = None
+        self._objects = None
+
+        self._subscriptions = {}  # (class, attribute) -> callbacks
+        self._watching = {}  # class of a merged object -> {attribute: callbacks}
+        self._old_values = []  # (game object, attribute, value before) as merged
+
+    @property
+    def fields(self):
+        """dict[str, set[str]]: The names of the fields that changed, e.g.
+        {'num_zombies', 'corpses'}, for each id of a game object that
+        changed.
+        """
+        if self._fields is None:
+            self._index()
+
+        return self._fields
+
+    @property
+    def game_fields(self):
+        """set[str]: The names of the fields of the game that changed, e.g.
+        {'current_turn'}.
+        """
+        if self._game_fields is None:
+            self._index()
+
+        return self._game_fields
+
+    def changed(self, game_object, field=None):
+        """Checks if a game object, or one of its fields, changed.
+
+        Args:
+            game_object (BaseGameObject): the game object to check
+            field (str): the name of the field to check, e.g. 'num_zombies',
+                or None for any field
+
+        Returns:
+            bool: True if it changed in the last update
+        """
+        fields = self.fields.get(game_object.id)
+        if fields is None:
+            return False
+
+        return field is None or field in fields
+
+    def game_objects(self, field=None):
+        """Gets the game objects that changed.
+
+        Args:
+            field (str): only get those where this field changed, e.g.
+                'corpses', or None for all of them
+
+        Returns:
+            list[BaseGameObject]: the game objects that changed in the last
+            update
+        """
+        fields_by_id = self.fields
+        return [
+            self._objects[id] for id, fields in fields_by_id.items()
+            if field is None or field in fields
+        ]
+
+    def subscribe(self, cls, field, callback):
+        """Calls a function whenever a field of game objects of a class
+        changes. Callbacks are called after each update is merged, in the
+        order the fields were merged, and before game_updated.
+
+        Example:
+            self.changes.subscribe(Tile, 'num_zombies', self.zombies_moved)
+
+        Args:
+            cls (class): the class of game objects to watch, e.g. Tile, which
+                includes its subclasses, or the game's class for its fields
+            field (str): the name of the field to watch, e.g. 'num_zombies'
+            callback (function): called with the game object, the field's
+                old value, and its new value
+        """
+        self._subscriptions.setdefault((cls, '_' + field), []).append(callback)
+        self._watching = {}
+
+    def unsubscribe(self, cls, field, callback):
+        """Stops calling a function subscribed via subscribe().
+
+        Args:
+            cls (class): the class it was subscribed to
+            field (str): the name of the field it was subscribed to
+            callback (function): the function to stop calling
+        """
+        callbacks = self._subscriptions.get((cls, '_' + field), [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+            if not callbacks:
+                del self._subscriptions[(cls, '_' + field)]
+        self._watching = {}
+
+    def _clear(self):
+        self.added = set()
+        self.removed = set()
+        self._merged = []
+        self._fields = None
+        self._game_fields = None
+        self._objects = None
+        self._old_values = []
+
+    # the callbacks for each attribute watched for a class, or None if none
+    def _watched(self, cls):
+        if cls not in self._watching:
+            watched = {}
+            for (subscribed_class, attribute), callbacks in self._subscriptions.items():
+                if issubclass(cls, subscribed_class):
+                    watched.setdefault(attribute, []).extend(callbacks)
+            self._watching[cls] = watched or None
+
+        return self._watching[cls]
+
+    # remembers the values of the watched attributes a delta is about to change
+    def _watch(self, state, delta, key_map, watched):
+        for key in delta:
+            attribute = key_map.get(key)
+            if attribute in watched:
+                old = getattr(state, attribute, None)
+                if isinstance(old, (list, dict)): # merged into in place, so keep what it held
+                    old = old.copy()
+                self._old_values.append((state, attribute, old))
+
+    # calls the callbacks subscribed to each attribute watched that changed
+    def _notify(self):
+        old_values = self._old_values
+        self._old_values = []
+        for state, attribute, old in old_values:
+            new = getattr(state, attribute)
+            if new == old: # e.g. the defaults the first state sends for new game objects
+                continue
+
+            watched = self._watched(state.__class__) or {} # callbacks may unsubscribe
+            for callback in watched.get(attribute, ()):
+                callback(state, old, new)
+
+    # turns the deltas merged into fields by id, now that every id is merged
+    def _index(self):
+        self._fields = {}
+        self._game_fields = set()
+        self._objects = {}
+
+        for state, delta, key_map in self._merged:
+            names = {key_map[key][1:] for key in delta}
+            if isinstance(state, BaseGameObject):
+                self._fields.setdefault(state.id, set()).update(names)
+                self._objects[state.id] = state
+            else:
+                self._game_fields |= names
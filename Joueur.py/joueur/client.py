@@ -1,241 +1,355 @@
-import socket
-import errno
-import sys
-import os
-import json
+import asyncio
+import contextvars
+import inspect
 import time
-from joueur.serializer import serialize, deserialize
-import joueur.error_code as error_code
-from joueur.game_manager import GameManager
-import joueur.ansi_color_coder as color
+from contextlib import contextmanager
+from joueur.async_client import AsyncClient, PendingRun, GameOver
 
 EOT_CHAR = chr(4)
 
+# the client of the game being played in the current thread or asyncio task,
+# which game objects run their functions on and errors disconnect
+_current = contextvars.ContextVar('joueur_client', default=None)
 
-# Client: A singleton module that talks to the server receiving game
-# information and sending commands to execute. Clients perform no game logic
-class _Client:
-    socket = None
 
-_client = _Client()
+def current():
+    """Gets the client playing in the current thread or asyncio task, which
+    the module level functions below act on.
+
+    Returns:
+        Client or AsyncClient: the client set via use(), or a default one
+    """
+    client = _current.get()
+    if client is None:
+        client = Client()
+        _current.set(client)
+
+    return client
+
+
+def use(client):
+    """Makes a client the current one for this thread or asyncio task (and
+    the tasks it creates), so game objects run their functions on it.
+
+    Args:
+        client (Client or AsyncClient): the client to play with
+
+    Returns:
+        contextvars.Token: to undo this via reset()
+    """
+    return _current.set(client)
+
+
+def reset(token):
+    """Undoes a use(), going back to the previous current client.
+
+    Args:
+        token (contextvars.Token): what use() returned
+    """
+    _current.reset(token)
+
+
+# Client: talks to the server receiving game information and sending commands
+# to execute, blocking while it waits. Clients perform no game logic.
+# This is a thin blocking wrapper over an AsyncClient on its own event loop,
+# which is only run while waiting on the server, so event handlers (and the
+# AI code they call, which may call back into this client) run outside of it.
+# Each game played at once needs its own Client, in its own thread.
+class Client():
+    def __init__(self):
+        self._client = AsyncClient()
+        self._loop = None
+        self._batch_depth = 0
+
+    @property
+    def game(self):
+        return self._client.game
+
+    @property
+    def ai(self):
+        return self._client.ai
+
+    @property
+    def over(self):
+        return self._client.over
+
+    def _run(self, coroutine):
+        return self._loop.run_until_complete(coroutine)
+
+    def connect(self, hostname='localhost', port=3000, print_io=False,
+                recv_buffer=1024, no_delay=True, compress=None):
+        self._loop = asyncio.new_event_loop()
+        self._run(self._client.connect(hostname, port, print_io,
+                                       recv_buffer, no_delay, compress))
+
+    def attach(self, transport, print_io=False):
+        """Plays over a transport instead of connecting to a server, e.g. a
+        joueur.transport.LoopbackTransport to a responder in this process.
+
+        Args:
+            transport: what to send events to and receive events from
+            print_io (bool): if the IO stats are printed when the game is over
+        """
+        self._loop = asyncio.new_event_loop()
+        self._run(self._client.attach(transport, print_io))
+
+    def setup(self, game, ai, manager):
+        self._client.setup(game, ai, manager)
+
+    # sends the server an event via socket
+    def send(self, event, data):
+        self._client.send(event, data)
+
+    def flush(self):
+        """Writes every buffered frame to the socket in as few syscalls as
+        possible. Called automatically before waiting on the server and at
+        the end of each order, so only needed when sending without waiting.
+        """
+        self._run(self._client.flush())
+
+    def disconnect(self, exit_code=None):
+        self._client.disconnect(exit_code)
+
+    def close(self):
+        """Disconnects and frees the event loop, once done with this client.
+        """
+        self.disconnect()
+        if self._loop and not self._loop.is_running():
+            self._loop.close()
+
+    def stats(self):
+        """Gets counters about the IO done this game, to help tune
+        --recvBuffer.
+
+        Returns:
+            dict: the counters by name
+        """
+        return self._client.stats()
+
+    def register_event_handler(self, event, handler):
+        """Registers a function to call with the data of every event of the
+        given type the server sends, after the handlers already registered
+        for it. Use this to handle events the client does not know about, or
+        to observe ones it does (e.g. for metrics or recording).
+
+        Args:
+            event (str): the name of the event, e.g. 'delta'
+            handler (function): called with the event's data
+        """
+        self._client.register_event_handler(event, handler)
+
+    def unregister_event_handler(self, event, handler):
+        """Removes a handler added via register_event_handler.
+
+        Args:
+            event (str): the name of the event the handler was registered for
+            handler (function): the handler to remove
+        """
+        self._client.unregister_event_handler(event, handler)
+
+    def peek_event(self, event):
+        """Looks through the events received but not yet handled for one of
+        the given type, without handling or removing any of them.
+
+        Args:
+            event (str): the name of the event to look for, e.g. 'ran'
+
+        Returns:
+            dict: the first queued event of that type, with its 'event' and
+            'data', or None if none are queued
+        """
+        return self._client.peek_event(event)
+
+    def run_on_server(self, caller, function_name, args=None):
+        if self._loop.is_running():
+            # called from an async def AI method, which awaits the result
+            return self._client.run_on_server(caller, function_name, args)
+
+        pending = self._client.send_run(caller, function_name, args,
+                                        self._handle_events_until)
+
+        if self._batch_depth > 0:
+            return pending  # resolved later, when its result is asked for
+
+        return pending.result()
+
+    @contextmanager
+    def batch(self):
+        """Pipelines the run commands sent inside this context. Instead of
+        waiting on the server for each one, game functions return a
+        PendingRun right away, and the replies are matched to them in the
+        order they were sent. Every command is resolved by the time the
+        context exits.
+
+        Note that the game state is not updated by a command until its result
+        has been waited on, so only batch commands that do not depend on
+        each other's effects.
+
+        Example:
+            with joueur.client.batch():
+                for tower in self.player.towers:
+                    tower.attack(targets[tower])
+        """
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self.flush_runs()
+
+    def flush_runs(self):
+        """Waits until the server has replied to every run command sent."""
+        self._handle_events_until(lambda: len(self._client.pending_runs) == 0)
+
+    def play(self):
+        """Handles events until the game is over."""
+        self._handle_events_until(self._client.is_over)
+
+    def wait_for_event(self, event):
+        while not self._client.over:
+            self.wait_for_events()
+
+            while len(self._client.events) > 0:
+                sent = self._client.events.popleft()
+                data = sent['data'] if 'data' in sent else None
+                if event is not None and sent['event'] == event:
+                    return data
+                else:
+                    self._auto_handle(sent['event'], data)
+
+    # handles events as they come in until the condition is met, for pending
+    # run commands, whose 'ran' events are auto handled in the order sent
+    def _handle_events_until(self, condition):
+        while not condition() and not self._client.over:
+            self.wait_for_events()
+
+            while len(self._client.events) > 0 and not condition():
+                sent = self._client.events.popleft()
+                self._auto_handle(sent['event'], sent.get('data'))
+
+    # waits on the socket for incoming data and ends once some events get
+    # found
+    def wait_for_events(self):
+        if len(self._client.events) > 0:
+            return  # as we already have events to handle, no need to wait
+
+        if self._client.read_events_nowait():
+            return  # from an in-process transport, no need to run the loop
+
+        try:
+            self._run(self._client.wait_for_events())
+        except (KeyboardInterrupt, SystemExit):
+            self.disconnect()
+            raise
+
+    # called via the client run loop when data is sent
+    def _auto_handle(self, event, data=None):
+        start = time.perf_counter()
+        for handler in self._client.handlers_for(event):
+            handled = handler(data)
+            if inspect.isawaitable(handled):
+                self._run(handled)
+
+        self._client.count_event(event, start)
+
+
+# the functions below act on the current client, so code written for when
+# a process could only play one game keeps working
+
+
+def connect(hostname='localhost', port=3000, print_io=False,
+            recv_buffer=1024, no_delay=True, compress=None):
+    return current().connect(hostname, port, print_io, recv_buffer,
+                             no_delay, compress)
+
+
+def attach(transport, print_io=False):
+    """Plays over a transport instead of connecting to a server. See
+    Client.attach.
+    """
+    current().attach(transport, print_io)
 
 
-def connect(hostname='localhost', port=3000, print_io=False):
-    _client.hostname = hostname
-    _client.port = int(port)
+def setup(game, ai, manager):
+    current().setup(game, ai, manager)
 
-    _client._print_io = print_io
-    _client._received_buffer = ""
-    _client._events_stack = []
-    _client._buffer_size = 1024
-    _client._timeout_time = 1.0
 
-    print(color.text('cyan') + 'Connecting to:', _client.hostname + ':' + str(
-        _client.port) + color.reset())
+# sends the server an event via socket
+def send(event, data):
+    current().send(event, data)
 
-    try:
-        _client.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
 
-        # Silly Windows
-        _client.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+def flush():
+    """Writes every buffered frame of the current client to the socket."""
+    return current().flush()
 
-        # so the blocking on recv doesn't hang forever and other system
-        # interrupts (e.g. keyboard) can be handled
-        _client.socket.settimeout(_client._timeout_time)
-        _client.socket.connect((_client.hostname, _client.port))
-    except socket.error as e:
-        error_code.handle_error(
-            error_code.COULD_NOT_CONNECT,
-            e,
-            'Could not connect to {}:{}'.format(
-                _client.hostname,
-                _client.port
-            )
-        )
 
+def disconnect(exit_code=None):
+    client = _current.get()
+    if client:
+        client.disconnect(exit_code)
 
-def setup(game, ai, manager):
-    _client.game = game
-    _client.ai = ai
-    _client.manager = manager
 
+def stats():
+    """Gets counters about the IO done this game, to help tune --recvBuffer.
 
-def _send_raw(string):
-    if _client._print_io:
-        print(color.text('magenta') + 'TO SERVER --> ' + str(
-            string) + color.reset())
-    _client.socket.send(string)
+    Returns:
+        dict: the counters by name
+    """
+    return current().stats()
 
 
-# sends the server an event via socket
-def send(event, data):
-    _send_raw(
-        (json.dumps({
-            'sentTime': int(time.time()),
-            'event': event,
-            'data': serialize(data)
-        }) + EOT_CHAR).encode('utf-8')
-    )
+def register_event_handler(event, handler):
+    """Registers a function to call with the data of every event of the
+    given type the server sends the current client. See
+    Client.register_event_handler.
+    """
+    current().register_event_handler(event, handler)
 
 
-def disconnect(exit_code=None):
-    if _client.socket:
-        _client.socket.close()
+def unregister_event_handler(event, handler):
+    """Removes a handler added via register_event_handler."""
+    current().unregister_event_handler(event, handler)
+
+
+def peek_event(event):
+    """Looks through the events the current client received but did not
+    handle yet for one of the given type. See Client.peek_event.
+    """
+    return current().peek_event(event)
 
 
 def run_on_server(caller, function_name, args=None):
-    send('run', {
-        'caller': caller,
-        'functionName': function_name,
-        'args': args
-    })
+    # for an AsyncClient this is a coroutine, so game functions are awaited
+    # by asyncio AIs, e.g. `await unit.move(tile)`
+    return current().run_on_server(caller, function_name, args)
+
+
+def batch():
+    """Pipelines the run commands sent inside this context. See
+    Client.batch.
 
-    ran_data = wait_for_event('ran')
-    return deserialize(ran_data, _client.game)
+    Example:
+        with joueur.client.batch():
+            for tower in self.player.towers:
+                tower.attack(targets[tower])
+    """
+    return current().batch()
+
+
+def flush_runs():
+    """Waits until the server has replied to every run command sent."""
+    current().flush_runs()
 
 
 def play():
-    wait_for_event(None)
+    current().play()
 
 
 def wait_for_event(event):
-    while True:
-        wait_for_events()
-
-        while len(_client._events_stack) > 0:
-            sent = _client._events_stack.pop()
-            data = sent['data'] if 'data' in sent else None
-            if event is not None and sent['event'] == event:
-                return data
-            else:
-                _auto_handle(sent['event'], data)
+    return current().wait_for_event(event)
 
 
-# loops to check the socket for incoming data and ends once some events
-# get found
 def wait_for_events():
-    if len(_client._events_stack) > 0:
-        return  # as we already have events to handle, no need to wait for more
-
-    try:
-        while True:
-            sent = None
-            try:
-                sent = _client.socket.recv(_client._buffer_size) \
-                    .decode('utf-8')
-            except socket.timeout:
-                pass  # timed out so keyboard/system interrupts can be handled,
-                #       hence the while true loop above
-            except socket.error as e:
-                error_code.handle_error(
-                    error_code.CANNOT_READ_SOCKET, e,
-                    'Error reading socket while waiting for events')
-
-            if not sent:
-                continue
-            elif _client._print_io:
-                print(color.text('magenta') + 'FROM SERVER <-- ' + str(
-                    sent) + color.reset())
-
-            split = (_client._received_buffer + sent).split(EOT_CHAR)
-            # the last item will either be "" if the last char was an EOT_CHAR,
-            #   or a partial data we need to buffer anyways
-            _client._received_buffer = split.pop()
-
-            for json_str in reversed(split):
-                try:
-                    parsed = json.loads(json_str)
-                except ValueError as e:
-                    error_code.handle_error(error_code.MALFORMED_JSON, e,
-                                            'Could not parse json ""'.format(
-                                                json_str)
-                                            )
-
-                _client._events_stack.append(parsed)
-
-            if len(_client._events_stack) > 0:
-                return
-    except (KeyboardInterrupt, SystemExit):
-        disconnect()
-
-
-# called via the client run loop when data is sent
-def _auto_handle(event, data=None):
-    # the current module, e.g. the Client module that acts as a singleton
-    g = globals()
-    auto_handle_function = g['_auto_handle_' + event]
-
-    if auto_handle_function:
-        return auto_handle_function(data)
-    else:
-        error_code.handle_error(error_code.UNKNOWN_EVENT_FROM_SERVER, message=(
-            'Could not auto handle event "{}".'.format(event)))
-
-
-def _auto_handle_delta(data):
-    try:
-        _client.manager.apply_delta_state(data)
-    except:
-        error_code.handle_error(error_code.DELTA_MERGE_FAILURE, sys.exc_info(),
-                                'Error merging delta')
-
-    if _client.ai.player:  # then the AI is ready for updates
-        _client.ai.game_updated()
-
-
-def _auto_handle_order(data):
-    args = deserialize(data['args'], _client.game)
-    try:
-        returned = _client.ai._do_order(data['name'], args)
-    except:
-        print('esc info', type(sys.exc_info()))
-        error_code.handle_error(error_code.AI_ERRORED, sys.exc_info(),
-                                'AI errored executing order "{}"'.format(
-                                    data.name))
-
-    send("finished", {
-        'orderIndex': data['index'],
-        'returned': returned
-    })
-
-
-def _auto_handle_invalid(data):
-    try:
-        _client.ai.invalid(data['message'])
-    except:
-        error_code.handle_error(error_code.AI_ERRORED, sys.exc_info(),
-                                'AI errored while handling invalid data.')
-
-
-def _auto_handle_fatal(data):
-    error_code.handle_error(
-        error_code.FATAL_EVENT,
-        message='Got a fatal event from the server: ' + data['message']
-    )
-
-
-def _auto_handle_over(data):
-    won = _client.ai.player.won
-    reason = _client.ai.player.reason_won \
-        if _client.ai.player.won \
-        else _client.ai.player.reason_lost
-
-    print('{}Game is Over. {} because {}{}'.format(
-        color.text('green'),
-        'I Won!' if won else 'I Lost :(',
-        reason,
-        color.reset()
-    ))
-
-    try:
-        _client.ai.end(won, reason)
-    except:
-        error_code.handle_error(error_code.AI_ERRORED, sys.exc_info(),
-                                'AI errored during end.')
-
-    if 'message' in data:
-        message = data['message'].replace('__HOSTNAME__', _client.hostname)
-        print(color.text('cyan') + message + color.reset())
-
-    disconnect()
-    os._exit(0)
+    current().wait_for_events()
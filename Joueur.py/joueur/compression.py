@@ -0,0 +1,80 @@
+# Compression: the optional compressed stream from the server.
+# The client asks for it right after connecting, before 'alias', by sending a
+# 'compress' event with the format it wants, e.g. {"format": "zlib"}. The
+# server replies with an uncompressed 'compressed' event with the format it
+# agreed to (or a null format to decline). Every byte the server sends after
+# that frame's EOT is then one compressed stream of the usual EOT delimited
+# frames, flushed (Z_SYNC_FLUSH) after each write so the client can inflate
+# them as they arrive. What the client sends is never compressed.
+import time
+import zlib
+
+# the window bits zlib needs to inflate each format
+WBITS = {
+    'zlib': zlib.MAX_WBITS,
+    'gzip': 16 + zlib.MAX_WBITS
+}
+
+# the most bytes inflated at once, so a highly compressed delta is fed to the
+# frame buffer in pieces rather than inflated into one huge bytes object
+MAX_INFLATE_SIZE = 256 * 1024
+
+
+class Inflater():
+    def __init__(self, format='zlib'):
+        self.format = format
+        self._decompressor = zlib.decompressobj(WBITS[format])
+        self._input = bytearray()
+
+        self.bytes_compressed = 0
+        self.bytes_inflated = 0
+        self.seconds = 0.0
+
+    def writable(self, size):
+        """Gets space to receive compressed bytes into from the socket.
+
+        Args:
+            size (int): how many bytes to receive at most
+
+        Returns:
+            memoryview: the space, valid until the next call
+        """
+        if len(self._input) < size:
+            self._input = bytearray(size)
+
+        return memoryview(self._input)[:size]
+
+    def inflate(self, data, frame_buffer):
+        """Decompresses received bytes, feeding them to the frame buffer as
+        they are inflated.
+
+        Args:
+            data (bytes-like): the compressed bytes received
+            frame_buffer (FrameBuffer): where the inflated bytes go
+        """
+        start = time.perf_counter()
+        self.bytes_compressed += len(data)
+
+        while data:
+            inflated = self._decompressor.decompress(data, MAX_INFLATE_SIZE)
+            frame_buffer.feed(inflated)
+            self.bytes_inflated += len(inflated)
+            data = self._decompressor.unconsumed_tail
+
+        self.seconds += time.perf_counter() - start
+
+    def stats(self):
+        """Gets the counters of this inflater for diagnostics.
+
+        Returns:
+            dict: the bytes in and out, their ratio, and time spent inflating
+        """
+        return {
+            'compression': self.format,
+            'bytes_inflated': self.bytes_inflated,
+            'compression_ratio': (
+                self.bytes_inflated / self.bytes_compressed
+                if self.bytes_compressed else 0
+            ),
+            'inflate_seconds': self.seconds
+        }
@@ -1,6 +1,15 @@
 class DeltaMergeable():
     """a game or game object that needs to be delta merged"""
 
+    # the generated games declare their attributes as __slots__, which only
+    # saves memory if every class they inherit from declares them too
+    __slots__ = ()
+
+    # the attributes holding values cached from other attributes, reset to
+    # None whenever a delta changes any of those, e.g. a tile's neighbors
+    # cached from its links to them
+    _cached_from = {}
+
     def __init__(self):
         pass
 
@@ -26,10 +26,34 @@ import sys
 import joueur.ansi_color_coder as color
 import os
 
+# if errors exit the process, otherwise they raise a JoueurError so one
+# process can host several games without one's error ending the rest
+exit_on_error = True
+
+
+class JoueurError(Exception):
+    """An error that ended the game being played, raised by handle_error
+    instead of exiting when exit_on_error is False.
+
+    Attributes:
+        code (int): the error code, one of the constants above
+        message (str): why the game ended, if known
+    """
+    def __init__(self, code, message=None):
+        Exception.__init__(self, "{}: {}".format(
+            _by_code.get(code, code), message))
+        self.code = code
+        self.message = message
+
+
 def handle_error(error_code, e=None, message=None):
     if isinstance(e, SystemExit) or isinstance(e, KeyboardInterrupt): # we accidentally caught an exit exception, just re-throw it till it gets to the end of the runtime stack
         sys.exit(e.code)
 
+    handling = sys.exc_info()[1]
+    if isinstance(handling, JoueurError): # already reported when raised, so keep it going up to whoever started the game
+        raise handling
+
     import joueur.client # avoid circular imports (sphinx won't build docs otherwise)
     joueur.client.disconnect()
 
@@ -46,4 +70,8 @@ def handle_error(error_code, e=None, message=None):
         sys.stderr.write("---")
 
     sys.stderr.write("\n" + color.reset())
-    os._exit(error_code)
+
+    if exit_on_error:
+        os._exit(error_code)
+
+    raise JoueurError(error_code, message)
@@ -0,0 +1,183 @@
+# FrameBuffer: a growable bytes buffer that splits the socket stream into
+# EOT delimited frames without re-scanning or re-decoding data it has seen
+from contextlib import contextmanager
+
+EOT_BYTE = b'\x04'
+
+# the largest single read the buffer will grow its read size to
+MAX_READ_SIZE = 4 * 1024 * 1024
+
+
+class FrameBuffer():
+    def __init__(self, read_size=1024, max_read_size=MAX_READ_SIZE):
+        # reads adapt between the initial size and the max size, growing
+        # while the socket keeps filling them and shrinking when it does not
+        self.read_size = read_size
+        self.min_read_size = read_size
+        self.max_read_size = max(read_size, max_read_size)
+        self._buffer = bytearray(read_size * 2)
+        self._start = 0  # where the first unconsumed byte is
+        self._end = 0  # where the last received byte is (exclusive)
+        self._scanned = 0  # how far we have looked for an EOT byte
+
+        self.recv_calls = 0
+        self.bytes_received = 0
+        self.frames_received = 0
+
+    def __len__(self):
+        """The number of buffered bytes that are not part of a frame yet."""
+        return self._end - self._start
+
+    def recv_into(self, sock):
+        """Reads up to read_size bytes from the socket directly into the
+        buffer, without any intermediate bytes objects.
+
+        Returns:
+            int: the number of bytes read, 0 meaning the socket was closed
+        """
+        with self.writable() as into:
+            read = sock.recv_into(into)
+
+        self.wrote(read)
+        return read
+
+    @contextmanager
+    def writable(self):
+        """Exposes the free space at the end of the buffer, read_size bytes
+        of it, for a reader to receive into (e.g. loop.sock_recv_into). The
+        reader must call wrote() with how many bytes it received afterwards.
+
+        Yields:
+            memoryview: the free space, only valid inside the context
+        """
+        self._reserve(self.read_size)
+
+        with memoryview(self._buffer) as view:
+            with view[self._end:self._end + self.read_size] as into:
+                yield into
+
+    def wrote(self, read):
+        """Marks bytes received into writable() as part of the buffer.
+
+        Args:
+            read (int): how many bytes were received
+        """
+        self._end += read
+        self.count_read(read)
+
+    def count_read(self, read):
+        """Counts a read from the socket, and adapts the read size to it.
+        Done by wrote(), or directly for reads that went elsewhere first (e.g.
+        compressed bytes, which get inflated into the buffer via feed()).
+
+        Args:
+            read (int): how many bytes were received
+        """
+        self.recv_calls += 1
+        self.bytes_received += read
+        self._adapt_read_size(read)
+
+    def feed(self, data):
+        """Copies already received bytes into the buffer, for data that does
+        not come from recv_into.
+        """
+        self._reserve(len(data))
+        self._buffer[self._end:self._end + len(data)] = data
+        self._end += len(data)
+
+    def frames(self, limit=None):
+        """Pops every complete frame out of the buffer.
+
+        Args:
+            limit (int): the most frames to pop, if the bytes after them may
+                not be frames (e.g. once a compressed stream starts)
+
+        Returns:
+            list[bytes]: the frames found, with the EOT bytes removed
+        """
+        frames = []
+        buffer = self._buffer
+        with memoryview(buffer) as view:
+            while limit is None or len(frames) < limit:
+                eot = buffer.find(EOT_BYTE, self._scanned, self._end)
+                if eot == -1:
+                    # resume from here next time, nothing before it can be EOT
+                    self._scanned = self._end
+                    break
+
+                frames.append(view[self._start:eot].tobytes())
+                self._start = eot + 1
+                self._scanned = self._start
+
+        if self._start == self._end:
+            # everything was consumed, so reuse the buffer from the front
+            self._start = self._end = self._scanned = 0
+
+            if len(self._buffer) > self.read_size * 8:
+                # give back the memory a large frame (e.g. the first delta)
+                # needed now that reads have shrunk again
+                del self._buffer[self.read_size * 2:]
+
+        self.frames_received += len(frames)
+        return frames
+
+    def take(self):
+        """Pops every buffered byte that is not part of a frame yet.
+
+        Returns:
+            bytes: the bytes after the last frame popped
+        """
+        taken = bytes(self._buffer[self._start:self._end])
+        self._start = self._end = self._scanned = 0
+        return taken
+
+    def stats(self):
+        """Gets the counters of this buffer for diagnostics.
+
+        Returns:
+            dict: the recv syscalls, bytes, and frames seen so far
+        """
+        return {
+            'recv_calls': self.recv_calls,
+            'bytes_received': self.bytes_received,
+            'frames_received': self.frames_received,
+            'bytes_per_frame': (
+                self.bytes_received // self.frames_received
+                if self.frames_received else 0
+            ),
+            'bytes_per_recv': (
+                self.bytes_received // self.recv_calls
+                if self.recv_calls else 0
+            ),
+            'read_size': self.read_size
+        }
+
+    def _adapt_read_size(self, read):
+        """Doubles the read size when a read filled it, as more data is
+        probably waiting (e.g. a large delta), and halves it when reads come
+        back mostly empty so small frames do not pin a huge buffer.
+        """
+        if read == self.read_size:
+            self.read_size = min(self.read_size * 2, self.max_read_size)
+        elif read < self.read_size // 4:
+            self.read_size = max(self.read_size // 2, self.min_read_size)
+
+    def _reserve(self, size):
+        """Makes sure at least size bytes are free at the end of the buffer,
+        first by discarding consumed bytes and then by growing it.
+        """
+        if len(self._buffer) - self._end >= size:
+            return
+
+        if self._start > 0:
+            pending = self._end - self._start
+            self._buffer[:pending] = self._buffer[self._start:self._end]
+            self._scanned -= self._start
+            self._start = 0
+            self._end = pending
+
+        free = len(self._buffer) - self._end
+        if free < size:
+            # double so that large frames take a logarithmic number of grows
+            grow = max(size - free, len(self._buffer))
+            self._buffer.extend(bytes(grow))
@@ -1,13 +1,57 @@
 from joueur.delta_mergeable import DeltaMergeable
 from joueur.base_game_object import BaseGameObject
+from joueur.changes import Changes
 from joueur.utilities import camel_case_converter
-from joueur.serializer import is_game_object_reference, is_object
+from joueur.serializer import is_object
+import joueur.ansi_color_coder as color
+
+# the kinds of state a delta can be merged into
+_LIST = 0
+_DICT = 1
+_OBJECT = 2
+
+# what a key not in the state holds, as None is a value states can hold
+_MISSING = object()
+
+# the (class, attribute) of each field a delta had that its class does not, warned about once
+_warned = set()
+
 
 # @class GameManager: managed the game and it's game objects including unserializing deltas
 class GameManager():
     def __init__(self, game):
         self.game = game
         self._game_object_classes = game._game_object_classes
+        self.changes = Changes() # what the last delta applied changed
+
+        # for each class, the server's camelCase keys to the attribute names
+        # they are stored in, e.g. "numZombies" -> "_num_zombies"
+        self._key_maps = {}
+        self._caches = {} # for each class with cached values, the keys that reset them
+        self._build_key_map(game.__class__)
+        for game_object_class in self._game_object_classes.values():
+            self._build_key_map(game_object_class)
+
+    ## pre-fills the key map of a class from its properties, so merging a delta rarely needs to convert a key
+    def _build_key_map(self, cls):
+        key_map = self._key_maps.setdefault(cls, {})
+        for klass in cls.__mro__:
+            for name, value in vars(klass).items():
+                if isinstance(value, property):
+                    parts = name.split("_")
+                    key = parts[0] + "".join(part.capitalize() for part in parts[1:])
+                    if camel_case_converter(key) == name: # only keys that convert back the same way, so this never changes what a key maps to
+                        key_map.setdefault(key, "_" + name)
+
+        return key_map
+
+    ## gets the attribute name a key of the server's is stored in for a class
+    def _key_map(self, cls):
+        key_map = self._key_maps.get(cls)
+        if key_map is None:
+            key_map = self._build_key_map(cls)
+
+        return key_map
 
     def set_constants(self, constants):
         self._server_constants = constants
@@ -16,61 +60,161 @@ class GameManager():
 
     ## applies a delta state (change in state information) to this game
     def apply_delta_state(self, delta):
+        self.changes._clear()
+        listed = self._listed_game_objects(delta)
+
         if 'gameObjects' in delta:
             self._init_game_objects(delta['gameObjects'])
 
         self._merge_delta(self.game, delta)
 
+        if listed:
+            self._record_removed(listed)
+
+        if self.changes._old_values:
+            self.changes._notify()
+
     ## game objects can be refences in the delta states for cycles, they will all point to the game objects here.
     def _init_game_objects(self, delta_game_objects):
         for id, obj in delta_game_objects.items():
-            if not id in self.game._game_objects: # then we need to create it
+            if obj == self._DELTA_REMOVED: # taken out of the game entirely
+                self.changes.removed.add(id)
+            elif not id in self.game._game_objects: # then we need to create it
                 self.game._game_objects[id] = self._game_object_classes[obj['gameObjectName']]()
+                self.changes.added.add(id)
+
+    ## the ids of the game objects in each of the game's lists the delta changes, e.g. game.units, to find those removed from them
+    def _listed_game_objects(self, delta):
+        listed = {}
+        key_map = self._key_map(self.game.__class__)
+        for key in delta:
+            attribute = key_map.get(key)
+            value = getattr(self.game, attribute, None) if attribute else None
+            if isinstance(value, list):
+                listed[attribute] = {item.id for item in value if isinstance(item, BaseGameObject)}
+
+        return listed
+
+    ## records the game objects no longer in any of the game's lists they were in before the delta
+    def _record_removed(self, listed):
+        still_listed = set()
+        for attribute, before in listed.items():
+            after = {item.id for item in getattr(self.game, attribute) if isinstance(item, BaseGameObject)}
+            self.changes.removed |= before - after
+            still_listed |= after
+
+        self.changes.removed -= still_listed
+
+    ## merges delta changes into the game. Nested changes are walked depth first with an explicit stack instead of recursion, and the delta is never modified
+    def _merge_delta(self, state, delta):
+        DELTA_REMOVED = self._DELTA_REMOVED
+        DELTA_LIST_LENGTH = self._DELTA_LIST_LENGTH
+        get_game_object = self.game._game_objects.get # one lookup per reference, None if not found
+
+        stack = [self._merge_frame(state, delta)]
+        while stack:
+            state, kind, key_map, items = stack[-1]
+
+            for key, d in items: # deltas will always be objects when iterating through, arrays just have keys of numbers
+                if key == DELTA_LIST_LENGTH: # just signifies the state is an array, already resized to it
+                    continue
+
+                # find where the key is in the state, and what it holds now
+                if kind == _LIST:
+                    state_key = int(key) # array's keys are real numbers, not strings e.g. "1"
+                    current = state[state_key] if state_key < len(state) else _MISSING
+                elif kind == _OBJECT:
+                    state_key = key_map.get(key)
+                    if state_key is None: # not a property, so convert it once and remember it
+                        state_key = key_map[key] = "_" + camel_case_converter(key)
+                    current = getattr(state, state_key, _MISSING)
+                else:
+                    state_key = key
+                    current = state.get(key, _MISSING)
+
+                # then what the delta does to it, by the type of change
+                if d.__class__ is dict:
+                    if len(d) == 1 and 'id' in d: # then this is a shallow reference to a game object
+                        d = get_game_object(d['id'])
+                    elif current is _MISSING: # a new list or dict, so merge into an empty one
+                        current = [] if DELTA_LIST_LENGTH in d else {}
+                        self._set_member(state, kind, state_key, current)
+                        stack.append(self._merge_frame(current, d))
+                        break
+                    elif is_object(current):
+                        stack.append(self._merge_frame(current, d))
+                        break
+                elif d == DELTA_REMOVED:
+                    if current is not _MISSING:
+                        del state[state_key]
+                    continue
+
+                self._set_member(state, kind, state_key, d)
+            else: # every change at this level was merged
+                stack.pop()
+
+    ## the state a delta is merged into, what kind of state it is, its key map, and the delta's changes to walk
+    def _merge_frame(self, state, delta):
+        if isinstance(state, list):
+            delta_length = delta.get(self._DELTA_LIST_LENGTH, -1)
+            if delta_length > -1: # then resize the array to the correct size, in one go
+                if len(state) > delta_length:
+                    del state[delta_length:]
+                else:
+                    state.extend([None] * (delta_length - len(state)))
+
+            return state, _LIST, None, iter(delta.items())
+
+        if isinstance(state, DeltaMergeable):
+            key_map = self._key_map(state.__class__)
+            if state._cached_from:
+                self._reset_caches(state, delta, key_map)
+
+            changes = self.changes
+            changes._merged.append((state, delta, key_map))
+            if changes._subscriptions: # so there is nothing to do per object unless something is subscribed
+                watched = changes._watched(state.__class__)
+                if watched:
+                    changes._watch(state, delta, key_map, watched)
+
+            return state, _OBJECT, key_map, iter(delta.items())
+
+        return state, _DICT, None, iter(delta.items())
+
+    ## resets the values a game object cached from the attributes the delta changes, e.g. a tile's neighbors from its links
+    def _reset_caches(self, state, delta, key_map):
+        caches = self._caches.get(state.__class__)
+        if caches is None:
+            caches = self._caches[state.__class__] = {
+                key: [cache for cache, attributes in state._cached_from.items() if attribute in attributes]
+                for key, attribute in key_map.items()
+                if any(attribute in attributes for attributes in state._cached_from.values())
+            }
+
+        for key in delta:
+            for cache in caches.get(key, ()):
+                setattr(state, cache, None)
 
     ## Correctly apply a single change to a member of a list, dict, or object
-    def _set_member(self, state, state_key, value):
-        if isinstance(state_key, int) or isinstance(state, dict):
-            state[state_key] = value
+    def _set_member(self, state, kind, state_key, value):
+        if kind == _OBJECT:
+            try:
+                setattr(state, state_key, value)
+            except AttributeError: # not one of its __slots__, so a field this version of the game does not have
+                self._warn_missing(state, state_key)
         else:
-            setattr(state, state_key, value)
+            state[state_key] = value
 
-    ## recursively merges delta changes to the game.
-    def _merge_delta(self, state, delta):
-        delta_length = -1
-        if self._DELTA_LIST_LENGTH in delta:
-            delta_length = delta[self._DELTA_LIST_LENGTH]
-            del delta[self._DELTA_LIST_LENGTH] # we don't want to copy this key/value over to the state, it was just to signify it is an array
-
-        if delta_length > -1: # then this part in the state is an array
-            while len(state) > delta_length: # remove elements off the array to make it's size correct.
-                state.pop()
-            while len(state) < delta_length: # append elements on the array to make it's size correct.
-                state.append(None)
-
-        for key in delta: # deltas will always be objects when iterating through, arrays just have keys of numbers
-            d = delta[key]
-            state_key = key # array's keys are real numbers, not strings e.g. "1"
-            key_in_state = False
-
-            if isinstance(state, list):
-                state_key = int(key)
-                key_in_state = state_key < len(state)
-            else:
-                if isinstance(state, DeltaMergeable):
-                    state_key = "_" + camel_case_converter(state_key)
-                key_in_state = state_key in state
-
-            if d == self._DELTA_REMOVED:
-                if key_in_state:
-                    del state[state_key]
-            elif is_game_object_reference(d): # then this is a shallow reference to a game object
-                referenced_object = self.game.get_game_object(d['id'])
-                self._set_member(state, state_key, referenced_object)
-            elif is_object(d) and key_in_state and is_object(state[state_key]):
-                self._merge_delta(state[state_key], d)
-            elif not key_in_state and is_object(d):
-                if isinstance(d, dict):
-                    self._set_member(state, state_key, [] if self._DELTA_LIST_LENGTH in d else {})
-                    self._merge_delta(state[state_key], d)
-            else:
-                self._set_member(state, state_key, d)
+    ## warns, once for each class and field, that a delta has a field the game object does not, which is then ignored
+    def _warn_missing(self, state, state_key):
+        missing = (state.__class__, state_key)
+        if missing in _warned:
+            return
+
+        _warned.add(missing)
+        print("{}WARNING: {} has no field \"{}\", so it was ignored. Your game's code is probably a different version than the server's.{}".format(
+            color.text('yellow'),
+            state.__class__.__name__,
+            state_key[1:],
+            color.reset()
+        ))
@@ -0,0 +1,599 @@
+# Gamelog: reads the gamelogs the game server writes (gzipped JSON, one object
+# holding every delta of a game) as a stream, replaying each delta through a
+# GameManager into the game's generated classes as it is read, so a gamelog
+# is never held in memory whole and thousands of them can be mined in turn.
+#
+# A gamelog is {gamelogVersion, gameName, gameSession, gameVersion, constants,
+# deltas, epoch, losers, winners, settings}, each delta being {type, data,
+# game}, where game is the delta of the game's state, with nothing hidden.
+#
+# To get to a turn without replaying every turn before it, a GamelogIndex of
+# the gamelog is built once and saved beside it: where each delta starts, and
+# snapshots of the state every so many turns, to replay from the nearest one.
+# Only the first snapshot is of a whole state, the rest are of what changed
+# since it, which is tiny next to a whole state, mostly tiles that never change.
+import array
+import bisect
+import gzip
+import importlib
+import io
+import json
+import os
+import pickle
+import re
+import zlib
+import joueur.error_code as error_code
+import joueur.ansi_color_coder as color
+from joueur.game_manager import GameManager
+from joueur.utilities import camel_case_converter
+
+# how many characters are read from the decompressed stream at once
+CHUNK_SIZE = 64 * 1024
+
+# how many turns apart the snapshots of indexes are, by default
+SNAPSHOT_EVERY = 50
+
+# the version of the index files, indexes saved by other versions are rebuilt
+INDEX_VERSION = 1
+
+_decoder = json.JSONDecoder()
+
+_whitespace = re.compile(r'[ \t\n\r]*')
+
+# what can follow a number in JSON, which is how its end is known
+_after_number = frozenset(' \t\n\r,]}')
+
+
+class Gamelog():
+    """A gamelog the game server wrote, read as it is iterated over. Each
+    iteration reads the file from the start, into a new game.
+
+    Example:
+        gamelog = Gamelog('logs/gamelogs/Necrowar-1-2020.01.01.json.gz')
+        for game in gamelog.turns():
+            print(game.current_turn, len(game.units))
+        print(gamelog.info['winners'])
+
+        game = gamelog.seek(430)  # via the index, built on first use
+    """
+
+    def __init__(self, path, chunk_size=CHUNK_SIZE, index_path=None):
+        """Opens nothing yet, the file is read as it is iterated over.
+
+        Args:
+            path (str): the path to the gamelog, gzipped if it ends with .gz
+            chunk_size (int): how many characters to read at once
+            index_path (str): where the index of the gamelog is saved, by
+                default beside it, its path with .index added
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        self.index_path = index_path or path + '.index'
+
+        # the fields of the gamelog other than its deltas, as read so far,
+        # e.g. 'gameName' before the deltas, and 'winners' only after them
+        self.info = {}
+
+        self.game = None  # the game the deltas are replayed into
+        self.manager = None
+
+        self._index = None
+        self._replayed = -1  # the number of the last delta in self.game
+
+    def deltas(self):
+        """Reads the deltas of the gamelog, without replaying them.
+
+        Yields:
+            dict: each delta, with its 'type' (e.g. 'ran' or 'finished'), its
+            'data', and its 'game', the delta of the game's state
+        """
+        for offset, delta in self._frames():
+            yield delta
+
+    def replay(self):
+        """Replays the deltas of the gamelog into self.game, a new game of
+        the gamelog's game, as they are read.
+
+        Yields:
+            dict: each delta, once merged into self.game
+        """
+        for number, (offset, delta) in enumerate(self._frames(self._start_game)):
+            self.manager.apply_delta_state(delta['game'])
+            self._replayed = number
+            yield delta
+
+    def turns(self):
+        """Replays the gamelog a turn at a time.
+
+        Yields:
+            BaseGame: self.game, at the start of each turn, which is after
+            the turn before it, then once more at the end of the game. It is
+            the same game each time, updated in place
+        """
+        game = None
+        for delta in self.replay():
+            if game is None or game.current_turn != turn:
+                game = self.game
+                turn = game.current_turn
+                yield game
+
+        if game is not None:
+            yield game
+
+    def index(self, every=SNAPSHOT_EVERY):
+        """Gets the index of the gamelog, loading it from index_path, or if
+        there is none for this version of the gamelog, building it, which
+        reads the gamelog once, and saving it there for next time.
+
+        Args:
+            every (int): how many turns apart its snapshots are
+
+        Returns:
+            GamelogIndex: the index
+        """
+        if self._index is None or self._index.every != every:
+            index = GamelogIndex.load(self.index_path, self.path, every)
+            if index is None:
+                index = GamelogIndex.build(self, every)
+                index.save(self.index_path)
+            self._index = index
+
+        return self._index
+
+    def seek(self, turn):
+        """Replays the gamelog up to the start of a turn via its index, from
+        the nearest snapshot before it, or from where self.game is already if
+        that is nearer.
+
+        Args:
+            turn (int): the turn
+
+        Returns:
+            BaseGame: self.game, as turns() yields it at the start of the
+            turn, or None if the game has no such turn
+        """
+        index = self._index or self.index()
+        target = index.turns.get(turn)
+        if target is None:
+            return None
+
+        snapshot = index.snapshot_before(target)
+        if self.game is None or not snapshot <= self._replayed <= target:
+            self.info = dict(index.info)
+            self._start_game()
+            self.manager.apply_delta_state(index.state(snapshot))
+            self._replayed = snapshot
+
+        if self._replayed < target:
+            for offset, delta in self._frames_from(index.offsets[self._replayed + 1]):
+                self.manager.apply_delta_state(delta['game'])
+                self._replayed += 1
+                if self._replayed == target:
+                    break
+
+        return self.game
+
+    # creates the game to replay the deltas into, once the gamelog's name and
+    # constants have been read
+    def _start_game(self):
+        game_name = self.info.get('gameName')
+        if game_name is None or 'constants' not in self.info:
+            error_code.handle_error(
+                error_code.MALFORMED_JSON,
+                message='The gamelog {} has deltas before its gameName and constants.'.format(self.path))
+
+        module_name = 'games.' + camel_case_converter(game_name)
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError as e:
+            error_code.handle_error(
+                error_code.GAME_NOT_FOUND, e,
+                'Could not import the game module "{}".'.format(module_name))
+
+        self.game = module.Game()
+        self.manager = GameManager(self.game)
+        self.manager.set_constants(self.info['constants'])
+        self._replayed = -1
+
+    # reads the gamelog, filling in info, and yields each delta with where it
+    # starts in the decompressed stream, calling starting (if given) before
+    # the first
+    def _frames(self, starting=None):
+        self.info = {}
+        with self._open() as file:
+            reader = _Reader(file, self.chunk_size, self.path)
+            reader.expect('{')
+            if reader.peek() == '}':
+                return
+
+            while True:
+                key = reader.value()
+                reader.expect(':')
+                if key != 'deltas':
+                    self.info[key] = reader.value()
+                    if reader.expect(',}') == '}':
+                        break
+                    continue
+
+                if starting:
+                    starting()
+
+                reader.expect('[')
+                if reader.peek() == ']':
+                    reader.expect(']')
+                else:
+                    yield from _elements(reader)
+
+                if reader.expect(',}') == '}':
+                    break
+
+    # yields each delta from the one starting at an offset, as _frames does
+    def _frames_from(self, offset):
+        with self._open(offset) as file:
+            yield from _elements(_Reader(file, self.chunk_size, self.path, offset))
+
+    # opens the gamelog as text, from an offset in decompressed bytes, which
+    # for gzipped gamelogs means inflating (but not parsing) up to it
+    def _open(self, offset=0):
+        binary = gzip.open(self.path, 'rb') if self.path.endswith('.gz') else open(self.path, 'rb')
+        if offset:
+            binary.seek(offset)
+
+        return io.TextIOWrapper(binary, encoding='utf-8', newline='')
+
+
+class GamelogIndex():
+    """Where each delta of a gamelog starts in it, which delta each turn
+    starts at, and snapshots of the state every so many turns: the state
+    after the first delta, and for later ones what changed since it. The
+    states are kept as deltas, as the game server sends them, pickled and
+    compressed, and only read when restored.
+
+    Saved as a pickle of its fields followed by its snapshots, along with
+    the size and modified time of the gamelog, so it is rebuilt if the
+    gamelog changes.
+    """
+
+    def __init__(self, gamelog, every, info, offsets, turns, snapshots):
+        """Holds an index, which is built or loaded rather than made directly.
+
+        Args:
+            gamelog (tuple): the size and modified time of the gamelog
+            every (int): how many turns apart the snapshots are
+            info (dict): the fields of the gamelog other than its deltas
+            offsets (array): where each delta starts, in decompressed bytes
+            turns (dict): the number of the delta each turn starts at
+            snapshots (dict): by the number of the delta it is after, each
+                snapshot, compressed, or its (position, length) in the file
+        """
+        self.gamelog = gamelog
+        self.every = every
+        self.info = info
+        self.offsets = offsets
+        self.turns = turns
+
+        self._snapshots = snapshots
+        self._numbers = sorted(snapshots)  # of the deltas with snapshots
+        self._file_path = None  # where the snapshots are read from, if saved
+
+    @classmethod
+    def build(cls, gamelog, every=SNAPSHOT_EVERY):
+        """Builds the index of a gamelog, reading it once. The state is
+        merged from the deltas as plain dicts, so no game is made.
+
+        Args:
+            gamelog (Gamelog): the gamelog
+            every (int): how many turns apart the snapshots are
+
+        Returns:
+            GamelogIndex: the index
+        """
+        stat = _stat(gamelog.path)  # before reading, so changes while it is are caught
+        offsets = array.array('q')
+        turns = {}
+        snapshots = {}
+        state = {}
+        first = {}  # the state after the first delta, snapshots are from
+        turn = None
+        snapshot_turn = None
+        for number, (offset, delta) in enumerate(gamelog._frames()):
+            if number == 0:
+                removed, list_length = _markers(gamelog.info)
+                _merge_state(first, delta['game'], removed, list_length)
+
+            offsets.append(offset)
+            _merge_state(state, delta['game'], removed, list_length)
+
+            current_turn = state.get('currentTurn')
+            if number == 0 or current_turn != turn:  # as turns() yields
+                turn = current_turn
+                turns.setdefault(turn, number)
+                if number == 0:
+                    snapshot_turn = turn
+                    snapshots[number] = zlib.compress(
+                        pickle.dumps(first, pickle.HIGHEST_PROTOCOL))
+                elif turn >= snapshot_turn + every:
+                    snapshot_turn = turn
+                    changed = _diff_state(first, state, removed, list_length)
+                    snapshots[number] = zlib.compress(
+                        pickle.dumps(changed, pickle.HIGHEST_PROTOCOL))
+
+        return cls(stat, every, dict(gamelog.info), offsets, turns, snapshots)
+
+    @classmethod
+    def load(cls, index_path, gamelog_path, every=SNAPSHOT_EVERY):
+        """Loads a saved index, without its snapshots.
+
+        Args:
+            index_path (str): where the index was saved
+            gamelog_path (str): the gamelog it must be the index of
+            every (int): how many turns apart its snapshots must be
+
+        Returns:
+            GamelogIndex: the index, or None if there is none saved for this
+            version of the gamelog with snapshots that far apart
+        """
+        try:
+            with open(index_path, 'rb') as file:
+                fields = pickle.load(file)
+                start = file.tell()
+                size = os.fstat(file.fileno()).st_size
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+        if (not isinstance(fields, dict) or fields.get('version') != INDEX_VERSION or
+                fields['gamelog'] != _stat(gamelog_path) or fields['every'] != every or
+                start + sum(length for number, length in fields['snapshots']) != size):
+            return None  # or one cut off before all of its snapshots
+
+        snapshots = {}
+        for number, length in fields['snapshots']:
+            snapshots[number] = (start, length)
+            start += length
+
+        index = cls(fields['gamelog'], every, fields['info'], fields['offsets'], fields['turns'], snapshots)
+        index._file_path = index_path
+        return index
+
+    def save(self, index_path):
+        """Saves the index, for GamelogIndex.load to load, via a
+        temporary file, so an index being saved is never loaded. An index
+        that can not be saved, e.g. beside a read only gamelog, is still used,
+        just built again next time.
+
+        Args:
+            index_path (str): where to save it
+        """
+        snapshots = [self._snapshot_data(number) for number in self._numbers]
+        fields = {
+            'version': INDEX_VERSION,
+            'gamelog': self.gamelog,
+            'every': self.every,
+            'info': self.info,
+            'offsets': self.offsets,
+            'turns': self.turns,
+            'snapshots': [(number, len(data)) for number, data in zip(self._numbers, snapshots)]
+        }
+
+        temporary_path = '{}.{}.tmp'.format(index_path, os.getpid())
+        try:
+            with open(temporary_path, 'wb') as file:
+                pickle.dump(fields, file, pickle.HIGHEST_PROTOCOL)
+                for data in snapshots:
+                    file.write(data)
+            os.replace(temporary_path, index_path)
+        except OSError as e:
+            try:
+                os.remove(temporary_path)
+            except OSError:
+                pass
+
+            print(color.text('yellow') + 'Could not save the gamelog index ' +
+                  '{}: {}'.format(index_path, e) + color.reset())
+
+    def snapshot_before(self, number):
+        """Finds the nearest snapshot to restore to get to the state after a
+        delta.
+
+        Args:
+            number (int): the number of the delta, from 0
+
+        Returns:
+            int: the number of the delta the snapshot is after, at most number
+        """
+        return self._numbers[bisect.bisect_right(self._numbers, number) - 1]
+
+    def state(self, number):
+        """Gets the state a snapshot is of, reading it from the saved index if
+        need be.
+
+        Args:
+            number (int): the number of the delta the snapshot is after
+
+        Returns:
+            dict: the state after that delta, as a delta taking a new game to
+            it, as the game server's first delta does
+        """
+        state = pickle.loads(zlib.decompress(self._snapshot_data(0)))
+        if number:
+            changed = pickle.loads(zlib.decompress(self._snapshot_data(number)))
+            _merge_state(state, changed, *_markers(self.info))
+
+        return state
+
+    # the pickled and compressed snapshot after a delta
+    def _snapshot_data(self, number):
+        snapshot = self._snapshots[number]
+        if isinstance(snapshot, bytes):
+            return snapshot
+
+        position, length = snapshot
+        with open(self._file_path, 'rb') as file:
+            file.seek(position)
+            return file.read(length)
+
+
+# what deltas of a gamelog mark removed keys and the lengths of lists with
+def _markers(info):
+    constants = info.get('constants') or {}
+    return constants.get('DELTA_REMOVED', '&RM'), constants.get('DELTA_LIST_LENGTH', '&LEN')
+
+
+# identifies a version of a file, by its size and when it was last modified
+def _stat(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+# merges a delta into a state of plain dicts, as a GameManager merges one into
+# a game, keeping the state a delta itself: lists as dicts of their indexes
+# and length, and game objects as references by id
+def _merge_state(state, delta, removed, list_length):
+    for key, value in delta.items():
+        if value.__class__ is dict and not (len(value) == 1 and 'id' in value):
+            current = state.get(key)
+            if current.__class__ is not dict or (len(current) == 1 and 'id' in current):
+                current = state[key] = {}
+
+            length = value.get(list_length)
+            if length is not None:
+                for index in range(length, current.get(list_length, 0)):
+                    current.pop(str(index), None)
+
+            _merge_state(current, value, removed, list_length)
+        elif value == removed:
+            state.pop(key, None)
+        else:
+            state[key] = value
+
+
+# the delta taking one state of plain dicts, as _merge_state merges, to another
+def _diff_state(old, new, removed, list_length):
+    delta = {}
+    for key, value in new.items():
+        old_value = old.get(key)
+        if (value.__class__ is dict and not (len(value) == 1 and 'id' in value) and
+                old_value.__class__ is dict and not (len(old_value) == 1 and 'id' in old_value)):
+            changed = _diff_state(old_value, value, removed, list_length)
+            if changed:
+                delta[key] = changed
+        elif key not in old or value != old_value:
+            delta[key] = value
+
+    if list_length not in new:  # lists shrink via their length instead
+        for key in old:
+            if key not in new:
+                delta[key] = removed
+
+    return delta
+
+
+# yields the rest of the elements of an array, with their offsets, and its end
+def _elements(reader):
+    while True:
+        offset = reader.offset()
+        yield offset, reader.value()
+        if reader.expect(',]') == ']':
+            return
+
+
+# _Reader: reads the JSON values of a stream one at a time, a chunk of it at
+# a time, so only the values being read are held in memory
+class _Reader():
+    def __init__(self, file, chunk_size, path, offset=0):
+        self._file = file
+        self._chunk_size = chunk_size
+        self._path = path
+        self._buffer = ''
+        self._position = 0  # where the next value starts in the buffer
+        self._bytes = offset  # the offset in the stream, in bytes, of _counted
+        self._counted = 0  # where in the buffer _bytes is up to
+
+    def offset(self):
+        """Gets where the next value starts in the stream, after whitespace.
+
+        Returns:
+            int: the offset, in decompressed bytes from the start
+        """
+        self._skip_whitespace()
+        self._count()
+        return self._bytes
+
+    def peek(self):
+        self._skip_whitespace()
+        return self._buffer[self._position:self._position + 1]
+
+    def expect(self, characters):
+        """Reads one of the expected characters, e.g. the ':' after a key.
+
+        Args:
+            characters (str): the characters that can come next
+
+        Returns:
+            str: the one read
+        """
+        character = self.peek()
+        if not character or character not in characters:
+            self._malformed('Expected one of "{}", got "{}"'.format(characters, character))
+
+        self._position += 1
+        return character
+
+    def value(self):
+        """Reads the next value.
+
+        Returns:
+            the value, as json.loads would
+        """
+        self._skip_whitespace()
+        self._compact()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._position)
+            except ValueError:
+                # most likely cut off by the end of what was read, so read as
+                # much again, which keeps retries of big values linear
+                if not self._read(len(self._buffer)):
+                    self._malformed('Invalid or incomplete value')
+                continue
+
+            # a number cut off by the end of what was read parses as a shorter
+            # one, e.g. "12." of "12.5" as 12, so it only ends before what can
+            # follow a number, or at the end of the stream
+            if ((value.__class__ is int or value.__class__ is float) and
+                    (end == len(self._buffer) or self._buffer[end] not in _after_number) and
+                    self._read()):
+                continue
+
+            self._position = end
+            return value
+
+    # reads at least another chunk into the buffer, returning False at the end
+    def _read(self, size=0):
+        chunk = self._file.read(max(size, self._chunk_size))
+        self._buffer += chunk
+        return len(chunk) > 0
+
+    def _skip_whitespace(self):
+        while True:
+            self._position = _whitespace.match(self._buffer, self._position).end()
+            if self._position < len(self._buffer) or not self._read():
+                return
+
+    # counts the bytes of what was read, up to the position
+    def _count(self):
+        self._bytes += len(self._buffer[self._counted:self._position].encode('utf-8'))
+        self._counted = self._position
+
+    # drops what was read, once it is most of the buffer
+    def _compact(self):
+        if self._position > self._chunk_size and self._position * 2 > len(self._buffer):
+            self._count()
+            self._buffer = self._buffer[self._position:]
+            self._position = 0
+            self._counted = 0
+
+    def _malformed(self, why):
+        error_code.handle_error(
+            error_code.MALFORMED_JSON,
+            message='{} at byte {} of the gamelog {}.'.format(why, self.offset(), self._path))
@@ -0,0 +1,363 @@
+# Pathfinding: shortest path searches over the tiles of a game, by tile index
+# (x + y * map_width), given the indexes next to each index as a list of
+# tuples, which Pathfinder builds from the adjacency from joueur.tile_graph.
+# Every search returns the path the way the AIs' find_path always has: the
+# indexes after start up to and including goal, or [] if start is goal or there
+# is no path. Tiles in between must be passable; start and goal need not be.
+import heapq
+from collections import deque
+from joueur.tile_graph import adjacency
+
+
+def bfs(adjacent, start, goal, passable=None):
+    """Breadth first search, finding a path with the fewest steps.
+
+    Args:
+        adjacent (list[tuple[int]]): the indexes next to each index
+        start (int): the index to start from
+        goal (int): the index to find a path to
+        passable (function): called with an index, True if paths can go
+            through it, or None if they can go through anything
+
+    Returns:
+        list[int]: the indexes of the path, without start
+    """
+    if start == goal:
+        return []
+
+    came_from = [-1] * len(adjacent)  # -1 until reached
+    came_from[start] = start
+    fringe = deque([start])
+    while fringe:
+        inspect = fringe.popleft()
+        for neighbor in adjacent[inspect]:
+            if neighbor == goal:
+                came_from[goal] = inspect
+                return _retrace(came_from, start, goal)
+
+            if came_from[neighbor] < 0 and (passable is None or passable(neighbor)):
+                came_from[neighbor] = inspect
+                fringe.append(neighbor)
+
+    return []
+
+
+def a_star(adjacent, width, start, goal, passable=None):
+    """A* search, guided towards goal by the Manhattan distance, finding a
+    path with the fewest steps while usually exploring less than bfs.
+
+    Args:
+        adjacent (list[tuple[int]]): the indexes next to each index
+        width (int): the width of the map, to get positions from indexes
+        start (int): the index to start from
+        goal (int): the index to find a path to
+        passable (function): called with an index, True if paths can go
+            through it, or None if they can go through anything
+
+    Returns:
+        list[int]: the indexes of the path, without start
+    """
+    if start == goal:
+        return []
+
+    goal_x, goal_y = goal % width, goal // width
+    came_from = [-1] * len(adjacent)
+    came_from[start] = start
+    steps = [len(adjacent)] * len(adjacent)  # more than any path could take
+    steps[start] = 0
+    fringe = [(0, 0, start)]
+    pushed = 0  # breaks ties by the order pushed, so paths are stable
+    while fringe:
+        _, _, inspect = heapq.heappop(fringe)
+        if inspect == goal:
+            return _retrace(came_from, start, goal)
+
+        neighbor_steps = steps[inspect] + 1
+        for neighbor in adjacent[inspect]:
+            if neighbor_steps < steps[neighbor] and (
+                    neighbor == goal or passable is None or passable(neighbor)):
+                came_from[neighbor] = inspect
+                steps[neighbor] = neighbor_steps
+                pushed += 1
+                estimate = abs(neighbor % width - goal_x) + abs(neighbor // width - goal_y)
+                heapq.heappush(fringe, (neighbor_steps + estimate, pushed, neighbor))
+
+    return []
+
+
+def bidirectional(adjacent, start, goal, passable=None):
+    """Breadth first search from both start and goal at once, meeting in the
+    middle, finding a path with the fewest steps while exploring far less
+    than bfs when the path is long.
+
+    Args:
+        adjacent (list[tuple[int]]): the indexes next to each index, which
+            must go both ways, as tiles' links do
+        start (int): the index to start from
+        goal (int): the index to find a path to
+        passable (function): called with an index, True if paths can go
+            through it, or None if they can go through anything
+
+    Returns:
+        list[int]: the indexes of the path, without start
+    """
+    if start == goal:
+        return []
+
+    # how each side got to each index it reached, and the indexes it reached
+    # last, which are expanded a whole level at a time
+    came_from = ([-1] * len(adjacent), [-1] * len(adjacent))
+    came_from[0][start] = start
+    came_from[1][goal] = goal
+    fringes = ([start], [goal])
+    ends = (goal, start)
+    while fringes[0] and fringes[1]:
+        side = 0 if len(fringes[0]) <= len(fringes[1]) else 1
+        reached, other_reached = came_from[side], came_from[1 - side]
+        end = ends[side]
+
+        meeting = None
+        fringe = []
+        for inspect in fringes[side]:
+            for neighbor in adjacent[inspect]:
+                if reached[neighbor] >= 0:
+                    continue
+
+                if neighbor != end and passable is not None and not passable(neighbor):
+                    continue
+
+                reached[neighbor] = inspect
+                fringe.append(neighbor)
+                if meeting is None and other_reached[neighbor] >= 0:
+                    meeting = neighbor
+
+        if meeting is not None:
+            # every index of this level is as far from this side, so the first
+            # reached by both is on a shortest path
+            path = _retrace(came_from[0], start, meeting)
+            index = meeting
+            while index != goal:
+                index = came_from[1][index]
+                path.append(index)
+
+            return path
+
+        fringes = (fringe, fringes[1]) if side == 0 else (fringes[0], fringe)
+
+    return []
+
+
+def distances(adjacent, sources, passable=None):
+    """Breadth first search from many indexes at once, finding how many
+    steps every index is from the nearest of them, e.g. how far every tile
+    is from the nearest unit, or, from one goal, how far every unit is from
+    it.
+
+    Args:
+        adjacent (list[tuple[int]]): the indexes next to each index, which
+            must go both ways, as tiles' links do
+        sources (list[int]): the indexes to measure from
+        passable (function): called with an index, True if paths can go
+            through it, or None if they can go through anything
+
+    Returns:
+        list[int]: for each index, the steps of the shortest path from it to
+        the nearest source (as len(bfs(...)) would be), or -1 if none can be
+        reached
+    """
+    steps = [-1] * len(adjacent)
+    fringe = deque()
+    for source in sources:
+        if steps[source] < 0:
+            steps[source] = 0
+            fringe.append(source)
+
+    while fringe:
+        inspect = fringe.popleft()
+        inspect_steps = steps[inspect]
+        if inspect_steps > 0 and passable is not None and not passable(inspect):
+            continue  # paths can end here, but not go through it
+
+        for neighbor in adjacent[inspect]:
+            if steps[neighbor] < 0:
+                steps[neighbor] = inspect_steps + 1
+                fringe.append(neighbor)
+
+    return steps
+
+
+# follows how each index was reached back from goal to start
+def _retrace(came_from, start, goal):
+    path = []
+    index = goal
+    while index != start:
+        path.append(index)
+        index = came_from[index]
+    path.reverse()
+
+    return path
+
+
+# the searches by name, for Pathfinder.find_path
+_searches = {
+    'bfs': lambda self, start, goal, passable: bfs(self.adjacent, start, goal, passable),
+    'a_star': lambda self, start, goal, passable: a_star(self.adjacent, self.width, start, goal, passable),
+    'bidirectional': lambda self, start, goal, passable: bidirectional(self.adjacent, start, goal, passable)
+}
+
+
+class Pathfinder():
+    """Finds paths between the tiles of a game, building its adjacency once.
+    AIs get one for their game via their pathfinder property.
+
+    Example:
+        path = self.pathfinder.find_path(unit.tile, goal, lambda tile: tile.unit is None)
+    """
+
+    # the most distance fields cached at once
+    max_cached = 64
+
+    def __init__(self, game, changes=None, watch=None):
+        """Builds the adjacency of the game's tiles.
+
+        Args:
+            game (BaseGame): a game with tiles, after its first state
+            changes (joueur.changes.Changes): the changes of the game, to
+                know when distance fields cached must be found again, or None
+                to only do so via clear()
+            watch (list[str]): the fields of tiles whose changes clear the
+                distance fields cached, by default every one holding what is
+                on the tile, e.g. 'unit' and 'tower'
+        """
+        self.tiles = game.tiles
+        self.width = game.map_width
+        self._distances = {}  # (source indexes, passable) -> steps
+        self._tile_class = game._game_object_classes['Tile']
+
+        if changes is not None:
+            for field in watch or self._contents():
+                changes.subscribe(self._tile_class, field, self._moved)
+
+        # as tuples, which are much faster to loop over than slices of arrays
+        offsets, neighbors = adjacency(game)
+        self.adjacent = [
+            tuple(neighbors[offsets[i]:offsets[i + 1]])
+            for i in range(len(offsets) - 1)
+        ]
+
+    def index(self, tile):
+        """Gets the index of a tile, as the searches use.
+
+        Args:
+            tile (Tile): the tile
+
+        Returns:
+            int: x + y * map_width
+        """
+        return tile.x + tile.y * self.width
+
+    def find_path(self, start, goal, passable=None, search='bfs'):
+        """Finds a path with the fewest steps between two tiles.
+
+        Args:
+            start (Tile): the tile to start from
+            goal (Tile): the tile to find a path to
+            passable (function): called with a Tile, True if paths can go
+                through it, by default the tile's is_pathable()
+            search (str): how to search, 'bfs', 'a_star', or 'bidirectional'
+
+        Returns:
+            list[Tile]: the path, the first element being a tile next to
+            start and the last being goal, or empty if there is no path
+        """
+        tiles = self.tiles
+        if passable is None:
+            passable = lambda tile: tile.is_pathable()
+
+        path = _searches[search](
+            self, self.index(start), self.index(goal),
+            lambda index: passable(tiles[index])
+        )
+
+        return [tiles[index] for index in path]
+
+    def distances(self, sources, passable=None):
+        """Finds how many steps every tile is from the nearest of some tiles,
+        via one search from all of them at once. Cached until what is on a
+        tile changes, e.g. a unit moves, so asking again is free, as long as
+        passable is the same function (e.g. a method, not a new lambda).
+
+        Args:
+            sources (list[Tile] or Tile): the tiles to measure from
+            passable (function): called with a Tile, True if paths can go
+                through it, by default the tile's is_pathable()
+
+        Returns:
+            list[int]: by tile index, the steps of the shortest path from that
+            tile to the nearest source (as len(find_path(...)) would be), or
+            -1 if none can be reached
+        """
+        if not isinstance(sources, (list, tuple, set)):
+            sources = [sources]
+
+        key = (tuple(sorted(self.index(tile) for tile in sources)), passable)
+        steps = self._distances.get(key)
+        if steps is None:
+            tiles = self.tiles
+            if passable is None:
+                passable = lambda tile: tile.is_pathable()
+
+            steps = distances(self.adjacent, key[0], lambda index: passable(tiles[index]))
+
+            if len(self._distances) >= self.max_cached:
+                del self._distances[next(iter(self._distances))]  # the oldest
+            self._distances[key] = steps
+
+        return steps
+
+    def nearest(self, goal, candidates, passable=None):
+        """Finds which of some units (or tiles) has the shortest path to a
+        tile, via one search from the tile.
+
+        Args:
+            goal (Tile): the tile to get to
+            candidates (list): units, or anything else with a tile, or tiles
+            passable (function): called with a Tile, True if paths can go
+                through it, by default the tile's is_pathable()
+
+        Returns:
+            the candidate nearest to goal, the first one if tied, or None if
+            none can reach it
+        """
+        steps = self.distances(goal, passable)
+        best = None
+        best_steps = -1
+        for candidate in candidates:
+            tile = candidate if isinstance(candidate, self._tile_class) else candidate.tile
+            candidate_steps = steps[self.index(tile)] if tile else -1
+            if candidate_steps >= 0 and (best is None or candidate_steps < best_steps):
+                best = candidate
+                best_steps = candidate_steps
+
+        return best
+
+    def clear(self):
+        """Forgets the distance fields cached, e.g. after changing what
+        passable functions return.
+        """
+        self._distances = {}
+
+    # the fields holding what is on a tile, which paths usually depend on
+    def _contents(self):
+        defaults = self._tile_class()
+        return [
+            name for name, value in vars(self._tile_class).items()
+            if isinstance(value, property) and not name.startswith('tile_')
+            and '_' + name in self._tile_class.__slots__
+            and getattr(defaults, name) is None
+        ]
+
+    # called when what is on a tile changes
+    def _moved(self, tile, old, new):
+        if self._distances:
+            self._distances = {}
@@ -1,22 +1,143 @@
 import importlib.util
+import inspect
 import joueur.client
+import joueur.serializer
 import sys
 import joueur.error_code as error_code
+from joueur.async_client import AsyncClient
 from joueur.game_manager import GameManager
 from joueur.utilities import camel_case_converter
 import joueur.ansi_color_coder as color
 
 
-def run(args):
+def run(args, client=None, transport=None, ai_class=None):
+    """Plays a game with the AI until it is over.
+
+    Args:
+        args (argparse.Namespace): the parsed arguments from main.py
+        client (joueur.client.Client): the client to play with, a new one by
+            default. Each game played at once, e.g. on threads, needs its own
+        transport: what to play over instead of connecting to args.server,
+            e.g. a joueur.transport.LoopbackTransport
+        ai_class (class): the AI to play with, the game's AI by default
+
+    Returns:
+        BaseAI: the AI that played, whose player has if it won and why
+    """
+    _parse_args(args)
+
+    client = client or joueur.client.Client()
+    token = joueur.client.use(client)
+    try:
+        if transport is None:
+            client.connect(args.server, args.port, args.print_io,
+                           args.recv_buffer, args.no_delay, args.compress)
+        else:
+            client.attach(transport, args.print_io)
+
+        client.send("alias", args.game)
+        game_name = client.wait_for_event("named")
+
+        module, game, ai, manager = _load_game(game_name, ai_class)
+
+        client.setup(game, ai, manager)
+
+        ai.set_settings(args.ai_settings)
+
+        client.send("play", _play_data(args, game_name, ai))
+
+        lobby_data = client.wait_for_event("lobbied")
+
+        _lobbied(module, manager, lobby_data)
+
+        start_data = client.wait_for_event("start")
+
+        starting = _start(game, ai, start_data)
+        if starting:
+            client._run(starting)
+
+        client.play()
+    finally:
+        client.close()
+        joueur.client.reset(token)
+
+    return ai
+
+
+async def run_async(args, client=None, transport=None, ai_class=None):
+    """Plays a game the same way as run(), but on the running asyncio event
+    loop, so several games (or other work) can share it. The AI's methods
+    may be coroutine functions (async def), which are awaited, and should
+    await the game functions they call, e.g. `await unit.move(tile)`.
+
+    Args:
+        args (argparse.Namespace): the parsed arguments from main.py
+        client (AsyncClient): the client to play with, a new one by default
+        transport: what to play over instead of connecting to args.server,
+            e.g. a joueur.transport.LoopbackTransport
+        ai_class (class): the AI to play with, the game's AI by default
+
+    Returns:
+        BaseAI: the AI that played, whose player has if it won and why
+    """
+    _parse_args(args)
+
+    client = client or AsyncClient()
+    token = joueur.client.use(client)
+    try:
+        if transport is None:
+            await client.connect(args.server, args.port, args.print_io,
+                                 args.recv_buffer, args.no_delay,
+                                 args.compress)
+        else:
+            await client.attach(transport, args.print_io)
+
+        client.send("alias", args.game)
+        game_name = await client.wait_for_event("named")
+
+        module, game, ai, manager = _load_game(game_name, ai_class)
+
+        client.setup(game, ai, manager)
+
+        ai.set_settings(args.ai_settings)
+
+        client.send("play", _play_data(args, game_name, ai))
+
+        lobby_data = await client.wait_for_event("lobbied")
+
+        _lobbied(module, manager, lobby_data)
+
+        start_data = await client.wait_for_event("start")
+
+        starting = _start(game, ai, start_data)
+        if starting:
+            await starting
+
+        await client.play()
+    finally:
+        client.disconnect()
+        joueur.client.reset(token)
+
+    return ai
+
+
+def _parse_args(args):
     split_server = args.server.split(":")
     args.server = split_server[0]
     args.port = int((len(split_server) == 2 and split_server[1])) or args.port
 
-    joueur.client.connect(args.server, args.port, args.print_io)
+    if args.json_codec:
+        try:
+            joueur.serializer.set_json_codec(args.json_codec)
+        except ImportError as e:
+            error_code.handle_error(
+                error_code.INVALID_ARGS,
+                e,
+                'JSON codec "{}" is not installed.'.format(args.json_codec)
+            )
 
-    joueur.client.send("alias", args.game)
-    game_name = joueur.client.wait_for_event("named")
 
+def _load_game(game_name, ai_class=None):
     module_str = "games." + camel_case_converter(game_name)
 
     spec = importlib.util.find_spec(module_str)
@@ -39,7 +160,7 @@ def run(args):
 
     game = module.Game()
     try:
-        ai = module.AI(game)
+        ai = (ai_class or module.AI)(game)
     except:
         error_code.handle_error(
             error_code.AI_ERRORED,
@@ -49,12 +170,13 @@ def run(args):
         )
 
     manager = GameManager(game)
+    ai.set_changes(manager.changes)
 
-    joueur.client.setup(game, ai, manager)
+    return module, game, ai, manager
 
-    ai.set_settings(args.ai_settings)
 
-    joueur.client.send("play", {
+def _play_data(args, game_name, ai):
+    return {
         'gameName': game_name,
         'password': args.password,
         'requestedSession': args.session,
@@ -62,10 +184,10 @@ def run(args):
         'playerName': args.name or ai.get_name() or "Python Player",
         'playerIndex': args.index,
         'gameSettings': args.game_settings
-    })
+    }
 
-    lobby_data = joueur.client.wait_for_event("lobbied")
 
+def _lobbied(module, manager, lobby_data):
     if lobby_data['gameVersion'] != module.game_version:
         print("""{}WARNING: Game versions do not match.
 -> Your local game version is:     {}
@@ -89,13 +211,18 @@ Version mismatch means that unexpected crashes may happen due to differing game
 
     manager.set_constants(lobby_data['constants'])
 
-    start_data = joueur.client.wait_for_event("start")
 
+# starts the AI, returning an awaitable if its start or game_updated are
+# coroutine functions
+def _start(game, ai, start_data):
     print(color.text("green") + "Game is starting." + color.reset())
 
     ai.set_player(game.get_game_object(start_data['playerID']))
     try:
-        ai.start()
+        started = ai.start()
+        if inspect.isawaitable(started):
+            return _start_async(ai, started)
+
         ai.game_updated()
     except:
         error_code.handle_error(
@@ -104,4 +231,16 @@ Version mismatch means that unexpected crashes may happen due to differing game
             'AI errored during game initialization'
         )
 
-    joueur.client.play()
+
+async def _start_async(ai, started):
+    try:
+        await started
+        updated = ai.game_updated()
+        if inspect.isawaitable(updated):
+            await updated
+    except:
+        error_code.handle_error(
+            error_code.AI_ERRORED,
+            sys.exc_info()[0],
+            'AI errored during game initialization'
+        )
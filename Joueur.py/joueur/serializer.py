@@ -1,6 +1,64 @@
 # Serializer: functions to serialize and unserialize json communication strings
+import importlib
+import json
 from joueur.base_game_object import BaseGameObject
 
+# JSON codecs that can encode and decode the wire protocol, by preference.
+# Each one dumps to utf-8 bytes and loads straight from bytes, so frames never
+# need to be decoded to a str first.
+_json_codecs = {
+    'orjson': lambda m: (m.dumps, m.loads),
+    'ujson': lambda m: (
+        lambda obj: m.dumps(obj, ensure_ascii=False).encode('utf-8'),
+        m.loads
+    ),
+    'rapidjson': lambda m: (
+        lambda obj: m.dumps(obj, ensure_ascii=False).encode('utf-8'),
+        m.loads
+    ),
+    'json': lambda m: (
+        lambda obj: m.dumps(obj, separators=(',', ':')).encode('utf-8'),
+        m.loads
+    )
+}
+_json_codec_preference = ['orjson', 'ujson', 'rapidjson', 'json']
+
+json_codec_name = None
+dumps = None
+loads = None
+
+
+def set_json_codec(name=None):
+    """Sets the JSON library used to talk to the server.
+
+    Args:
+        name (str): the module to use (orjson, ujson, rapidjson, or json),
+            None for the fastest one installed
+
+    Returns:
+        str: the name of the codec now in use
+    """
+    global json_codec_name, dumps, loads
+
+    if name and name not in _json_codecs:
+        raise ValueError('Unknown JSON codec "{}", expected one of {}'.format(
+            name, ', '.join(_json_codec_preference)))
+
+    for codec_name in [name] if name else _json_codec_preference:
+        try:
+            module = json if codec_name == 'json' else (
+                importlib.import_module(codec_name))
+        except ImportError:
+            if name:
+                raise
+            continue
+
+        dumps, loads = _json_codecs[codec_name](module)
+        json_codec_name = codec_name
+        return json_codec_name
+
+set_json_codec()
+
 def is_game_object_reference(d):
     return (isinstance(d, dict) and len(d) == 1 and 'id' in d)
 
@@ -24,19 +82,14 @@ def serialize(data):
     return serialized
 
 def deserialize(data, game):
-    if not isinstance(data, (list, dict, BaseGameObject)):
-        return data
+    data_type = data.__class__
+    if data_type is dict:
+        if len(data) == 1 and 'id' in data: # a game object reference
+            return game.get_game_object(data['id'])
 
-    if is_game_object_reference(data):
-        return game.get_game_object(data['id'])
+        return {key: deserialize(value, game) for key, value in data.items()}
 
-    # else if we got here it's a list or dict
-    deserialized = [None] * len(data) if isinstance(data, list) else {}
-    seq_iter = data.items if isinstance(data, dict) else enumerate(data)
-    for key, value in seq_iter:
-        if is_object(value):
-            deserialized[key] = deserialize(value, game)
-        else:
-            deserialized[key] = value
+    if data_type is list:
+        return [deserialize(value, game) for value in data]
 
-    return deserialized
+    return data
@@ -0,0 +1,33 @@
+# Tile graph: the links between the tiles of a game as flat arrays of ints, for
+# graph algorithms that work on tile indexes (x + y * map_width, the same as
+# game.tiles) instead of walking Tile objects
+from array import array
+
+
+def adjacency(game):
+    """Builds the adjacency of a game's tiles in compressed sparse row form.
+    The links between tiles never change during a game, so build it once,
+    e.g. in start().
+
+    Example:
+        offsets, neighbors = adjacency(self.game)
+        for n in neighbors[offsets[i]:offsets[i + 1]]:
+            ...
+
+    Args:
+        game (BaseGame): a game with tiles, after its first state
+
+    Returns:
+        tuple[array.array, array.array]: offsets, with one more entry than
+        there are tiles, and neighbors, where the indexes of the neighbors of
+        the tile at index i are neighbors[offsets[i]:offsets[i + 1]]
+    """
+    width = game.map_width
+    offsets = array('l', [0])
+    neighbors = array('l')
+    for tile in game.tiles:
+        if tile is not None:
+            neighbors.extend(n.x + n.y * width for n in tile.neighbors)
+        offsets.append(len(neighbors))
+
+    return offsets, neighbors
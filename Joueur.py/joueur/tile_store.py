@@ -0,0 +1,179 @@
+# TileStore: an optional columnar mirror of a tile game's map, one NumPy array
+# per field of its tiles indexed like game.tiles (x + y * map_width), so whole
+# map questions are answered with vectorized array operations instead of
+# walking every Tile through its properties.
+# Needs numpy, which is optional: pip install numpy
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TileStore():
+    """The fields of every tile of a game as arrays, kept in sync as deltas
+    are merged via subscriptions to the game's changes.
+
+    Scalar fields are stored as their type (bool, int, float, or str as
+    objects), and references to game objects as the game object's id as an
+    int, or -1 for None. Lists, dicts, and the tile_* links to neighbors are
+    not stored.
+
+    Example:
+        # in start(), once the game has its tiles
+        self.tile_store = TileStore(self.game, self.changes)
+
+        # then in game_updated() or run_turn()
+        store = self.tile_store
+        corpse_tiles = store.tiles(store['corpses'] > 0)
+        near_path = store.tiles(store['is_path'] & store.near(x, y, 3))
+        mine = store.tiles(store['owner'] == int(self.player.id))
+    """
+
+    def __init__(self, game, changes, fields=None):
+        """Builds the arrays from the game's tiles, and subscribes to changes
+        to keep them up to date.
+
+        Args:
+            game (BaseGame): a game with tiles, after its first state
+            changes (joueur.changes.Changes): the changes of the game, e.g.
+                the AI's changes
+            fields (list[str]): the names of the fields to store, e.g.
+                ['corpses', 'owner'], or None for all of them
+        """
+        if numpy is None:
+            raise ImportError('TileStore needs numpy, pip install numpy')
+
+        self.game = game
+        self.width = game.map_width
+        self.height = game.map_height
+        self._tiles = game.tiles
+        self._changes = changes
+        self._tile_class = game._game_object_classes['Tile']
+
+        indexes = numpy.arange(self.width * self.height)
+        self.x = indexes % self.width
+        self.y = indexes // self.width
+
+        self._columns = {}
+        self._callbacks = {}
+        defaults = self._tile_class()
+        for name in fields or self._field_names(defaults):
+            convert, dtype, empty = self._conversion(getattr(defaults, name))
+            column = numpy.full(len(indexes), empty, dtype=dtype)
+            for i, tile in enumerate(self._tiles):
+                if tile is not None:  # e.g. a list entry not yet merged, left empty
+                    column[i] = convert(getattr(tile, name))
+
+            self._columns[name] = column
+            self._callbacks[name] = self._updater(column, convert)
+            changes.subscribe(self._tile_class, name, self._callbacks[name])
+
+    def __getitem__(self, field):
+        """Gets the array of a field, e.g. store['num_zombies'].
+
+        Args:
+            field (str): the name of the field
+
+        Returns:
+            numpy.ndarray: its value for each tile, by index
+        """
+        return self._columns[field]
+
+    def __contains__(self, field):
+        return field in self._columns
+
+    def close(self):
+        """Stops keeping the arrays up to date."""
+        for name, callback in self._callbacks.items():
+            self._changes.unsubscribe(self._tile_class, name, callback)
+        self._callbacks = {}
+
+    def index(self, x, y):
+        """Gets the index of a tile in the arrays, and game.tiles.
+
+        Args:
+            x (int): the x position of the tile
+            y (int): the y position of the tile
+
+        Returns:
+            int: x + y * map_width
+        """
+        return x + y * self.width
+
+    def tiles(self, mask):
+        """Gets the tiles selected by a boolean array.
+
+        Args:
+            mask (numpy.ndarray): True for each tile to get, e.g.
+                store['corpses'] > 0
+
+        Returns:
+            list[Tile]: the tiles selected, in the order of game.tiles
+        """
+        tiles = self._tiles
+        return [tiles[i] for i in numpy.flatnonzero(mask)]
+
+    def near(self, x, y, radius):
+        """Finds the tiles within a distance of a position, the way tower
+        ranges are measured (straight line, not walking).
+
+        Args:
+            x (int): the x position to measure from
+            y (int): the y position to measure from
+            radius (float): the greatest distance to include
+
+        Returns:
+            numpy.ndarray: True for each tile within radius of (x, y)
+        """
+        return (self.x - x) ** 2 + (self.y - y) ** 2 <= radius * radius
+
+    def grid(self, field):
+        """Gets the array of a field shaped like the map.
+
+        Args:
+            field (str): the name of the field
+
+        Returns:
+            numpy.ndarray: a view of its values indexed [y, x]
+        """
+        return self._columns[field].reshape(self.height, self.width)
+
+    # the names of the fields of tiles that can be stored in arrays
+    def _field_names(self, defaults):
+        names = []
+        for klass in self._tile_class.__mro__:
+            slots = getattr(klass, '__slots__', ())
+            for name, value in vars(klass).items():
+                if (isinstance(value, property) and name not in names
+                        and '_' + name in slots
+                        and '_' + name not in self._tile_class._cached_from
+                        and not name.startswith('tile_')
+                        and name not in ('x', 'y', 'id', 'game_object_name')
+                        and not isinstance(getattr(defaults, name), (list, dict))):
+                    names.append(name)
+
+        return names
+
+    # how to store the values of a field with the given default: the function
+    # converting them, the array's dtype, and the value of empty tiles
+    def _conversion(self, default):
+        if isinstance(default, bool):
+            return bool, numpy.bool_, False
+        if isinstance(default, int):
+            return int, numpy.int64, 0
+        if isinstance(default, float):
+            return float, numpy.float64, 0.0
+        if isinstance(default, str):
+            return str, object, ''
+
+        # a reference to a game object
+        return lambda game_object: -1 if game_object is None else int(game_object.id), numpy.int64, -1
+
+    # the callback keeping a column up to date as its field changes
+    def _updater(self, column, convert):
+        width = self.width
+
+        def update(tile, old, new):
+            column[tile.x + tile.y * width] = convert(new)
+
+        return update
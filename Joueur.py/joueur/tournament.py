@@ -0,0 +1,642 @@
+# Tournament: plays AI variants against each other many times over, on every
+# core, to tell if a change made an AI better. Games are played either by the
+# game's in-process simulator (games/<game>/simulator.py) or on local game
+# servers the tournament starts itself, one per worker process. Every game is
+# written to a results file as a line of JSON as it ends, and the standings,
+# with Elo ratings and confidence intervals, are printed at the end.
+#
+# Usage (from the Joueur.py directory):
+#   python -m joueur.tournament Necrowar old=games.necrowar.ai:AI new=my_ai:AI
+#   python -m joueur.tournament Necrowar a=ai_a:AI b=ai_b:AI c=ai_c:AI \
+#       --format swiss --games 20 --backend cerveau
+import argparse
+import contextlib
+import importlib
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import threading
+import time
+import traceback
+import joueur.error_code as error_code
+from joueur.utilities import camel_case_converter
+
+# how long a game server may take to start accepting connections, in seconds
+SERVER_START_TIMEOUT = 60
+
+# the z score of the confidence intervals, 95%
+CONFIDENCE_Z = 1.96
+
+
+def parse_variant(spec):
+    """Parses the command line spec of an AI variant.
+
+    Args:
+        spec (str): [name=]module[:Class][?ai_settings], e.g.
+            'greedy=games.necrowar.ai:AI?aggression=3', the class being AI by
+            default and the name the spec without its settings
+
+    Returns:
+        dict: the variant's 'name', 'module', 'class', and 'ai_settings'
+    """
+    spec, _, ai_settings = spec.partition('?')
+    name, equals, path = spec.partition('=')
+    if not equals:
+        name, path = spec, spec
+
+    module, _, class_name = path.partition(':')
+    return {
+        'name': name,
+        'module': module,
+        'class': class_name or 'AI',
+        'ai_settings': ai_settings or None
+    }
+
+
+def round_robin(variants, games):
+    """Schedules every variant against every other one.
+
+    Args:
+        variants (list[dict]): the variants, from parse_variant
+        games (int): how many games each pair plays, the variants taking
+            turns being the first player
+
+    Returns:
+        list[tuple[dict, dict]]: the first and second player of each game
+    """
+    return schedule(list(itertools.combinations(variants, 2)), games)
+
+
+def schedule(pairings, games):
+    """Schedules the games of pairs of variants.
+
+    Args:
+        pairings (list[tuple[dict, dict]]): the pairs of variants
+        games (int): how many games each pair plays, the variants taking
+            turns being the first player
+
+    Returns:
+        list[tuple[dict, dict]]: the first and second player of each game
+    """
+    return [
+        (a, b) if game % 2 == 0 else (b, a)
+        for a, b in pairings
+        for game in range(games)
+    ]
+
+
+def swiss_pairings(variants, results, rng=random):
+    """Pairs the variants for the next round of a Swiss tournament: each
+    with the one closest to it in the standings that it has not played yet,
+    if any. With an odd number of variants the lowest one that has not had
+    a bye yet (has played the most games) has one.
+
+    Args:
+        variants (list[dict]): the variants, from parse_variant
+        results (list[dict]): the results of the games played so far
+        rng (random.Random): breaks ties in the standings
+
+    Returns:
+        list[tuple[dict, dict]]: the variants to pair
+    """
+    points = {variant['name']: 0.0 for variant in variants}
+    games = {variant['name']: 0 for variant in variants}
+    played = set()
+    for result in results:
+        names = result['players']
+        played.add(frozenset(names))
+        for name in names:
+            games[name] += 1
+        if result.get('winner') is not None:
+            points[names[result['winner']]] += 1
+
+    unpaired = sorted(variants, key=lambda v: (-points[v['name']], rng.random()))
+    if len(unpaired) % 2 == 1:
+        most = max(games.values())
+        unpaired.remove([v for v in unpaired if games[v['name']] == most][-1])
+
+    pairings = []
+    while len(unpaired) > 1:
+        variant = unpaired.pop(0)
+        opponent = next(
+            (v for v in unpaired if frozenset((variant['name'], v['name'])) not in played),
+            unpaired[0]  # everyone left has been played, so the closest
+        )
+        unpaired.remove(opponent)
+        pairings.append((variant, opponent))
+
+    return pairings
+
+
+def play_game(game_name, first, second, backend='simulator', port=None,
+              game_settings=None, seed=None, index=0):
+    """Plays one game between two variants.
+
+    Args:
+        game_name (str): the name of the game, e.g. 'Necrowar'
+        first (dict): the variant playing as the first player
+        second (dict): the variant playing as the second player
+        backend (str): 'simulator' to play in this process, or 'cerveau' to
+            play on the game server on port
+        port (int): the port of the game server, for the cerveau backend
+        game_settings (str): the game settings, query string formatted
+            (key=value&otherKey=otherValue) as via the --gameSettings flag
+        seed (int): the seed of the simulator, or None for a random one
+        index (int): the number of the game in the tournament
+
+    Returns:
+        dict: the result, the names of its 'players', the index of the
+        'winner' (None if the game errored), the 'reason' it won, how many
+        'turns' were played, and each player's 'turn_seconds' and
+        'max_turn_seconds'
+    """
+    variants = (first, second)
+    classes = [_timed(_load_class(variant)) for variant in variants]
+    result = {
+        'game': index,
+        'players': [variant['name'] for variant in variants],
+        'winner': None,
+        'reason': None,
+        'turns': 0,
+        'turn_seconds': [0.0, 0.0],
+        'max_turn_seconds': [0.0, 0.0]
+    }
+
+    start = time.perf_counter()
+    try:
+        if backend == 'simulator':
+            ais = _play_simulated(game_name, variants, classes, game_settings, seed)
+        else:
+            ais = _play_on_server(game_name, variants, classes, game_settings, port, index)
+    except Exception as e:
+        result['error'] = '{}: {}'.format(e.__class__.__name__, e)
+        return result
+
+    result['seconds'] = time.perf_counter() - start
+    for i, ai in enumerate(ais):
+        if ai.turn_seconds:
+            result['turn_seconds'][i] = sum(ai.turn_seconds) / len(ai.turn_seconds)
+            result['max_turn_seconds'][i] = max(ai.turn_seconds)
+
+        player = ai.player
+        if player and player.won:
+            result['winner'] = i
+            result['reason'] = player.reason_won
+            result['turns'] = ai.game.current_turn + 1
+
+    if result['winner'] is None:
+        result['error'] = 'No player won'
+
+    return result
+
+
+def summarize(variants, results):
+    """Sums up the results of a tournament.
+
+    Args:
+        variants (list[dict]): the variants, from parse_variant
+        results (list[dict]): the results of the games, from play_game
+
+    Returns:
+        dict: the 'standings', with the wins, losses, errors, score, Elo,
+        and mean seconds per turn of each variant, best first, and the
+        'pairs', with the score of the first of each pair against the second,
+        its confidence interval, and the difference in Elo it means
+    """
+    names = [variant['name'] for variant in variants]
+    wins = {name: {other: 0 for other in names} for name in names}
+    stats = {name: {'wins': 0, 'losses': 0, 'errors': 0, 'timed': 0, 'seconds': 0.0} for name in names}
+    for result in results:
+        players = result['players']
+        for i, name in enumerate(players):
+            if result.get('winner') is None:
+                stats[name]['errors'] += 1
+                continue
+
+            won = result['winner'] == i
+            stats[name]['wins' if won else 'losses'] += 1
+            stats[name]['timed'] += 1
+            stats[name]['seconds'] += result['turn_seconds'][i]
+            if won:
+                wins[name][players[1 - i]] += 1
+
+    ratings = _bradley_terry(names, wins)
+    standings = []
+    for name in names:
+        stat = stats[name]
+        played = stat['wins'] + stat['losses']
+        standings.append({
+            'name': name,
+            'wins': stat['wins'],
+            'losses': stat['losses'],
+            'errors': stat['errors'],
+            'score': stat['wins'] / played if played else None,
+            'elo': ratings[name],
+            'turn_seconds': stat['seconds'] / stat['timed'] if stat['timed'] else None
+        })
+    standings.sort(key=lambda standing: -standing['elo'])
+
+    pairs = []
+    for a, b in itertools.combinations([standing['name'] for standing in standings], 2):
+        played = wins[a][b] + wins[b][a]
+        if played == 0:
+            continue
+
+        low, high = _wilson(wins[a][b], played)
+        pairs.append({
+            'players': [a, b],
+            'wins': [wins[a][b], wins[b][a]],
+            'score': wins[a][b] / played,
+            'score_interval': [low, high],
+            'elo': _elo_difference(wins[a][b] / played),
+            'elo_interval': [_elo_difference(low), _elo_difference(high)]
+        })
+
+    return {'standings': standings, 'pairs': pairs}
+
+
+def run_tournament(game_name, variants, format='round-robin', games=10,
+                   rounds=None, backend=None, workers=None,
+                   results_path='tournament-results.jsonl', game_settings=None,
+                   cerveau_path=None, seed=None, port=3000):
+    """Plays a tournament between AI variants, each game in a worker
+    process, writing each game's result to a file as it ends.
+
+    Args:
+        game_name (str): the name of the game, e.g. 'Necrowar'
+        variants (list[dict]): the variants, from parse_variant
+        format (str): 'round-robin' or 'swiss'
+        games (int): how many games each pair plays
+        rounds (int): how many rounds a Swiss tournament has, by default
+            enough to find a winner, log2 of the number of variants
+        backend (str): 'simulator' to play in the workers' processes, or
+            'cerveau' to play on game servers, one started per worker, by
+            default the simulator if the game has one
+        workers (int): how many games to play at once, by default the
+            number of cores
+        results_path (str): the file to write each game's result to, as a
+            line of JSON
+        game_settings (str): the game settings, query string formatted
+        cerveau_path (str): the directory of the game server, built via
+            `npm run build`, by default the Cerveau next to Joueur.py
+        seed (int): the seed of the games and pairings, or None for random
+        port (int): the port of the first game server started, the others
+            being on the ports after it, 10 apart
+
+    Returns:
+        list[dict]: the results of the games, in the order they ended
+    """
+    workers = workers or os.cpu_count() or 1
+    backend = backend or ('simulator' if _simulator_module(game_name) else 'cerveau')
+    rng = random.Random(seed)
+    if backend == 'simulator' and not _simulator_module(game_name):
+        error_code.handle_error(
+            error_code.INVALID_ARGS,
+            message='{} has no simulator, use the cerveau backend.'.format(game_name))
+
+    servers = []
+    ports = [None] * workers
+    if backend == 'cerveau':
+        ports = [port + i * 10 for i in range(workers)]
+        servers = _start_servers(game_name, cerveau_path, port, ports)
+
+    results = []
+    pool = None
+    try:
+        port_queue = multiprocessing.Queue()
+        for worker_port in ports:
+            port_queue.put(worker_port)
+        pool = multiprocessing.Pool(workers, _start_worker, (port_queue,))
+
+        with open(results_path, 'w') as results_file:
+            def play(schedule):
+                matches = [
+                    (game_name, first, second, backend, game_settings, rng.randrange(2 ** 32), len(results) + i)
+                    for i, (first, second) in enumerate(schedule)
+                ]
+                total = len(results) + len(matches)
+                for result in pool.imap_unordered(_play_match, matches):
+                    results.append(result)
+                    results_file.write(json.dumps(result) + '\n')
+                    results_file.flush()
+                    print(_describe(result, len(results), total))
+
+            if format == 'swiss':
+                rounds = rounds or max(1, math.ceil(math.log2(len(variants))))
+                for _ in range(rounds):
+                    play(schedule(swiss_pairings(variants, results, rng), games))
+            else:
+                play(round_robin(variants, games))
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        for server in servers:
+            server.terminate()
+            server.wait()
+
+    return results
+
+
+# the port of the game server of this worker process, for the cerveau backend
+_port = None
+
+
+def _start_worker(port_queue):
+    global _port
+    _port = port_queue.get()
+
+    # errors end the game that errored, not the worker playing it
+    error_code.exit_on_error = False
+
+
+def _play_match(match):
+    game_name, first, second, backend, game_settings, seed, index = match
+    try:
+        # AIs print a lot, which would only garble the progress of the tournament
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            return play_game(game_name, first, second, backend, _port, game_settings, seed, index)
+    except Exception as e:
+        traceback.print_exc()
+        return {
+            'game': index,
+            'players': [first['name'], second['name']],
+            'winner': None,
+            'error': '{}: {}'.format(e.__class__.__name__, e)
+        }
+
+
+def _play_simulated(game_name, variants, classes, game_settings, seed):
+    settings = {}
+    for key, value in _parse_query(game_settings).items():
+        settings[camel_case_converter(key)] = _number(value)
+
+    simulator = _simulator_module(game_name).Simulator(
+        classes, settings, [variant['ai_settings'] for variant in variants], seed
+    )
+    return simulator.play()
+
+
+def _play_on_server(game_name, variants, classes, game_settings, port, index):
+    # imported here as it is only needed by this backend
+    from joueur.run import run
+
+    session = 'tournament-{}-{}'.format(os.getpid(), index)
+    ais = [None, None]
+    errors = []
+
+    def play(i):
+        args = argparse.Namespace(
+            game=game_name, server='localhost', port=port, name=variants[i]['name'],
+            index=i, password=None, session=session, game_settings=game_settings,
+            ai_settings=variants[i]['ai_settings'], recv_buffer=1024,
+            json_codec=None, no_delay=True, compress=None, print_io=False
+        )
+        try:
+            ais[i] = run(args, ai_class=classes[i])
+        except BaseException as e:  # e.g. SystemExit from the AI's code
+            errors.append(e)
+
+    threads = [threading.Thread(target=play, args=(i,)) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if errors:
+        raise errors[0]
+
+    return ais
+
+
+def _start_servers(game_name, cerveau_path, port, ports):
+    cerveau_path = cerveau_path or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+        'Cerveau'
+    )
+    index_path = os.path.join(cerveau_path, 'dist', 'index.js')
+    if not os.path.exists(index_path):
+        error_code.handle_error(
+            error_code.INVALID_ARGS,
+            message='No game server at {}, build it via `npm install && npm run build`.'.format(index_path))
+
+    servers = []
+    for server_port in ports:
+        servers.append(subprocess.Popen(
+            [
+                'node', index_path, '--port-offset', str(server_port - 3000),
+                '--only-load', camel_case_converter(game_name), '--silent',
+                '--no-web', '--no-api', '--no-updater', '--no-load-gamelogs'
+            ],
+            cwd=cerveau_path, stdout=subprocess.DEVNULL
+        ))
+
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    for server, server_port in zip(servers, ports):
+        while True:
+            try:
+                socket.create_connection(('localhost', server_port), 1).close()
+                break
+            except socket.error:
+                if server.poll() is not None or time.monotonic() > deadline:
+                    for started in servers:
+                        started.terminate()
+                    error_code.handle_error(
+                        error_code.COULD_NOT_CONNECT,
+                        message='The game server on port {} did not start.'.format(server_port))
+                time.sleep(0.1)
+
+    return servers
+
+
+# the simulator module of a game, or None if it has none
+def _simulator_module(game_name):
+    module_name = 'games.{}.simulator'.format(camel_case_converter(game_name))
+    try:
+        return importlib.import_module(module_name)
+    except ImportError as e:
+        if e.name != module_name:
+            raise  # the simulator exists, but could not import something
+        return None
+
+
+_classes = {}
+
+
+def _load_class(variant):
+    key = (variant['module'], variant['class'])
+    if key not in _classes:
+        _classes[key] = getattr(importlib.import_module(variant['module']), variant['class'])
+
+    return _classes[key]
+
+
+_timed_classes = {}
+
+
+# a subclass of an AI class timing each of its turns
+def _timed(ai_class):
+    if ai_class not in _timed_classes:
+        def __init__(self, game):
+            ai_class.__init__(self, game)
+            self.turn_seconds = []
+
+        def run_turn(self):
+            start = time.perf_counter()
+            try:
+                return ai_class.run_turn(self)
+            finally:
+                self.turn_seconds.append(time.perf_counter() - start)
+
+        _timed_classes[ai_class] = type(ai_class.__name__, (ai_class,), {
+            '__init__': __init__,
+            'run_turn': run_turn
+        })
+
+    return _timed_classes[ai_class]
+
+
+def _parse_query(query):
+    pairs = {}
+    for pair in (query or '').split('&'):
+        if pair:
+            key, _, value = pair.partition('=')
+            pairs[key] = value
+
+    return pairs
+
+
+def _number(value):
+    for convert in (int, float):
+        try:
+            return convert(value)
+        except ValueError:
+            pass
+
+    return value
+
+
+# the strengths of each variant, via the Bradley-Terry model, as Elo ratings
+# averaging 0; each pair that played also counts as having drawn once, so
+# variants that won (or lost) every game still get a finite rating
+def _bradley_terry(names, wins, iterations=200):
+    strengths = {name: 1.0 for name in names}
+    games = {
+        (a, b): wins[a][b] + wins[b][a] + 1
+        for a in names for b in names
+        if a != b and wins[a][b] + wins[b][a] > 0
+    }
+    for _ in range(iterations):
+        updated = {}
+        for name in names:
+            won = sum(wins[name].values()) + 0.5 * sum(1 for a, b in games if a == name)
+            denominator = sum(
+                count / (strengths[a] + strengths[b])
+                for (a, b), count in games.items() if a == name
+            )
+            updated[name] = won / denominator if denominator else strengths[name]
+        strengths = updated
+
+    elos = {name: 400 * math.log10(strength) for name, strength in strengths.items()}
+    mean = sum(elos.values()) / len(elos)
+    return {name: elo - mean for name, elo in elos.items()}
+
+
+# the Wilson score interval of a proportion
+def _wilson(successes, trials, z=CONFIDENCE_Z):
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    center = (p + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+# the difference in Elo that a score against an opponent means
+def _elo_difference(score):
+    if score <= 0:
+        return -math.inf
+    if score >= 1:
+        return math.inf
+
+    return 400 * math.log10(score / (1 - score))
+
+
+def _describe(result, played, total):
+    names = result['players']
+    if result.get('winner') is None:
+        outcome = 'errored: {}'.format(result.get('error'))
+    else:
+        outcome = '{} won on turn {} ({})'.format(names[result['winner']], result['turns'], result['reason'])
+
+    return '[{}/{}] {} vs {}: {}'.format(played, total, names[0], names[1], outcome)
+
+
+def _print_summary(summary):
+    print('\n{:<20} {:>6} {:>6} {:>6} {:>7} {:>8} {:>10}'.format(
+        'AI', 'wins', 'losses', 'errors', 'score', 'Elo', 's/turn'))
+    for standing in summary['standings']:
+        print('{:<20} {:>6} {:>6} {:>6} {:>7} {:>+8.0f} {:>10}'.format(
+            standing['name'], standing['wins'], standing['losses'], standing['errors'],
+            '-' if standing['score'] is None else '{:.3f}'.format(standing['score']),
+            standing['elo'],
+            '-' if standing['turn_seconds'] is None else '{:.4f}'.format(standing['turn_seconds'])
+        ))
+
+    if summary['pairs']:
+        print('\nHead to head, with {:.0%} confidence intervals:'.format(0.95))
+    for pair in summary['pairs']:
+        print('{} vs {}: {}-{}, score {:.3f} [{:.3f}, {:.3f}], Elo {:+.0f} [{:+.0f}, {:+.0f}]'.format(
+            pair['players'][0], pair['players'][1], pair['wins'][0], pair['wins'][1],
+            pair['score'], pair['score_interval'][0], pair['score_interval'][1],
+            pair['elo'], pair['elo_interval'][0], pair['elo_interval'][1]
+        ))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m joueur.tournament',
+        description='Plays AI variants against each other, on every core, and rates them.')
+    parser.add_argument('game', help='the name of the game, e.g. Necrowar')
+    parser.add_argument(
+        'variants', nargs='+',
+        help='the AIs to play, as [name=]module[:Class][?aiSettings], e.g. new=games.necrowar.ai:AI')
+    parser.add_argument('--format', dest='format', default='round-robin', choices=['round-robin', 'swiss'],
+                        help='how to pair the AIs')
+    parser.add_argument('--games', dest='games', type=int, default=10,
+                        help='how many games each pair of AIs plays, taking turns being the first player')
+    parser.add_argument('--rounds', dest='rounds', type=int, default=None,
+                        help='how many rounds a swiss tournament has, by default log2 of the number of AIs')
+    parser.add_argument('--backend', dest='backend', default=None, choices=['simulator', 'cerveau'],
+                        help='where to play the games, by default the game\'s simulator if it has one')
+    parser.add_argument('--workers', dest='workers', type=int, default=None,
+                        help='how many games to play at once, by default the number of cores')
+    parser.add_argument('--results', dest='results', default='tournament-results.jsonl',
+                        help='the file to write each game\'s result to, as a line of JSON')
+    parser.add_argument('--gameSettings', dest='game_settings', default=None,
+                        help='the game settings, query string formatted (key=value&otherKey=otherValue)')
+    parser.add_argument('--cerveau', dest='cerveau', default=None,
+                        help='the directory of the game server, by default the Cerveau next to Joueur.py')
+    parser.add_argument('--port', dest='port', type=int, default=3000,
+                        help='the port of the first game server started, the others being 10 apart')
+    parser.add_argument('--seed', dest='seed', type=int, default=None,
+                        help='the seed of the games and pairings')
+    args = parser.parse_args(argv)
+
+    variants = [parse_variant(spec) for spec in args.variants]
+    if len({variant['name'] for variant in variants}) != len(variants):
+        error_code.handle_error(error_code.INVALID_ARGS, message='Each AI needs its own name.')
+
+    results = run_tournament(
+        args.game, variants, args.format, args.games, args.rounds, args.backend,
+        args.workers, args.results, args.game_settings, args.cerveau, args.seed, args.port
+    )
+    _print_summary(summarize(variants, results))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,401 @@
+# Transports: how a client exchanges events with the server. The client only
+# sends events and receives them as dicts, so what carries them is swappable:
+# SocketTransport talks to a Cerveau server as JSON frames over TCP, while
+# LoopbackTransport hands the events as they are to a responder in the same
+# process, skipping the socket and serialization entirely.
+import asyncio
+import socket
+import time
+import zlib
+import joueur.serializer as serializer
+from joueur.serializer import serialize
+from joueur.frame_buffer import FrameBuffer, EOT_BYTE
+from joueur.compression import Inflater
+import joueur.error_code as error_code
+import joueur.ansi_color_coder as color
+
+# outgoing frames are flushed early once this many bytes are buffered
+SEND_BUFFER_LIMIT = 64 * 1024
+
+
+# SocketTransport: events as EOT delimited JSON frames over a TCP socket
+class SocketTransport():
+    def __init__(self, print_io=False, recv_buffer=1024):
+        self.socket = None
+        self.hostname = None
+        self.port = None
+
+        self._print_io = print_io
+        self._loop = None
+        self._write_lock = None
+        self._received_buffer = FrameBuffer(int(recv_buffer))
+        self._inflater = None  # once the server's stream is compressed
+        self._send_buffer = bytearray()
+        self._bytes_sent = 0
+        self._frames_sent = 0
+        self._flushes = 0
+
+    @property
+    def closed(self):
+        """bool: True once disconnected, after which sends are dropped."""
+        return self.socket is None
+
+    async def connect(self, hostname='localhost', port=3000, no_delay=True,
+                      compress=None):
+        self.hostname = hostname
+        self.port = int(port)
+
+        self._loop = asyncio.get_running_loop()
+        self._write_lock = asyncio.Lock()
+
+        print(color.text('cyan') + 'Connecting to:', self.hostname + ':' +
+              str(self.port) + color.reset())
+
+        try:
+            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+
+            # Silly Windows
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+            # frames are already coalesced before being written, so Nagle's
+            # algorithm would only delay them further
+            self.socket.setsockopt(
+                socket.IPPROTO_TCP, socket.TCP_NODELAY, 1 if no_delay else 0)
+
+            self.socket.setblocking(False)
+            await self._loop.sock_connect(
+                self.socket, (self.hostname, self.port))
+        except socket.error as e:
+            error_code.handle_error(
+                error_code.COULD_NOT_CONNECT,
+                e,
+                'Could not connect to {}:{}'.format(
+                    self.hostname,
+                    self.port
+                )
+            )
+
+        if compress:
+            await self._negotiate_compression(compress)
+
+    async def _negotiate_compression(self, format):
+        self.send('compress', {'format': format})
+
+        # the reply is the last uncompressed frame, so only it is popped
+        replies = self._received_buffer.frames(1)
+        while not replies:
+            await self.flush()
+            await self._receive()
+            replies = self._received_buffer.frames(1)
+
+        reply = self._parse(replies[0])
+        data = reply.get('data') or {}
+
+        if reply['event'] == 'fatal':
+            error_code.handle_error(
+                error_code.FATAL_EVENT,
+                message='The server does not support compression: ' +
+                        str(data.get('message')))
+        elif reply['event'] != 'compressed':
+            error_code.handle_error(
+                error_code.UNKNOWN_EVENT_FROM_SERVER,
+                message='Expected a "compressed" event, got "{}".'.format(
+                    reply['event']))
+
+        if data.get('format') is None:
+            print(color.text('yellow') + 'The server declined to compress, ' +
+                  'continuing uncompressed.' + color.reset())
+            return
+
+        self._inflater = Inflater(data['format'])
+        # anything already received after the reply is compressed
+        self._inflater.inflate(self._received_buffer.take(),
+                               self._received_buffer)
+
+    # serializes an event into a frame, buffered until the next flush
+    def send(self, event, data):
+        if self.socket is None:
+            return  # disconnected, e.g. the game ended during a turn
+
+        frame = serializer.dumps({
+            'sentTime': int(time.time()),
+            'event': event,
+            'data': serialize(data)
+        }) + EOT_BYTE
+
+        if self._print_io:
+            print(color.text('magenta') + 'TO SERVER --> ' + str(
+                frame) + color.reset())
+
+        self._send_buffer += frame
+        self._frames_sent += 1
+
+        if len(self._send_buffer) >= SEND_BUFFER_LIMIT:
+            self.flush_nowait()
+
+    async def flush(self):
+        """Writes every buffered frame to the socket in as few syscalls as
+        possible.
+        """
+        async with self._write_lock:
+            if len(self._send_buffer) == 0 or self.socket is None:
+                return
+
+            # swapped out so frames sent while this awaits go in the next
+            # flush, after these ones
+            data = self._send_buffer
+            self._send_buffer = bytearray()
+
+            try:
+                await self._loop.sock_sendall(self.socket, data)
+            except socket.error as e:
+                error_code.handle_error(
+                    error_code.DISCONNECTED_UNEXPECTEDLY, e,
+                    'Error writing to the socket')
+
+            self._bytes_sent += len(data)
+            self._flushes += 1
+
+    def flush_nowait(self):
+        """Writes as much of the buffered frames as the socket will take
+        without blocking, leaving the rest for the next flush.
+        """
+        if (len(self._send_buffer) == 0 or self.socket is None or
+                self._write_lock.locked()):
+            return  # nothing to write, or a flush is already writing
+
+        try:
+            sent = self.socket.send(self._send_buffer)
+        except (BlockingIOError, InterruptedError):
+            return
+        except socket.error as e:
+            error_code.handle_error(
+                error_code.DISCONNECTED_UNEXPECTEDLY, e,
+                'Error writing to the socket')
+
+        self._bytes_sent += sent
+        self._flushes += 1
+        del self._send_buffer[:sent]
+
+    async def receive(self):
+        """Reads once from the socket, waiting until something arrives, unless
+        complete frames were already received.
+
+        Returns:
+            list[dict]: the events of the frames completed by the read, each
+            with its 'event' and 'data', which may be none of them
+        """
+        # frames can already be complete without a read, when they came in
+        # with the reply to the compress event and were inflated along with it
+        frames = self._received_buffer.frames()
+        if not frames:
+            await self._receive()
+            frames = self._received_buffer.frames()
+
+        # frames are only parsed once complete, straight from bytes, so
+        # multi-byte characters split across reads are never decoded in halves
+        return [self._parse(frame) for frame in frames]
+
+    def receive_nowait(self):
+        """Gets the events received without waiting, which a socket can not.
+
+        Returns:
+            None: as the socket must be waited on via receive()
+        """
+        return None
+
+    # reads once from the socket into the received buffer, inflating what was
+    # read first if the server's stream is compressed
+    async def _receive(self):
+        buffer = self._received_buffer
+        try:
+            if self._inflater:
+                into = self._inflater.writable(buffer.read_size)
+                read = await self._loop.sock_recv_into(self.socket, into)
+                buffer.count_read(read)
+                self._inflater.inflate(into[:read], buffer)
+            else:
+                with buffer.writable() as into:
+                    read = await self._loop.sock_recv_into(self.socket, into)
+                buffer.wrote(read)
+        except socket.error as e:
+            error_code.handle_error(
+                error_code.CANNOT_READ_SOCKET, e,
+                'Error reading socket while waiting for events')
+        except zlib.error as e:
+            error_code.handle_error(
+                error_code.CANNOT_READ_SOCKET, e,
+                'Could not inflate the compressed data from the server')
+
+        if read == 0:
+            error_code.handle_error(
+                error_code.DISCONNECTED_UNEXPECTEDLY,
+                message='Server closed the connection')
+
+    def _parse(self, frame):
+        if self._print_io:
+            print(color.text('magenta') + 'FROM SERVER <-- ' +
+                  frame.decode('utf-8') + color.reset())
+
+        try:
+            return serializer.loads(frame)
+        except ValueError as e:
+            error_code.handle_error(error_code.MALFORMED_JSON, e,
+                                    'Could not parse json "{}"'.format(
+                                        frame.decode('utf-8', 'replace'))
+                                    )
+
+    def close(self):
+        if self.socket:
+            self.socket.close()
+            self.socket = None
+
+    def stats(self):
+        """Gets counters about the IO done, to help tune --recvBuffer.
+
+        Returns:
+            dict: the counters by name, bytes_received being the compressed
+            bytes if the server's stream is compressed
+        """
+        counters = self._received_buffer.stats()
+        counters['bytes_sent'] = self._bytes_sent
+        counters['frames_sent'] = self._frames_sent
+        counters['flushes'] = self._flushes
+        counters['frames_per_flush'] = (
+            self._frames_sent / self._flushes if self._flushes else 0
+        )
+        if self._inflater:
+            counters.update(self._inflater.stats())
+
+        return counters
+
+
+# LoopbackTransport: events handed straight to a responder in this process
+class LoopbackTransport():
+    """Plays against a responder in this process instead of a server, so AIs
+    run unmodified at function call speed, e.g. for batch evaluation and
+    profiling. Events are passed as Python objects, never serialized, so the
+    data the client sends holds its game objects as they are (the caller of
+    a run is the BaseGameObject itself), and the responder may send the
+    client's own game objects back in the data of 'ran' events.
+
+    A responder is any object with two methods:
+        send(event, data): called with each event the client sends, e.g.
+            ('run', {'caller': unit, 'functionName': 'move', 'args': ...})
+        receive(): called when the client is waiting on the server, returns
+            a list of the events the server sends next, each a dict with its
+            'event' and its 'data' as the server would send it (e.g. deltas
+            with their '&RM' and '&LEN' keys), or an empty list once the
+            server has nothing more to send, which disconnects the client
+
+    Example:
+        client = joueur.client.Client()
+        client.attach(LoopbackTransport(ScriptedResponder(recorded_events)))
+    """
+
+    def __init__(self, responder, print_io=False):
+        """Plays against a responder.
+
+        Args:
+            responder: what to send events to and receive events from
+            print_io (bool): if the events sent and received are printed
+        """
+        self.responder = responder
+        self.hostname = 'loopback'
+        self.port = None
+
+        self._print_io = print_io
+        self._closed = False
+        self._events_sent = 0
+        self._events_received = 0
+
+    @property
+    def closed(self):
+        """bool: True once disconnected, after which sends are dropped."""
+        return self._closed
+
+    def send(self, event, data):
+        if self._closed:
+            return  # disconnected, e.g. the game ended during a turn
+
+        if self._print_io:
+            print(color.text('magenta') + 'TO SERVER --> ' + str(
+                {'event': event, 'data': data}) + color.reset())
+
+        self._events_sent += 1
+        self.responder.send(event, data)
+
+    async def flush(self):
+        """Does nothing, as events are handed over as soon as they are sent.
+        """
+
+    def flush_nowait(self):
+        """Does nothing, as events are handed over as soon as they are sent.
+        """
+
+    async def receive(self):
+        """Gets the events the responder sends next.
+
+        Returns:
+            list[dict]: the events, each with its 'event' and 'data'
+        """
+        return self.receive_nowait()
+
+    def receive_nowait(self):
+        """Gets the events the responder sends next, which never waits, so
+        blocking clients need not run their event loop for it.
+
+        Returns:
+            list[dict]: the events, each with its 'event' and 'data'
+        """
+        events = self.responder.receive()
+        if not events:
+            error_code.handle_error(
+                error_code.DISCONNECTED_UNEXPECTEDLY,
+                message='The responder has nothing more to send')
+
+        if self._print_io:
+            for event in events:
+                print(color.text('magenta') + 'FROM SERVER <-- ' + str(
+                    event) + color.reset())
+
+        self._events_received += len(events)
+        return events
+
+    def close(self):
+        self._closed = True
+
+    def stats(self):
+        """Gets counters about the events exchanged.
+
+        Returns:
+            dict: the counters by name
+        """
+        return {
+            'events_sent': self._events_sent,
+            'events_received': self._events_received
+        }
+
+
+# ScriptedResponder: a responder for LoopbackTransport sending a fixed list of
+# events, e.g. ones recorded from a real game, one at a time as the client
+# waits, while keeping what the client sent
+class ScriptedResponder():
+    def __init__(self, events):
+        """Sends events in order, whatever the client sends.
+
+        Args:
+            events (iterable[dict]): the events to send, each with its
+                'event' and 'data'
+        """
+        self.sent = []  # (event, data) the client sent, in order
+        self._events = iter(events)
+
+    def send(self, event, data):
+        self.sent.append((event, data))
+
+    def receive(self):
+        for event in self._events:
+            return [event]
+
+        return []
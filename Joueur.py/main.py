@@ -2,6 +2,12 @@
 # Instead have a look at `README.md` for how to start writing you AI.
 
 import argparse
+import sys
+
+# the client is built on asyncio and contextvars, which need Python 3.7
+if sys.version_info < (3, 7):
+    sys.exit('The client needs Python 3.7 or newer, this is Python {}.{}.'.format(*sys.version_info[:2]))
+
 from joueur.run import run
 
 parser = argparse.ArgumentParser(
@@ -72,6 +78,40 @@ parser.add_argument(
     help=
     'Any settings for the AI. Delimit pairs by an ampersand (key=value&otherKey=otherValue)'
 )
+parser.add_argument(
+    '--recvBuffer',
+    action='store',
+    dest='recv_buffer',
+    type=int,
+    default=1024,
+    help=
+    '(tuning) the initial number of bytes to read from the socket at once, reads grow and shrink from there based on the data received'
+)
+parser.add_argument(
+    '--jsonCodec',
+    action='store',
+    dest='json_codec',
+    default=None,
+    choices=['orjson', 'ujson', 'rapidjson', 'json'],
+    help=
+    '(tuning) the JSON library to use, defaults to the fastest one installed'
+)
+parser.add_argument(
+    '--nagle',
+    action='store_false',
+    dest='no_delay',
+    help=
+    '(tuning) leave Nagle\'s algorithm on for the socket instead of setting TCP_NODELAY'
+)
+parser.add_argument(
+    '--compress',
+    action='store',
+    dest='compress',
+    default=None,
+    choices=['zlib', 'gzip'],
+    help=
+    '(tuning) ask the server to compress what it sends, which needs a server that supports it'
+)
 parser.add_argument(
     '--printIO',
     action='store_true',
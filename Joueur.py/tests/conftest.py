@@ -0,0 +1,10 @@
+# Lets the tests import joueur and games as main.py does, from Joueur.py/
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import joueur.error_code  # noqa: E402
+
+# errors raise a JoueurError instead of exiting, so they fail only their test
+joueur.error_code.exit_on_error = False
@@ -0,0 +1,192 @@
+# Makes the delta fixtures the golden merge tests replay, one gzipped JSON
+# file per game in deltas/, each {gameName, constants, sequences}, every
+# sequence being the deltas of one game in the order the server sends them.
+#
+# Necrowar's first sequence is recorded from a game its simulator played,
+# so it is the real thing. The other sequences are generated from each
+# game's classes, using every part of the delta format the server does: new
+# game objects, references, lists growing and shrinking via &LEN, and game
+# objects removed via &RM (game_objects is the only dict these games have).
+#
+# Run from Joueur.py/ as: python tests/fixtures/make_deltas.py
+import contextlib
+import gzip
+import importlib
+import io
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from joueur.base_game_object import BaseGameObject  # noqa: E402
+from joueur.utilities import camel_case_converter  # noqa: E402
+
+GAMES = [
+    'anarchy', 'catastrophe', 'checkers', 'chess', 'necrowar', 'newtonian',
+    'pirates', 'saloon', 'spiders', 'stardash', 'stumped'
+]
+
+CONSTANTS = {'DELTA_REMOVED': '&RM', 'DELTA_LIST_LENGTH': '&LEN'}
+REMOVED = CONSTANTS['DELTA_REMOVED']
+LIST_LENGTH = CONSTANTS['DELTA_LIST_LENGTH']
+
+# how many sequences are generated per game, and how many deltas each has
+SEQUENCES = 3
+DELTAS = 30
+
+# how many turns of Necrowar are recorded
+RECORDED_TURNS = 12
+
+DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'deltas')
+
+
+# the server's keys of an object's fields, with the values it starts with
+def _fields(state):
+    names = set()
+    for cls in type(state).__mro__:
+        names.update(getattr(cls, '__slots__', ()))
+
+    fields = {}
+    for name in sorted(names):
+        if (name.startswith('_') and name not in ('_game_objects', '_game_object_classes', '_id', '_game_object_name') and
+                name not in getattr(state, '_cached_from', {}) and hasattr(state, name)):
+            parts = name[1:].split('_')
+            key = parts[0] + ''.join(part.capitalize() for part in parts[1:])
+            if camel_case_converter(key) == name[1:]:
+                fields[key] = getattr(state, name)
+
+    return fields
+
+
+def _generate(game_module, seed):
+    rng = random.Random(seed)
+    classes = sorted(game_module.Game()._game_object_classes.items())
+    objects = {}  # id -> (game object name, an instance with its defaults)
+    ids = []
+    removed = []
+
+    def reference():
+        return {'id': rng.choice(ids)}
+
+    def value(default):
+        if isinstance(default, bool):
+            return rng.random() < 0.5
+        if isinstance(default, int):
+            return rng.randint(-5, 50)
+        if isinstance(default, float):
+            return rng.random()
+        if isinstance(default, str):
+            return rng.choice(['a', 'b', 'ü', ''])
+        if isinstance(default, list):
+            length = rng.randint(0, 6)
+            listed = {LIST_LENGTH: length}
+            for index in range(length):
+                listed[str(index)] = rng.choice([reference(), rng.randint(0, 9), 'x', None])
+            return listed
+        if isinstance(default, dict):
+            return {rng.choice('abcdef'): rng.choice([reference(), 3, 'y']) for _ in range(rng.randint(0, 4))}
+        return rng.choice([reference(), None])
+
+    def create(id):
+        name, cls = rng.choice(classes)
+        objects[id] = (name, cls())
+        ids.append(id)
+
+    def created(id):
+        name, instance = objects[id]
+        state = {'id': id, 'gameObjectName': name}
+        state.update((key, value(default)) for key, default in _fields(instance).items())
+        return state
+
+    for number in range(60):
+        create(str(number))
+
+    game_fields = _fields(game_module.Game())
+    first = {'gameObjects': {id: created(id) for id in ids}}
+    first.update((key, value(default)) for key, default in game_fields.items())
+    deltas = [first]
+
+    for _ in range(DELTAS - 1):
+        game_objects = {}
+        for id in rng.sample(ids, 10):
+            fields = _fields(objects[id][1])
+            changed = {}
+            for key in rng.sample(sorted(fields), min(3, len(fields))):
+                default = fields[key]
+                if isinstance(default, list) and rng.random() < 0.5:
+                    length = rng.randint(0, 8)  # grows or shrinks it
+                    changed[key] = {LIST_LENGTH: length}
+                    for index in rng.sample(range(length), min(length, 2)):
+                        changed[key][str(index)] = reference()
+                elif isinstance(default, dict) and rng.random() < 0.5:
+                    changed[key] = {rng.choice('abcdef'): rng.choice([REMOVED, 5, reference()])}
+                else:
+                    changed[key] = value(default)
+            game_objects[id] = changed
+
+        if rng.random() < 0.5:
+            id = str(len(ids) + len(removed))
+            create(id)
+            game_objects[id] = created(id)
+        elif rng.random() < 0.3:
+            id = rng.choice([id for id in ids if id not in game_objects])
+            ids.remove(id)  # so nothing references it from now on
+            removed.append(id)
+            game_objects[id] = REMOVED
+
+        delta = {'gameObjects': game_objects}
+        for key, default in rng.sample(sorted(game_fields.items()), 2):
+            delta[key] = value(default)
+        deltas.append(delta)
+
+    return deltas
+
+
+def _record_necrowar():
+    from games.necrowar import AI
+    from games.necrowar.simulator import Simulator
+
+    recorded = []
+
+    class Recorder(Simulator):
+        def _setup(self):
+            Simulator._setup(self)
+            manager = self._clients[0][2]
+            apply_delta_state = manager.apply_delta_state
+
+            def record(delta):
+                recorded.append(json.loads(json.dumps(delta)))
+                apply_delta_state(delta)
+            manager.apply_delta_state = record
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        Recorder((AI, AI), settings={'max_turns': RECORDED_TURNS}, seed=0).play()
+
+    return recorded
+
+
+def main():
+    os.makedirs(DIRECTORY, exist_ok=True)
+    for game_name in GAMES:
+        game_module = importlib.import_module('games.' + game_name)
+        sequences = []
+        if game_name == 'necrowar':
+            sequences.append(_record_necrowar())
+        for seed in range(SEQUENCES):
+            sequences.append(_generate(game_module, seed))
+
+        path = os.path.join(DIRECTORY, game_name + '.json.gz')
+        with gzip.GzipFile(path, 'wb', mtime=0) as file:
+            file.write(json.dumps({
+                'gameName': game_module.Game().name,
+                'constants': CONSTANTS,
+                'sequences': sequences
+            }, separators=(',', ':'), sort_keys=True).encode('utf-8'))
+
+        print('{}: {} deltas'.format(path, sum(len(sequence) for sequence in sequences)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+# A stand-in for the game server the tests play against over a
+# LoopbackTransport: a tiny game of Checkers, two players with a checker each,
+# whose turns are orders to run and whose replies to run commands are up to
+# each test.
+import argparse
+import games.checkers
+
+CONSTANTS = {'DELTA_REMOVED': '&RM', 'DELTA_LIST_LENGTH': '&LEN'}
+
+
+def _list(*items):
+    listed = {'&LEN': len(items)}
+    listed.update((str(index), item) for index, item in enumerate(items))
+    return listed
+
+
+# the first delta of the game, its whole state
+INITIAL = {
+    'gameObjects': {
+        '0': {
+            'id': '0', 'gameObjectName': 'Player', 'name': 'Zero', 'logs': _list(),
+            'checkers': _list({'id': '2'}), 'opponent': {'id': '1'}, 'yDirection': 1
+        },
+        '1': {
+            'id': '1', 'gameObjectName': 'Player', 'name': 'One', 'logs': _list(),
+            'checkers': _list({'id': '3'}), 'opponent': {'id': '0'}, 'yDirection': -1
+        },
+        '2': {'id': '2', 'gameObjectName': 'Checker', 'logs': _list(), 'owner': {'id': '0'}, 'x': 1, 'y': 0},
+        '3': {'id': '3', 'gameObjectName': 'Checker', 'logs': _list(), 'owner': {'id': '1'}, 'x': 0, 'y': 7}
+    },
+    'players': _list({'id': '0'}, {'id': '1'}),
+    'checkers': _list({'id': '2'}, {'id': '3'}),
+    'currentPlayer': {'id': '0'},
+    'currentTurn': 0,
+    'session': 'test'
+}
+
+
+def args(**changes):
+    """Gets the arguments main.py would parse, to play Checkers.
+
+    Returns:
+        argparse.Namespace: them, with the changes given
+    """
+    parsed = argparse.Namespace(
+        game='Checkers', server='loopback', port=3000, print_io=False,
+        recv_buffer=1024, no_delay=True, compress=None, json_codec=None,
+        name=None, index=None, password=None, session='*',
+        game_settings=None, ai_settings=None
+    )
+    vars(parsed).update(changes)
+    return parsed
+
+
+def starting():
+    """Gets the events the server sends to get to the first turn.
+
+    Returns:
+        list[dict]: named, lobbied, the first delta, and start
+    """
+    return [
+        {'event': 'named', 'data': 'Checkers'},
+        {'event': 'lobbied', 'data': {
+            'gameVersion': games.checkers.game_version,
+            'gameName': 'Checkers',
+            'gameSession': 'test',
+            'constants': CONSTANTS
+        }},
+        {'event': 'delta', 'data': INITIAL},
+        {'event': 'start', 'data': {'playerID': '0'}}
+    ]
+
+
+def ending(won=True, reason='Tested'):
+    """Gets the events the server sends to end the game.
+
+    Returns:
+        list[dict]: the delta saying who won, and over
+    """
+    result = {'won': True, 'reasonWon': reason} if won else {'lost': True, 'reasonLost': reason}
+    return [
+        {'event': 'delta', 'data': {'gameObjects': {'0': result}}},
+        {'event': 'over', 'data': {'message': 'Over on __HOSTNAME__'}}
+    ]
+
+
+# Server: a responder playing turns of the game, replying to each run command
+# with what reply() returns for it
+class Server():
+    def __init__(self, turns=1, reply=None):
+        """Plays a game of some turns.
+
+        Args:
+            turns (int): how many runTurn orders to send before the game ends
+            reply (function): called with the data of each run command and
+                how many were sent before it, returns the events to send back,
+                by default a 'ran' of None
+        """
+        self.sent = []  # (event, data) the client sent, in order
+        self.turns = turns
+        self.reply = reply or (lambda data, number: [{'event': 'ran', 'data': None}])
+        self.runs = 0
+        self._order = 0
+        self._queue = []
+
+    def send(self, event, data):
+        self.sent.append((event, data))
+        if event == 'alias':
+            self._queue.append(starting()[0])
+        elif event == 'play':
+            self._queue.extend(starting()[1:])
+            self._next_order()
+        elif event == 'run':
+            self._queue.extend(self.reply(data, self.runs))
+            self.runs += 1
+        elif event == 'finished':
+            self._next_order()
+
+    def receive(self):
+        queue, self._queue = self._queue, []
+        return queue
+
+    def _next_order(self):
+        if self._order >= self.turns:
+            self._queue.extend(ending())
+        else:
+            self._queue.append({'event': 'order', 'data': {'name': 'runTurn', 'index': self._order, 'args': []}})
+            self._order += 1
@@ -0,0 +1,82 @@
+# An AI for the tests to play Necrowar with in the simulator: the bundled AI,
+# keeping its start and game_updated, but whose turns are random commands,
+# valid or not, seeded so each game plays the same every time. And a
+# simulator making more happen in fewer turns for it to play in.
+import random
+
+from games.necrowar import AI
+from games.necrowar.simulator import Simulator
+
+
+class RandomAI(AI):
+    def start(self):
+        AI.start(self)
+        self.random = random.Random(int(self.get_setting('seed') or 0) * 2 + int(self.player.id))
+        self.invalids = []  # why each invalid command was
+
+    def invalid(self, message):
+        self.invalids.append(message)
+
+    def end(self, won, reason):
+        pass  # the bundled AI prints how it played
+
+    def run_turn(self):
+        rng = self.random
+        player = self.player
+        tiles = self.game.tiles
+
+        spawns = [tile for tile in player.side if tile.is_worker_spawn or tile.is_unit_spawn]
+        for tile in spawns:
+            if tile.is_worker_spawn:
+                tile.spawn_worker()
+            else:
+                tile.spawn_unit(rng.choice(['ghoul', 'hound', 'abomination']))
+
+        corpses = [tile for tile in self.corpse_tiles]
+        if corpses:
+            rng.choice(sorted(corpses, key=lambda tile: int(tile.id))).res(rng.randint(1, 2))
+
+        for unit in list(player.units):
+            if not unit.tile:
+                continue
+
+            for i in range(unit.moves):
+                neighbors = unit.tile.get_neighbors() if unit.tile else []
+                if neighbors:
+                    unit.move(rng.choice(neighbors))
+
+            if not unit.tile:
+                continue
+
+            if unit.job.title == 'worker':
+                action = rng.randrange(3)
+                if action == 0:
+                    unit.build(rng.choice(['arrow', 'ballista', 'cleansing', 'aoe']))
+                elif action == 1:
+                    unit.mine(unit.tile)
+                else:
+                    unit.fish(rng.choice(unit.tile.get_neighbors()))
+            else:
+                unit.attack(rng.choice(unit.tile.get_neighbors()))
+
+        for tower in player.towers:
+            if tower.tile:
+                tower.attack(rng.choice(tiles))
+
+        return True
+
+
+# a simulator where, before each turn, units die, towers fall, and the
+# players get more gold, so there are towers and corpses to keep track of
+class Chaos(Simulator):
+    def _before_turn(self):
+        game = self.game
+        if game.units and self.random.random() < 0.6:
+            self._set(self.random.choice(game.units), 'health', 0)
+        towers = [tower for tower in game.towers if tower.job.title != 'castle']
+        if towers and self.random.random() < 0.3:
+            self._set(self.random.choice(towers), 'health', 0)
+        for player in game.players:
+            self._set(player, 'gold', player.gold + 40)
+
+        Simulator._before_turn(self)
@@ -0,0 +1,215 @@
+# Tests of joueur.changes: what each delta merged by a GameManager changed, as
+# seen through the views of Changes, and the callbacks subscribed to fields
+import copy
+
+import games.checkers
+from joueur.game_manager import GameManager
+
+import loopback
+
+
+# a manager with the first state of the loopback Checkers game merged
+def _manager():
+    manager = GameManager(games.checkers.Game())
+    manager.set_constants(loopback.CONSTANTS)
+    manager.apply_delta_state(copy.deepcopy(loopback.INITIAL))
+    return manager
+
+
+def test_views_the_first_state():
+    manager = _manager()
+    changes = manager.changes
+
+    assert changes.added == {'0', '1', '2', '3'}
+    assert changes.removed == set()
+    assert set(changes.fields) == {'0', '1', '2', '3'}
+    assert changes.fields['2'] == {'id', 'game_object_name', 'logs', 'owner', 'x', 'y'}
+    assert changes.game_fields == {
+        'game_objects', 'players', 'checkers', 'current_player', 'current_turn', 'session'
+    }
+
+
+def test_views_an_object_added():
+    manager = _manager()
+    game = manager.game
+    manager.apply_delta_state({
+        'gameObjects': {
+            '4': {'id': '4', 'gameObjectName': 'Checker', 'logs': {'&LEN': 0}, 'owner': {'id': '0'}, 'x': 3, 'y': 0},
+            '0': {'checkers': {'&LEN': 2, '1': {'id': '4'}}}
+        },
+        'checkers': {'&LEN': 3, '2': {'id': '4'}}
+    })
+    changes = manager.changes
+    added = game.get_game_object('4')
+
+    assert changes.added == {'4'}
+    assert changes.removed == set()
+    assert changes.fields == {
+        '4': {'id', 'game_object_name', 'logs', 'owner', 'x', 'y'},
+        '0': {'checkers'}
+    }
+    assert changes.game_fields == {'game_objects', 'checkers'}
+    assert changes.changed(added)
+    assert changes.changed(game.players[0], 'checkers')
+    assert not changes.changed(game.players[0], 'name')
+    assert not changes.changed(game.players[1])
+    assert changes.game_objects('checkers') == [game.players[0]]
+    assert set(changes.game_objects()) == {added, game.players[0]}
+    assert game.checkers[2] is added
+
+
+def test_views_a_list_resized():
+    manager = _manager()
+    game = manager.game
+    taken = game.checkers[1]
+    manager.apply_delta_state({
+        'gameObjects': {'1': {'checkers': {'&LEN': 0}}},
+        'checkers': {'&LEN': 1}
+    })
+    changes = manager.changes
+
+    assert changes.added == set()
+    assert changes.removed == {'3'}
+    assert changes.fields == {'1': {'checkers'}}
+    assert changes.game_fields == {'game_objects', 'checkers'}
+    assert changes.game_objects() == [game.players[1]]
+    assert not changes.changed(taken)
+    assert game.checkers == [game.get_game_object('2')]
+    assert game.players[1].checkers == []
+
+
+def test_views_an_object_removed():
+    manager = _manager()
+    game = manager.game
+    manager.apply_delta_state({
+        'gameObjects': {'3': '&RM', '1': {'checkers': {'&LEN': 0}}},
+        'checkers': {'&LEN': 1}
+    })
+    changes = manager.changes
+
+    assert changes.removed == {'3'}
+    assert changes.fields == {'1': {'checkers'}}
+    assert game.get_game_object('3') is None
+
+
+def test_views_a_key_removed():
+    manager = _manager()
+    game = manager.game
+    manager.apply_delta_state({'gameObjects': {'3': '&RM'}})
+    changes = manager.changes
+
+    # still listed, so only taken out of the game's game objects
+    assert changes.removed == {'3'}
+    assert changes.added == set()
+    assert changes.fields == {}
+    assert changes.game_fields == {'game_objects'}
+    assert changes.game_objects() == []
+    assert '3' not in game.game_objects
+
+
+def test_views_only_the_last_delta():
+    manager = _manager()
+    game = manager.game
+    manager.apply_delta_state({'gameObjects': {'2': {'y': 1}}})
+    manager.apply_delta_state({'currentTurn': 1, 'currentPlayer': {'id': '1'}})
+    changes = manager.changes
+
+    assert changes.added == set()
+    assert changes.fields == {}
+    assert changes.game_fields == {'current_turn', 'current_player'}
+    assert not changes.changed(game.get_game_object('2'))
+
+
+# a callback recording what it is called with
+class _Recorder():
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, game_object, old, new):
+        self.calls.append((getattr(game_object, 'id', 'game'), old, new))
+
+
+def test_calls_back_with_the_old_and_new_values():
+    manager = _manager()
+    moved = _Recorder()
+    turned = _Recorder()
+    manager.changes.subscribe(games.checkers.Checker, 'y', moved)
+    manager.changes.subscribe(games.checkers.Game, 'current_turn', turned)
+
+    manager.apply_delta_state({
+        'gameObjects': {'2': {'y': 1}, '3': {'y': 6, 'x': 1}},
+        'currentTurn': 1
+    })
+
+    assert moved.calls == [('2', 0, 1), ('3', 7, 6)]
+    assert turned.calls == [('game', 0, 1)]
+
+
+def test_calls_back_with_lists_as_they_were():
+    manager = _manager()
+    listed = _Recorder()
+    manager.changes.subscribe(games.checkers.Game, 'checkers', listed)
+    first, second = manager.game.checkers
+
+    manager.apply_delta_state({'checkers': {'&LEN': 1}})
+
+    assert listed.calls == [('game', [first, second], [first])]
+
+
+def test_skips_fields_that_did_not_change():
+    manager = _manager()
+    moved = _Recorder()
+    manager.changes.subscribe(games.checkers.Checker, 'y', moved)
+
+    manager.apply_delta_state({'gameObjects': {'2': {'y': 0}, '3': {'y': 6}}})
+    manager.apply_delta_state({'gameObjects': {'2': {'x': 2}}})
+
+    assert moved.calls == [('3', 7, 6)]
+
+
+def test_calls_back_for_subclasses():
+    manager = _manager()
+    changed = _Recorder()
+    manager.changes.subscribe(games.checkers.GameObject, 'logs', changed)
+
+    manager.apply_delta_state({'gameObjects': {
+        '0': {'logs': {'&LEN': 1, '0': 'player'}},
+        '2': {'logs': {'&LEN': 1, '0': 'checker'}}
+    }})
+
+    assert changed.calls == [('0', [], ['player']), ('2', [], ['checker'])]
+
+
+def test_stops_calling_back_once_unsubscribed():
+    manager = _manager()
+    changes = manager.changes
+    moved = _Recorder()
+    kept = _Recorder()
+    changes.subscribe(games.checkers.Checker, 'y', moved)
+    changes.subscribe(games.checkers.Checker, 'y', kept)
+
+    manager.apply_delta_state({'gameObjects': {'2': {'y': 1}}})
+    changes.unsubscribe(games.checkers.Checker, 'y', moved)
+    manager.apply_delta_state({'gameObjects': {'2': {'y': 2}}})
+    changes.unsubscribe(games.checkers.Checker, 'y', kept)
+    changes.unsubscribe(games.checkers.Checker, 'y', kept)  # not subscribed, so nothing to stop
+    manager.apply_delta_state({'gameObjects': {'2': {'y': 3}}})
+
+    assert moved.calls == [('2', 0, 1)]
+    assert kept.calls == [('2', 0, 1), ('2', 1, 2)]
+    assert changes._subscriptions == {}
+
+
+def test_callbacks_may_unsubscribe():
+    manager = _manager()
+    changes = manager.changes
+    calls = []
+
+    def once(checker, old, new):
+        calls.append(checker.id)
+        changes.unsubscribe(games.checkers.Checker, 'y', once)
+    changes.subscribe(games.checkers.Checker, 'y', once)
+
+    manager.apply_delta_state({'gameObjects': {'2': {'y': 1}, '3': {'y': 6}}})
+
+    assert calls == ['2']
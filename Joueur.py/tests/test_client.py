@@ -0,0 +1,411 @@
+# Tests of the client against a stand-in for the game server on localhost,
+# which sends the client a stream of frames cut up into pieces, compressed or
+# not, and keeps the frames the client sends it. Then of run commands, batched
+# or not, against the stand-in server of loopback.py, and of games played at
+# once in threads or asyncio tasks, each on its own client.
+import asyncio
+import json
+import socket
+import threading
+import time
+import zlib
+
+import pytest
+
+import games.checkers
+import joueur.client
+import loopback
+from joueur.async_client import GameOver, PendingRun
+from joueur.client import Client
+from joueur.frame_buffer import FrameBuffer
+from joueur.run import run, run_async
+from joueur.transport import LoopbackTransport
+
+EVENTS = [
+    {'event': 'message', 'data': {'turn': 1, 'text': 'a "quoted" ü €'}},
+    {'event': 'message', 'data': None},
+    {'event': 'message', 'data': list(range(40))}
+]
+
+# stands for waiting on the next frame from the client, in a server's pieces
+RECEIVE = None
+
+
+def _frame(event):
+    return json.dumps(event).encode('utf-8') + b'\x04'
+
+
+STREAM = b''.join(_frame(event) for event in EVENTS)
+
+
+class _Server():
+    def __init__(self, pieces):
+        """Listens on a free port of localhost, for one client.
+
+        Args:
+            pieces (list[bytes]): what to send, in order, each a write of its
+                own, or RECEIVE to wait on a frame from the client first
+        """
+        self.received = []  # the frames the client sent, parsed
+        self._buffer = b''
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.bind(('127.0.0.1', 0))
+        self._socket.listen(1)
+        self.port = self._socket.getsockname()[1]
+        self._thread = threading.Thread(target=self._serve, args=(pieces,), daemon=True)
+        self._thread.start()
+
+    def join(self):
+        self._thread.join(5)
+        self._socket.close()
+
+    def _serve(self, pieces):
+        connection, address = self._socket.accept()
+        connection.settimeout(5)  # so a client waiting for more fails, not hangs
+        connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with connection:
+            for piece in pieces:
+                if piece is RECEIVE:
+                    count = len(self.received)
+                    while len(self.received) == count and self._receive(connection):
+                        pass
+                else:
+                    try:
+                        connection.sendall(piece)
+                    except OSError:
+                        return  # the client read all it wanted, and left
+                    time.sleep(0.005)  # so the client reads the pieces apart
+
+            while self._receive(connection):
+                pass
+
+    # reads once from the client, False once it is gone
+    def _receive(self, connection):
+        try:
+            read = connection.recv(65536)
+        except (socket.timeout, OSError):
+            return False
+
+        self._buffer += read
+        *frames, self._buffer = self._buffer.split(b'\x04')
+        self.received.extend(json.loads(frame.decode('utf-8')) for frame in frames)
+        return len(read) > 0
+
+
+# connects a client to a server sending pieces, and gets the messages it reads
+def _play(pieces, count=len(EVENTS), byte_reads=False, **connect):
+    server = _Server(pieces)
+    client = Client()
+    try:
+        client.connect('127.0.0.1', server.port, **connect)
+        if byte_reads:  # reads one byte at a time, so every read splits the stream
+            client._client.transport._received_buffer = FrameBuffer(1, max_read_size=1)
+        messages = [client.wait_for_event('message') for _ in range(count)]
+    finally:
+        client.close()
+        server.join()
+
+    return messages, server
+
+
+@pytest.mark.parametrize('offset', range(0, len(STREAM) + 1))
+def test_reads_messages_split_at_every_byte_offset(offset):
+    messages, server = _play([STREAM[:offset], STREAM[offset:]])
+    assert messages == [event['data'] for event in EVENTS]
+
+
+def test_reads_a_byte_at_a_time():
+    messages, server = _play([STREAM], byte_reads=True)
+    assert messages == [event['data'] for event in EVENTS]
+
+
+def test_reads_many_messages_in_one_piece():
+    messages, server = _play([STREAM * 4], count=len(EVENTS) * 4)
+    assert messages == [event['data'] for event in EVENTS] * 4
+
+
+def test_reads_a_message_whose_eot_is_split_from_it():
+    first = _frame(EVENTS[0])
+    pieces = [first[:-1], first[-1:] + STREAM[len(first):-1], STREAM[-1:]]
+    messages, server = _play(pieces)
+    assert messages == [event['data'] for event in EVENTS]
+
+
+def test_sends_frames_the_server_reads():
+    server = _Server([])
+    client = Client()
+    try:
+        client.connect('127.0.0.1', server.port)
+        client.send('alias', 'Checkers')
+        client.send('play', {'gameName': 'Checkers', 'text': 'ü\x04'})
+        client.flush()
+    finally:
+        client.close()
+        server.join()
+
+    assert [(event['event'], event['data']) for event in server.received] == [
+        ('alias', 'Checkers'),
+        ('play', {'gameName': 'Checkers', 'text': 'ü\x04'})
+    ]
+
+
+# what the server sends once asked to compress: its uncompressed reply, then
+# the frames as one deflated stream, flushed after each frame as it would be
+def _compressed(format, events=EVENTS):
+    deflater = zlib.compressobj(6, zlib.DEFLATED, {'zlib': 15, 'gzip': 31}[format])
+    stream = b''.join(deflater.compress(_frame(event)) + deflater.flush(zlib.Z_SYNC_FLUSH) for event in events)
+    return _frame({'event': 'compressed', 'data': {'format': format}}), stream
+
+
+@pytest.mark.parametrize('format', ['zlib', 'gzip'])
+def test_reads_compressed_messages_split_at_every_byte_offset(format):
+    reply, stream = _compressed(format)
+    assert b'\x04' in stream  # which must not be taken for the end of a frame
+
+    for offset in range(len(stream) + 1):  # most offsets cut a deflate block short
+        messages, server = _play([RECEIVE, reply + stream[:offset], stream[offset:]], compress=format)
+        assert messages == [event['data'] for event in EVENTS], offset
+        assert server.received[0]['event'] == 'compress'
+        assert server.received[0]['data'] == {'format': format}
+
+
+def test_reads_compressed_messages_a_byte_at_a_time():
+    reply, stream = _compressed('zlib')
+    pieces = [RECEIVE, reply] + [stream[i:i + 1] for i in range(len(stream))]
+    messages, server = _play(pieces, byte_reads=True, compress='zlib')
+    assert messages == [event['data'] for event in EVENTS]
+
+
+def test_reads_a_message_inflated_in_pieces():
+    events = [{'event': 'message', 'data': 'x' * (1024 * 1024)}] + EVENTS
+    reply, stream = _compressed('zlib', events)
+    messages, server = _play([RECEIVE, reply + stream], count=len(events), compress='zlib')
+    assert messages == [event['data'] for event in events]
+
+
+def test_reads_uncompressed_messages_once_compression_is_declined():
+    reply = _frame({'event': 'compressed', 'data': {'format': None}})
+    messages, server = _play([RECEIVE, reply + STREAM[:9], STREAM[9:]], compress='zlib')
+    assert messages == [event['data'] for event in EVENTS]
+
+
+# plays a game of a turn against the loopback server, the AI's turn being
+# turn(ai), and the server replying to runs with reply(data, number)
+def _play_turn(turn, reply):
+    class AI(games.checkers.AI):
+        def run_turn(self):
+            turn(self)
+            return True
+
+    server = loopback.Server(reply=reply)
+    ai = run(loopback.args(), transport=LoopbackTransport(server), ai_class=AI)
+    return ai, server
+
+
+# replies to each run with the message it logged
+def _echo(data, number):
+    return [{'event': 'ran', 'data': data['args']['message']}]
+
+
+def test_resolves_batched_runs_in_the_order_sent():
+    seen = {}
+
+    def turn(ai):
+        with joueur.client.batch():
+            pending = [ai.player.log(str(number)) for number in range(5)]
+            seen['sent'] = [run.done() for run in pending]
+            seen['third'] = pending[2].result()  # resolves those before it too
+            seen['resolved'] = [run.done() for run in pending]
+
+        seen['results'] = [run.result() for run in pending]
+        seen['types'] = set(type(run) for run in pending)
+
+    ai, server = _play_turn(turn, _echo)
+    assert seen['types'] == {PendingRun}
+    assert seen['sent'] == [False] * 5
+    assert seen['third'] == '2'
+    assert seen['resolved'] == [True, True, True, False, False]
+    assert seen['results'] == ['0', '1', '2', '3', '4']
+    assert [data['args']['message'] for event, data in server.sent if event == 'run'] == ['0', '1', '2', '3', '4']
+
+
+def test_merges_deltas_sent_between_replies_as_they_come():
+    seen = {}
+
+    def reply(data, number):
+        return [
+            {'event': 'delta', 'data': {'currentTurn': 10 + number}},
+            {'event': 'ran', 'data': number}
+        ]
+
+    def turn(ai):
+        with joueur.client.batch():
+            pending = [ai.player.log(str(number)) for number in range(3)]
+            seen['second'] = pending[1].result()
+            seen['turn at the second'] = ai.game.current_turn
+
+        seen['turn after'] = ai.game.current_turn
+
+    ai, server = _play_turn(turn, reply)
+    assert seen['second'] == 1
+    assert seen['turn at the second'] == 11
+    assert seen['turn after'] == 12
+
+
+def test_resolves_game_objects_returned():
+    seen = {}
+
+    def turn(ai):
+        with joueur.client.batch():
+            pending = ai.player.log('which checker?')
+        seen['returned'] = pending.result()
+        seen['checker'] = ai.game.get_game_object('2')
+
+    ai, server = _play_turn(turn, lambda data, number: [{'event': 'ran', 'data': {'id': '2'}}])
+    assert seen['returned'] is seen['checker']
+    assert seen['checker'].x == 1
+
+
+def test_raises_game_over_into_runs_still_pending():
+    seen = {'raised': []}
+
+    def reply(data, number):
+        if number < 2:
+            return [{'event': 'ran', 'data': number}]
+        # ends the game instead of replying to it, then sends nothing more
+        return loopback.ending() if number == 2 else []
+
+    def turn(ai):
+        pending = []
+        try:
+            with joueur.client.batch():
+                pending.extend(ai.player.log(str(number)) for number in range(4))
+                pending[3].result()
+        finally:
+            seen['done'] = [run.done() for run in pending]
+            seen['resolved'] = [run.result() for run in pending[:2]]
+            for run in pending[2:]:
+                with pytest.raises(GameOver):
+                    run.result()
+                seen['raised'].append(run)
+            with pytest.raises(GameOver):
+                ai.player.log('after the game')  # nothing can be run once over
+
+    ai, server = _play_turn(turn, reply)  # and the game ends without an error
+    assert seen['done'] == [True, True, False, False]
+    assert seen['resolved'] == [0, 1]
+    assert len(seen['raised']) == 2
+    assert ai.player.won
+    assert 'finished' not in [event for event, data in server.sent]
+
+
+def test_waits_for_each_run_outside_a_batch():
+    seen = []
+
+    def reply(data, number):
+        seen.append(('replied', number))
+        return [{'event': 'ran', 'data': number * 10}]
+
+    def turn(ai):
+        for number in range(3):
+            returned = ai.player.log(str(number))
+            seen.append(('returned', returned))
+
+    ai, server = _play_turn(turn, reply)
+    assert seen == [
+        ('replied', 0), ('returned', 0),
+        ('replied', 1), ('returned', 10),
+        ('replied', 2), ('returned', 20)
+    ]
+
+
+def test_uses_a_client_per_thread():
+    clients = {}
+
+    def current(name):
+        clients[name] = (joueur.client.current(), joueur.client.current())
+
+    threads = [threading.Thread(target=current, args=(name,)) for name in ('a', 'b')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert clients['a'][0] is clients['a'][1]  # the same one each time
+    assert clients['b'][0] is clients['b'][1]
+    assert clients['a'][0] is not clients['b'][0]
+
+
+def test_uses_a_client_until_reset():
+    before = joueur.client.current()
+    client = Client()
+    token = joueur.client.use(client)
+    try:
+        assert joueur.client.current() is client
+    finally:
+        joueur.client.reset(token)
+
+    assert joueur.client.current() is before
+
+
+# logs its name each turn, so every run of each game can be told apart
+def _naming_ai(name, wait=None):
+    class AI(games.checkers.AI):
+        def start(self):
+            self.replies = []
+
+        def run_turn(self):
+            if wait:
+                wait()  # until every game is in a turn at once
+            self.replies.append(self.player.log(name))
+            return True
+
+    return AI
+
+
+def test_plays_games_in_threads_apart():
+    barrier = threading.Barrier(2, timeout=5)
+    servers = {name: loopback.Server(turns=3, reply=_echo) for name in ('a', 'b')}
+    ais = {}
+
+    def play(name):
+        ais[name] = run(loopback.args(), transport=LoopbackTransport(servers[name]), ai_class=_naming_ai(name, barrier.wait))
+
+    threads = [threading.Thread(target=play, args=(name,)) for name in servers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    for name, server in servers.items():
+        assert ais[name].replies == [name] * 3
+        callers = [data['caller'] for event, data in server.sent if event == 'run']
+        assert callers == [ais[name].player] * 3
+        assert ais[name].player.won
+
+
+def test_plays_games_in_asyncio_tasks_apart():
+    def async_naming_ai(name):
+        class AI(games.checkers.AI):
+            async def start(self):
+                self.replies = []
+
+            async def run_turn(self):
+                await asyncio.sleep(0)  # so the games take turns
+                self.replies.append(await self.player.log(name))
+                return True
+
+        return AI
+
+    servers = {name: loopback.Server(turns=3, reply=_echo) for name in ('a', 'b')}
+
+    async def play():
+        return await asyncio.gather(*[
+            run_async(loopback.args(), transport=LoopbackTransport(server), ai_class=async_naming_ai(name))
+            for name, server in servers.items()
+        ])
+
+    ais = dict(zip(servers, asyncio.run(play())))
+    for name, server in servers.items():
+        assert ais[name].replies == [name] * 3
+        assert [data['caller'] for event, data in server.sent if event == 'run'] == [ais[name].player] * 3
@@ -0,0 +1,64 @@
+# Tests of how errors end the game: exiting with their code by default, or
+# raising a JoueurError instead, for the tournament runner and simulator,
+# which play many games in one process.
+import os
+import subprocess
+import sys
+
+import pytest
+
+import joueur.client
+import joueur.error_code as error_code
+from joueur.client import Client
+from joueur.transport import LoopbackTransport, ScriptedResponder
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def test_exits_with_the_code_by_default():
+    handled = subprocess.run(
+        [sys.executable, '-c', 'import joueur.error_code as e; e.handle_error(e.AI_ERRORED, message="broke")'],
+        cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True
+    )
+
+    assert handled.returncode == error_code.AI_ERRORED
+    assert 'AI_ERRORED' in handled.stderr and 'broke' in handled.stderr
+
+
+def test_raises_instead_of_exiting_when_told_to(monkeypatch):
+    monkeypatch.setattr(error_code, 'exit_on_error', False)
+    with pytest.raises(error_code.JoueurError) as raised:
+        error_code.handle_error(error_code.DELTA_MERGE_FAILURE, message='bad delta')
+
+    assert raised.value.code == error_code.DELTA_MERGE_FAILURE
+    assert raised.value.message == 'bad delta'
+    assert 'DELTA_MERGE_FAILURE' in str(raised.value)
+
+
+def test_keeps_raising_the_first_error_as_it_is():
+    with pytest.raises(error_code.JoueurError) as raised:
+        try:
+            error_code.handle_error(error_code.MALFORMED_JSON, message='first')
+        except error_code.JoueurError:
+            # e.g. the AI's code catching everything, reporting it again
+            error_code.handle_error(error_code.AI_ERRORED, message='second')
+
+    assert raised.value.code == error_code.MALFORMED_JSON
+
+
+def test_disconnects_only_the_current_client():
+    playing, erring = Client(), Client()
+    playing.attach(LoopbackTransport(ScriptedResponder([])))
+    erring.attach(LoopbackTransport(ScriptedResponder([])))
+
+    token = joueur.client.use(erring)
+    try:
+        with pytest.raises(error_code.JoueurError):
+            error_code.handle_error(error_code.AI_ERRORED)
+    finally:
+        joueur.client.reset(token)
+
+    assert erring._client.transport.closed
+    assert not playing._client.transport.closed
+    playing.close()
+    erring.close()
@@ -0,0 +1,82 @@
+# Tests of splitting the stream from the server into EOT delimited frames,
+# however the stream is cut up between reads.
+import socket
+
+from joueur.frame_buffer import FrameBuffer
+
+FRAMES = [b'{"event":"delta","data":{"x":1}}', b'', b'{"event":"ran","data":"\xc3\xbc"}']
+STREAM = b''.join(frame + b'\x04' for frame in FRAMES)
+
+
+# feeds the stream a piece at a time, popping frames after each piece
+def _frames(pieces, read_size=4):
+    buffer = FrameBuffer(read_size)
+    frames = []
+    for piece in pieces:
+        buffer.feed(piece)
+        frames.extend(buffer.frames())
+
+    assert len(buffer) == 0
+    return frames
+
+
+def test_splits_at_every_byte_offset():
+    for offset in range(len(STREAM) + 1):
+        assert _frames([STREAM[:offset], STREAM[offset:]]) == FRAMES, offset
+
+
+def test_splits_at_every_pair_of_offsets():
+    for first in range(len(STREAM) + 1):
+        for second in range(first, len(STREAM) + 1):
+            pieces = [STREAM[:first], STREAM[first:second], STREAM[second:]]
+            assert _frames(pieces) == FRAMES, (first, second)
+
+
+def test_reads_a_byte_at_a_time():
+    assert _frames([STREAM[i:i + 1] for i in range(len(STREAM))]) == FRAMES
+
+
+def test_pops_many_frames_read_at_once():
+    assert _frames([STREAM * 3]) == FRAMES * 3
+
+
+def test_keeps_a_frame_until_its_eot_is_read():
+    buffer = FrameBuffer(4)
+    buffer.feed(FRAMES[0])
+    assert buffer.frames() == []
+    assert len(buffer) == len(FRAMES[0])
+
+    buffer.feed(b'\x04' + FRAMES[2][:3])  # its EOT starts the next read
+    assert buffer.frames() == [FRAMES[0]]
+    assert len(buffer) == 3
+
+
+def test_grows_for_frames_bigger_than_it():
+    frame = b'x' * 100000
+    assert _frames([frame[:70000], frame[70000:] + b'\x04'], read_size=16) == [frame]
+
+
+def test_pops_at_most_the_limit_and_takes_the_rest():
+    buffer = FrameBuffer(4)
+    buffer.feed(STREAM)
+    assert buffer.frames(1) == FRAMES[:1]
+    assert buffer.take() == STREAM[len(FRAMES[0]) + 1:]
+    assert len(buffer) == 0
+
+
+def test_receives_from_a_socket():
+    server, client = socket.socketpair()
+    with server, client:
+        buffer = FrameBuffer(8)
+        frames = []
+        for offset in range(0, len(STREAM), 5):
+            piece = STREAM[offset:offset + 5]
+            server.sendall(piece)
+            assert buffer.recv_into(client) == len(piece)
+            frames.extend(buffer.frames())
+
+        assert frames == FRAMES
+        assert buffer.stats()['bytes_received'] == len(STREAM)
+
+        server.close()
+        assert buffer.recv_into(client) == 0
@@ -0,0 +1,118 @@
+# Golden tests of merging deltas: each recorded delta sequence in
+# fixtures/deltas is merged by the baseline recursive GameManager and by
+# joueur.game_manager, and the states of the two games must be identical
+# after every delta. Regenerate the fixtures with fixtures/make_deltas.py
+import copy
+import gzip
+import importlib
+import json
+import os
+
+import pytest
+
+import baseline_game_manager
+import games.checkers
+import loopback
+from joueur.delta_mergeable import DeltaMergeable
+from joueur.game_manager import GameManager
+
+GAMES = [
+    'anarchy', 'catastrophe', 'checkers', 'chess', 'necrowar', 'newtonian',
+    'pirates', 'saloon', 'spiders', 'stardash', 'stumped'
+]
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'deltas')
+
+
+def _load(game_name):
+    with gzip.open(os.path.join(FIXTURES, game_name + '.json.gz'), 'rb') as file:
+        return json.loads(file.read().decode('utf-8'))
+
+
+# the merged state of one game object, or the game, with references as ids
+def _fields(state):
+    names = set()
+    for cls in type(state).__mro__:
+        names.update(getattr(cls, '__slots__', ()))
+
+    cached = getattr(state, '_cached_from', {})
+    return {
+        name: _value(getattr(state, name)) for name in sorted(names)
+        if name.startswith('_') and name not in cached and hasattr(state, name) and
+        name not in ('_game_objects', '_game_object_classes')
+    }
+
+
+def _value(value):
+    if isinstance(value, DeltaMergeable):
+        return ('reference', getattr(value, '_id', 'game'))
+    if isinstance(value, list):
+        return [_value(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _value(item) for key, item in value.items()}
+    return value
+
+
+# the merged state of the game and its game objects, or only of those ids
+def _snapshot(game, ids=None):
+    game_objects = game._game_objects
+    snapshot = {id: _fields(game_objects[id]) for id in (game_objects if ids is None else ids) if id in game_objects}
+    snapshot['game'] = _fields(game)
+    snapshot['ids'] = sorted(game_objects)
+    return snapshot
+
+
+@pytest.mark.parametrize('game_name', GAMES)
+def test_merges_like_the_baseline(game_name):
+    fixture = _load(game_name)
+    game_module = importlib.import_module('games.' + game_name)
+
+    for sequence in fixture['sequences']:
+        expected_game = game_module.Game()
+        expected = baseline_game_manager.GameManager(expected_game)
+        expected.set_constants(fixture['constants'])
+
+        game = game_module.Game()
+        manager = GameManager(game)
+        manager.set_constants(fixture['constants'])
+
+        for number, delta in enumerate(sequence):
+            expected.apply_delta_state(copy.deepcopy(delta))  # it changes deltas as it merges them
+            merged = copy.deepcopy(delta)
+            manager.apply_delta_state(merged)
+
+            assert merged == delta, 'delta {} was changed by merging it'.format(number)
+            ids = list(delta.get('gameObjects', {}))  # only they can have changed
+            assert _snapshot(game, ids) == _snapshot(expected_game, ids), 'delta {} merged differently'.format(number)
+
+        assert _snapshot(game) == _snapshot(expected_game)
+
+
+def test_fixtures_cover_every_game():
+    games_directory = os.path.join(os.path.dirname(FIXTURES), '..', '..', 'games')
+    games = sorted(
+        name for name in os.listdir(games_directory)
+        if os.path.isfile(os.path.join(games_directory, name, '__init__.py'))
+    )
+    assert games == GAMES
+    for game_name in GAMES:
+        assert os.path.isfile(os.path.join(FIXTURES, game_name + '.json.gz'))
+
+
+def test_warns_once_about_fields_a_class_does_not_have(capsys):
+    manager = GameManager(games.checkers.Game())
+    manager.set_constants(loopback.CONSTANTS)
+    manager.apply_delta_state(copy.deepcopy(loopback.INITIAL))
+    capsys.readouterr()
+
+    manager.apply_delta_state({'gameObjects': {
+        '2': {'testedKing': True, 'y': 1},
+        '3': {'testedKing': False, 'testedCrown': 1}
+    }})
+    manager.apply_delta_state({'gameObjects': {'2': {'testedKing': False}}})
+    warnings = capsys.readouterr().out.splitlines()
+
+    assert len(warnings) == 2
+    assert 'WARNING: Checker has no field "tested_king"' in warnings[0]
+    assert 'WARNING: Checker has no field "tested_crown"' in warnings[1]
+    assert manager.game.get_game_object('2').y == 1  # the rest of the delta is still merged
@@ -0,0 +1,331 @@
+# Tests of reading gamelogs a chunk at a time: whatever the chunk size, and
+# so wherever values are cut off between chunks, what is read must be what
+# json.loads reads from the whole gamelog. Seeking via an index of a gamelog
+# must get to the same state as replaying it does, however the index was
+# got to: built, loaded, or rebuilt once the gamelog changed.
+import contextlib
+import copy
+import gzip
+import io
+import json
+import os
+import pickle
+import shutil
+
+import pytest
+
+import games.necrowar.simulator as simulator_module
+import joueur.gamelog as gamelog_module
+from joueur.gamelog import Gamelog, GamelogIndex
+
+from necrowar_random import Chaos, RandomAI
+
+# values cut off between chunks can parse as shorter values of their own,
+# e.g. "12." of "12.5" as 12, or "-1" of "-1e3" as -1
+GAMELOG = '''{
+    "gamelogVersion": 2,
+    "gameName": "Necrowar",
+    "gameSession": "a \\"quoted\\" ]}, \\u00fc session",
+    "epoch": 1571234567.125,
+    "deltas": [
+        {"type": "ran", "data": 0.0035, "game": {"currentTurn": 12}},
+        {"type": "ran", "data": -12e10, "game": {"gameObjects": {"0": {"gold": 105}}}},
+        {"type": "finished", "data": 3.5E-3, "game": {}},
+        -1e3,
+        12,
+        [1.5, -0, 100],
+        true,
+        null
+    ],
+    "losers": [],
+    "settings": {"half": 0.5, "big": 123456789012345678901234567890},
+    "winners": [{"index": 0, "reason": "won"}],
+    "n": 1.0
+}'''
+
+
+@pytest.fixture(params=['json', 'json.gz'])
+def path(request, tmp_path):
+    path = str(tmp_path / ('gamelog.' + request.param))
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'wb') as file:
+        file.write(GAMELOG.encode('utf-8'))
+
+    return path
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 8, 64 * 1024])
+def test_reads_what_json_loads_does(path, chunk_size):
+    expected = json.loads(GAMELOG)
+    gamelog = Gamelog(path, chunk_size)
+
+    assert list(gamelog.deltas()) == expected.pop('deltas')
+    assert gamelog.info == expected
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3])
+def test_reads_from_the_offset_of_each_delta(path, chunk_size):
+    gamelog = Gamelog(path, chunk_size)
+    frames = list(gamelog._frames())
+
+    for number, (offset, delta) in enumerate(frames):
+        assert [delta for offset, delta in gamelog._frames_from(offset)] == [delta for offset, delta in frames[number:]]
+
+
+# a simulator keeping each delta it sends, as the server writes them to its
+# gamelog
+class _Logged(Chaos):
+    def _setup(self):
+        Chaos._setup(self)
+        self.deltas = []
+        manager = self._clients[0][2]
+        apply_delta_state = manager.apply_delta_state
+
+        def logging(delta):
+            self.deltas.append({'type': 'ran' if self.deltas else 'start', 'data': {}, 'game': json.loads(json.dumps(delta))})
+            apply_delta_state(delta)
+
+        manager.apply_delta_state = logging
+
+
+# the gamelog of a simulated game of LOGGED_TURNS turns, plain and gzipped
+LOGGED_TURNS = 60
+
+
+@pytest.fixture(scope='module')
+def logged(tmp_path_factory):
+    simulator = _Logged((RandomAI, RandomAI), settings={'max_turns': LOGGED_TURNS}, seed=0, ai_settings=('seed=0', 'seed=1'))
+    with contextlib.redirect_stdout(io.StringIO()):
+        ais = simulator.play()
+
+    gamelog = {
+        'gamelogVersion': '2.2.0',
+        'gameName': 'Necrowar',
+        'gameSession': '1',
+        'gameVersion': '0',
+        'constants': dict(simulator_module._constants),
+        'deltas': simulator.deltas,
+        'epoch': 1571234567125,
+        'losers': [{'index': i, 'reason': ai.player.reason_lost} for i, ai in enumerate(ais) if ai.player.lost],
+        'winners': [{'index': i, 'reason': ai.player.reason_won} for i, ai in enumerate(ais) if ai.player.won],
+        'settings': {'maxTurns': str(LOGGED_TURNS)}
+    }
+
+    directory = tmp_path_factory.mktemp('logged')
+    text = json.dumps(gamelog, separators=(',', ':')).encode('utf-8')
+    with open(str(directory / 'Necrowar-1.json'), 'wb') as file:
+        file.write(text)
+    with gzip.open(str(directory / 'Necrowar-1.json.gz'), 'wb') as file:
+        file.write(text)
+
+    return directory
+
+
+@pytest.fixture(params=['json', 'json.gz'])
+def logged_path(request, logged, tmp_path):
+    path = str(tmp_path / ('Necrowar-1.' + request.param))
+    shutil.copyfile(str(logged / ('Necrowar-1.' + request.param)), path)
+    return path
+
+
+# the fields of a game and each of its game objects, as sent in deltas
+def _state(game):
+    def encoded(state):
+        return {
+            name: simulator_module._encode(getattr(state, name))
+            for name in simulator_module._field_names(state.__class__) if name != 'game_objects'
+        }
+
+    state = {id: encoded(game_object) for id, game_object in game.game_objects.items()}
+    state['game'] = encoded(game)
+    return state
+
+
+# the states turns() yields at the start of some turns, by turn
+def _replayed(path, turns):
+    states = {}
+    for game in Gamelog(path).turns():
+        if game.current_turn in turns and game.current_turn not in states:
+            states[game.current_turn] = _state(game)
+    return states
+
+
+def test_seeks_to_the_state_replay_gets_to(logged_path):
+    last = LOGGED_TURNS - 1
+    turns = [0, 49, 50, 51, last]
+    replayed = _replayed(logged_path, turns)
+    assert sorted(replayed) == turns
+
+    # building the index, then via it forwards, backwards, and from where the
+    # game already is
+    gamelog = Gamelog(logged_path)
+    for turn in turns + [51, 0, last, 49]:
+        assert _state(gamelog.seek(turn)) == replayed[turn], turn
+
+    # and via the saved index, reading its snapshots from it
+    gamelog = Gamelog(logged_path)
+    assert isinstance(gamelog.index()._snapshots[max(gamelog.index()._numbers)], tuple)
+    for turn in turns[::-1]:
+        assert _state(gamelog.seek(turn)) == replayed[turn], turn
+
+    assert gamelog.seek(last + 1) is None
+    assert gamelog.info == gamelog.index().info and gamelog.info['winners']
+
+
+def test_snapshots_every_so_many_turns(logged_path):
+    index = Gamelog(logged_path).index()
+
+    assert sorted(index.turns) == list(range(LOGGED_TURNS))
+    snapshot_turns = [turn for turn, number in index.turns.items() if number in index._numbers]
+    assert sorted(snapshot_turns) == [0, 50]
+    assert index.snapshot_before(index.turns[49]) == 0
+    assert index.snapshot_before(index.turns[50]) == index.snapshot_before(index.turns[51]) == index.turns[50]
+
+    # the state snapshots restore is the state replaying to them gets to
+    for number in index._numbers:
+        state = {}
+        removed, list_length = gamelog_module._markers(index.info)
+        for delta in list(Gamelog(logged_path).deltas())[:number + 1]:
+            gamelog_module._merge_state(state, delta['game'], removed, list_length)
+        assert index.state(number) == state
+
+
+def _round_trip(old, new):
+    delta = gamelog_module._diff_state(old, new, '&RM', '&LEN')
+    merged = copy.deepcopy(old)
+    gamelog_module._merge_state(merged, delta, '&RM', '&LEN')
+    return delta, merged
+
+
+def test_diffs_states_that_merge_back():
+    old = {
+        'currentTurn': 3,
+        'players': {'0': {'id': '1'}, '1': {'id': '2'}, '&LEN': 2},
+        'gameObjects': {
+            '1': {'id': '1', 'gold': 5, 'units': {'0': {'id': '3'}, '1': {'id': '4'}, '&LEN': 2}},
+            '3': {'id': '3', 'tile': {'id': '5'}},
+            '4': {'id': '4', 'tile': None},
+            '5': {'id': '5', 'unit': {'id': '3'}}
+        },
+        'session': 'a'
+    }
+    new = {
+        'currentTurn': 4,
+        'players': {'0': {'id': '1'}, '1': {'id': '2'}, '&LEN': 2},
+        'gameObjects': {
+            '1': {'id': '1', 'gold': 5, 'units': {'0': {'id': '4'}, '&LEN': 1}},  # a list shrinking
+            '4': {'id': '4', 'tile': {'id': '5'}},  # None to a reference
+            '5': {'id': '5', 'unit': {'id': '4'}},  # a reference to another
+            '6': {'id': '6', 'tile': {'id': '5'}}
+        }
+    }
+
+    delta, merged = _round_trip(old, new)
+
+    assert merged == new
+    assert delta['gameObjects']['3'] == '&RM' and delta['session'] == '&RM'
+    assert delta['gameObjects']['1'] == {'units': {'0': {'id': '4'}, '&LEN': 1}}
+    assert 'players' not in delta
+    assert _round_trip(new, new) == ({}, new)
+    assert _round_trip(new, old)[1] == old
+    assert _round_trip({}, new)[1] == new
+
+
+def test_diffs_the_states_of_a_game_that_merge_back(logged):
+    gamelog = Gamelog(str(logged / 'Necrowar-1.json'))
+    index = gamelog.index()
+    removed, list_length = gamelog_module._markers(index.info)
+    numbers = {index.turns[turn] for turn in range(0, LOGGED_TURNS, 10)}
+    states = []
+    state = {}
+    for number, delta in enumerate(gamelog.deltas()):
+        gamelog_module._merge_state(state, delta['game'], removed, list_length)
+        if number in numbers:
+            states.append(copy.deepcopy(state))
+
+    for old, new in zip(states, states[1:]):
+        assert _round_trip(old, new)[1] == new
+        assert _round_trip(states[0], new)[1] == new
+
+
+def test_saves_and_loads_the_index(logged_path):
+    gamelog = Gamelog(logged_path)
+    built = gamelog.index()
+    loaded = GamelogIndex.load(gamelog.index_path, logged_path)
+
+    # saved via a temporary file, which is gone once it is
+    assert sorted(os.listdir(os.path.dirname(logged_path))) == sorted(
+        os.path.basename(path) for path in (logged_path, gamelog.index_path))
+    assert (loaded.gamelog, loaded.every, loaded.info, loaded.turns) == (built.gamelog, built.every, built.info, built.turns)
+    assert list(loaded.offsets) == list(built.offsets)
+    assert loaded._numbers == built._numbers
+    for number in built._numbers:
+        assert loaded.state(number) == built.state(number)
+
+    # indexes with snapshots other distances apart, and of other versions, are not
+    assert GamelogIndex.load(gamelog.index_path, logged_path, every=10) is None
+    with open(gamelog.index_path, 'rb') as file:
+        saved = file.read()
+    fields = pickle.loads(saved)
+    fields['version'] = gamelog_module.INDEX_VERSION + 1
+    with open(gamelog.index_path, 'wb') as file:
+        pickle.dump(fields, file)
+    assert GamelogIndex.load(gamelog.index_path, logged_path) is None
+
+    # and neither are missing or cut off ones
+    with open(gamelog.index_path, 'wb') as file:
+        file.write(saved[:len(saved) // 3])
+    assert GamelogIndex.load(gamelog.index_path, logged_path) is None
+    assert GamelogIndex.load(gamelog.index_path + '.missing', logged_path) is None
+
+
+def test_keeps_the_saved_index_when_saving_fails(logged_path, monkeypatch, capsys):
+    gamelog = Gamelog(logged_path)
+    gamelog.index().save(gamelog.index_path)
+    with open(gamelog.index_path, 'rb') as file:
+        saved = file.read()
+
+    def failing(source, destination):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(gamelog_module.os, 'replace', failing)
+    GamelogIndex.build(gamelog).save(gamelog.index_path)
+
+    assert 'disk full' in capsys.readouterr().out
+    with open(gamelog.index_path, 'rb') as file:
+        assert file.read() == saved
+    assert not [name for name in os.listdir(os.path.dirname(logged_path)) if name.endswith('.tmp')]
+
+    # and an index that can not be saved is still used
+    unsaved = Gamelog(logged_path, index_path=os.path.join(logged_path + '.missing', 'index'))
+    assert unsaved.seek(50).current_turn == 50
+    assert unsaved.index() is unsaved._index
+
+
+def test_rebuilds_the_index_once_the_gamelog_changes(logged_path):
+    gamelog = Gamelog(logged_path)
+    index = gamelog.index()
+    assert GamelogIndex.load(gamelog.index_path, logged_path) is not None
+
+    # touched, so it could be another gamelog of the same size
+    stat = os.stat(logged_path)
+    os.utime(logged_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+    assert GamelogIndex.load(gamelog.index_path, logged_path) is None
+
+    rebuilt = Gamelog(logged_path).index()
+    assert rebuilt.gamelog != index.gamelog
+    assert rebuilt.gamelog == gamelog_module._stat(logged_path)
+    assert GamelogIndex.load(gamelog.index_path, logged_path).gamelog == rebuilt.gamelog
+
+    # and rewritten, with only its first turn
+    first = _state(next(Gamelog(logged_path).turns()))
+    opener = gzip.open if logged_path.endswith('.gz') else open
+    with opener(logged_path, 'rb') as file:
+        rewritten = json.loads(file.read().decode('utf-8'))
+    del rewritten['deltas'][rebuilt.turns[1]:]
+    with opener(logged_path, 'wb') as file:
+        file.write(json.dumps(rewritten).encode('utf-8'))
+
+    shorter = Gamelog(logged_path)
+    assert shorter.seek(50) is None
+    assert _state(shorter.seek(0)) == first
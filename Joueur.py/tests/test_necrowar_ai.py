@@ -0,0 +1,44 @@
+# Tests of the bundled Necrowar AI's game_updated: the towers and the tiles
+# with corpses it keeps track of from what each update changed must be the
+# same as rescanning the whole game, as it did before, after every update of
+# seeded games in the simulator
+from necrowar_random import Chaos, RandomAI
+
+
+# the bundled AI, checking what it tracks against a rescan after each update
+class _Checked(RandomAI):
+    def start(self):
+        self.seen = {'new': 0, 'destroyed': 0, 'corpses': 0, 'cleared': 0}
+        self._towers = list(self.player.towers)
+        self._corpse_tiles = set()
+        RandomAI.start(self)
+        self._check()
+
+    def game_updated(self):
+        RandomAI.game_updated(self)
+        if hasattr(self, 'seen'):  # started
+            self._check()
+
+    def _check(self):
+        towers = list(self.player.towers)
+        corpse_tiles = set(tile for tile in self.game.tiles if tile.corpses)
+
+        assert self.new_towers == [tower for tower in towers if tower not in self._towers]
+        assert self.destroyed_towers == [tower for tower in self._towers if tower not in towers]
+        assert self.corpse_tiles == corpse_tiles
+
+        self.seen['new'] += len(self.new_towers)
+        self.seen['destroyed'] += len(self.destroyed_towers)
+        self.seen['corpses'] += len(corpse_tiles - self._corpse_tiles)
+        self.seen['cleared'] += len(self._corpse_tiles - corpse_tiles)
+        self._towers = towers
+        self._corpse_tiles = corpse_tiles
+
+
+def test_tracks_towers_and_corpses_as_a_rescan_would():
+    simulator = Chaos((_Checked, _Checked), settings={'max_turns': 30}, seed=0, ai_settings=('seed=0', 'seed=0'))
+    ais = simulator.play()
+
+    assert simulator.errors == {}
+    for ai in ais:  # so the checks above checked each kind of change
+        assert all(count > 0 for count in ai.seen.values()), ai.seen
@@ -0,0 +1,211 @@
+# Tests of the Necrowar simulator: seeded games between random AIs must end
+# the way the server's would, with both AIs' games merged from its deltas to
+# the same state as the one its rules act on, and AIs running invalid
+# commands, running out of time, or stuck running invalid commands must be
+# handled as the server would handle their clients
+import time
+
+import pytest
+
+import games.necrowar.simulator as simulator_module
+from games.necrowar.game import Game
+from games.necrowar.simulator import Simulator
+
+from necrowar_random import Chaos, RandomAI
+
+
+# the fields of the game, or a game object, as sent in deltas
+def _encoded(state):
+    return {
+        name: simulator_module._encode(getattr(state, name))
+        for name in simulator_module._field_names(state.__class__) if name != 'game_objects'
+    }
+
+
+# a simulator checking, after each delta it sends, that what it changed is the
+# same in each AI's game as in its own
+class _Compared(Chaos):
+    compared = 0
+
+    def _flush(self):
+        changed = [game_object.id for game_object in self._created]
+        changed += [state.id for state in self._dirty if state is not self.game]
+        Chaos._flush(self)
+
+        for game, ai, manager in self._clients:
+            for id in changed:
+                assert _encoded(game.get_game_object(id)) == _encoded(self.game.get_game_object(id)), id
+            assert _encoded(game) == _encoded(self.game)
+            self.compared += len(changed)
+
+
+def test_plays_a_seeded_game_to_its_end():
+    simulator = Simulator((RandomAI, RandomAI), settings={'max_turns': 20}, seed=3, ai_settings=('seed=1', 'seed=2'))
+    ais = simulator.play()
+    players = [ai.player for ai in ais]
+
+    assert simulator.errors == {}
+    assert simulator.game.current_turn == 19
+    assert [player.won for player in players].count(True) == 1
+    winner = next(player for player in players if player.won)
+    loser = winner.opponent
+    assert loser.lost and not winner.lost
+    assert winner.reason_won == 'Max turns reached (20), Identical AIs played the game - Won via coin flip.'
+    assert loser.reason_lost == 'Max turns reached (20), Identical AIs played the game - Lost via coin flip.'
+
+    # seeded, so the same game again
+    again = Simulator((RandomAI, RandomAI), settings={'max_turns': 20}, seed=3, ai_settings=('seed=1', 'seed=2')).play()
+    assert [ai.player.won for ai in again] == [player.won for player in players]
+    assert [len(ai.invalids) for ai in again] == [len(ai.invalids) for ai in ais]
+    assert [ai.player.gold for ai in again] == [player.gold for player in players]
+
+
+def test_wins_by_castle_health():
+    class Sieged(Simulator):
+        def _before_turn(self):
+            castle = self.game.players[1].towers[0]
+            self._set(castle, 'health', castle.health - 1)
+            Simulator._before_turn(self)
+
+    ais = Sieged((RandomAI, RandomAI), settings={'max_turns': 6}, seed=0).play()
+
+    assert ais[0].player.won and ais[1].player.lost
+    assert ais[0].player.reason_won == 'Max turns reached (6): You had higher castle health!'
+    assert ais[1].player.reason_lost == "Max turns reached (6): Your opponent's castle had higher health!"
+
+
+def test_sends_both_ais_the_game_it_plays():
+    simulator = _Compared((RandomAI, RandomAI), settings={'max_turns': 12}, seed=0, ai_settings=('seed=0', 'seed=0'))
+    simulator.play()
+
+    assert simulator.errors == {}
+    assert simulator.compared > 1000
+    for index, (game, ai, manager) in enumerate(simulator._clients):
+        assert isinstance(game, Game) and game is not simulator.game
+        assert ai.player.id == simulator.game.players[index].id
+        assert set(game.game_objects) == set(simulator.game.game_objects)
+        for id, game_object in simulator.game.game_objects.items():
+            assert _encoded(game.get_game_object(id)) == _encoded(game_object), id
+
+
+# an AI running invalid commands, keeping what each returned
+class _Invalid(RandomAI):
+    def start(self):
+        RandomAI.start(self)
+        self.returned = []
+
+    def game_updated(self):
+        RandomAI.game_updated(self)
+        if hasattr(self, 'returned') and self.game.current_player != self.player and not self.returned:
+            self.returned.append(('log', self.player.log('not my turn')))
+
+    def run_turn(self):
+        if len(self.returned) < 5:
+            self.returned.append(('attack', self.player.towers[0].attack(self.game.tiles[0])))
+            self.returned.append(('spawn_worker', self.game.tiles[0].spawn_worker()))
+            self.returned.append(('spawn_unit', self.game.tiles[0].spawn_unit('dragon')))
+            self.returned.append(('res', self.game.tiles[0].res(1)))
+        return True
+
+
+def test_tells_ais_why_commands_are_invalid():
+    simulator = Simulator((RandomAI, _Invalid), settings={'max_turns': 4}, seed=0)
+    ai = simulator.play()[1]
+
+    assert simulator.errors == {}
+    assert ai.returned == [
+        ('log', None), ('attack', False), ('spawn_worker', False), ('spawn_unit', False), ('res', False)
+    ]
+    assert ai.invalids == [
+        'It is not your turn.',
+        '{}, cannot attack a tile with no units!'.format(ai.player.towers[0]),
+        'This tile cannot spawn workers!',
+        'Invalid unit type!',
+        "{} doesn't have 1 corpses, it only has 0!".format(ai.game.tiles[0])
+    ]
+    assert ai.player.logs == []
+
+
+# an AI taking longer than its clock allows
+class _Slow(RandomAI):
+    def run_turn(self):
+        time.sleep(0.3)
+        return True
+
+
+# an AI logging until it is stopped, ignoring any errors
+class _Looping(RandomAI):
+    def run_turn(self):
+        self.looped = 0
+        while True:
+            try:
+                self.player.log('still here')
+            except Exception:
+                pass
+            self.looped += 1
+
+
+@pytest.mark.parametrize('ai_class', [_Slow, _Looping])
+def test_times_out_players_out_of_time(ai_class):
+    simulator = Simulator(
+        (RandomAI, ai_class), settings={'max_turns': 10, 'player_starting_time': 200000000, 'time_added_per_turn': 0}, seed=0
+    )
+    ais = simulator.play()
+
+    assert simulator.errors == {}
+    assert simulator.game.current_turn == 1
+    assert ais[1].player.lost and ais[1].player.reason_lost == 'Disconnected during gameplay.'
+    assert ais[0].player.won and ais[0].player.reason_won == 'All other players timed out.'
+    assert ais[1].player.time_remaining <= 0
+    if ai_class is _Looping:
+        assert ais[1].looped > 0
+
+
+# an AI running the same invalid command until it is stopped, as the bundled
+# AI does once it has no path to where it wants a worker to go
+class _Stuck(RandomAI):
+    def run_turn(self):
+        self.tried = 0
+        while not self.player.towers[0].attack(self.game.tiles[0]):
+            self.tried += 1
+            if self.tried > 1000000:
+                return True
+
+
+def test_disconnects_players_stuck_running_invalid_commands():
+    simulator = Simulator((RandomAI, _Stuck), settings={'max_turns': 10}, seed=0, max_invalid=50)
+    start = time.perf_counter()
+    ais = simulator.play()
+
+    assert time.perf_counter() - start < 5
+    assert ais[1].tried == 50
+    assert len(ais[1].invalids) == 50
+    assert simulator.errors == {1: 'Ran more than 50 invalid commands in one turn.\n'}
+    assert ais[1].player.lost and ais[1].player.reason_lost == 'Disconnected during gameplay.'
+    assert ais[0].player.won and ais[0].player.reason_won == 'All other players disconnected.'
+
+
+def test_counts_invalid_commands_by_turn():
+    class Few(RandomAI):
+        def run_turn(self):
+            for i in range(40):
+                self.player.towers[0].attack(self.game.tiles[0])
+            return True
+
+    simulator = Simulator((Few, Few), settings={'max_turns': 6}, seed=0, max_invalid=50)
+    ais = simulator.play()
+
+    assert simulator.errors == {}
+    assert [len(ai.invalids) for ai in ais] == [120, 120]
+
+
+def test_lets_stuck_players_run_out_of_time_without_max_invalid():
+    simulator = Simulator(
+        (RandomAI, _Stuck), settings={'max_turns': 10, 'player_starting_time': 20000000, 'time_added_per_turn': 0},
+        seed=0, max_invalid=None
+    )
+    ais = simulator.play()
+
+    assert simulator.errors == {}
+    assert 50 < ais[1].tried < 1000000
+    assert ais[0].player.won and ais[0].player.reason_won == 'All other players timed out.'
@@ -0,0 +1,370 @@
+# Tests of joueur.pathfinding: bfs must find the very same paths as the
+# find_path each tile game's AI had before, ties included, and a_star and
+# bidirectional paths as short, on the map of the recorded Necrowar game and on
+# small maps drawn for the cases the searches treat specially
+import gzip
+import json
+import os
+import random
+
+import pytest
+
+import games.necrowar
+from joueur.game_manager import GameManager
+from joueur.pathfinding import Pathfinder
+
+import loopback
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'deltas', 'necrowar.json.gz')
+
+SEARCHES = ['bfs', 'a_star', 'bidirectional']
+
+
+# the AIs' find_path before, given what tiles paths can go through
+def _find_path_before(start, goal, passable):
+    if start == goal:
+        return []
+
+    fringe = [start]
+    came_from = {}
+    while len(fringe) > 0:
+        inspect = fringe.pop(0)
+        for neighbor in inspect.get_neighbors():
+            if neighbor == goal:
+                path = [goal]
+                while inspect != start:
+                    path.insert(0, inspect)
+                    inspect = came_from[inspect.id]
+                return path
+
+            if neighbor and neighbor.id not in came_from and passable(neighbor):
+                fringe.append(neighbor)
+                came_from[neighbor.id] = inspect
+
+    return []
+
+
+# what the Necrowar AI's workers could walk through
+def _passable(tile):
+    return tile.unit is None and not tile.is_river and not tile.is_unit_spawn
+
+
+# a manager of the recorded game, after all of its deltas, so it has units
+def _recorded():
+    with gzip.open(FIXTURE, 'rb') as file:
+        recorded = json.loads(file.read().decode('utf-8'))
+
+    manager = GameManager(games.necrowar.Game())
+    manager.set_constants(recorded['constants'])
+    for delta in recorded['sequences'][0]:
+        manager.apply_delta_state(delta)
+
+    return manager
+
+
+# a manager of a map drawn as rows, '#' being the river, which is not
+# passable, and anything else land
+def _drawn(*rows):
+    width, height = len(rows[0]), len(rows)
+
+    def tile_at(x, y):
+        return {'id': str(x + y * width)} if 0 <= x < width and 0 <= y < height else None
+
+    game_objects = {}
+    for y, row in enumerate(rows):
+        for x, drawn in enumerate(row):
+            game_objects[str(x + y * width)] = {
+                'id': str(x + y * width), 'gameObjectName': 'Tile', 'x': x, 'y': y,
+                'isRiver': drawn == '#',
+                'tileNorth': tile_at(x, y - 1), 'tileEast': tile_at(x + 1, y),
+                'tileSouth': tile_at(x, y + 1), 'tileWest': tile_at(x - 1, y)
+            }
+
+    manager = GameManager(games.necrowar.Game())
+    manager.set_constants(loopback.CONSTANTS)
+    manager.apply_delta_state({
+        'gameObjects': game_objects,
+        'mapWidth': width,
+        'mapHeight': height,
+        'tiles': loopback._list(*(tile_at(x, y) for y in range(height) for x in range(width)))
+    })
+    return manager
+
+
+# checks a path found goes from start to goal one neighbor at a time, only
+# through passable tiles
+def _check(path, start, goal):
+    for tile, after in zip([start] + path, path):
+        assert after in tile.neighbors
+        assert after is goal or _passable(after)
+    assert not path or path[-1] is goal
+
+
+def test_finds_the_paths_find_path_did_on_a_real_map():
+    game = _recorded().game
+    pathfinder = Pathfinder(game)
+    rng = random.Random(0)
+    pairs = [(rng.choice(game.tiles), rng.choice(game.tiles)) for _ in range(200)]
+    pairs.append((game.get_tile_at(0, 0), game.get_tile_at(game.map_width - 1, game.map_height - 1)))
+
+    found = 0
+    for start, goal in pairs:
+        path = _find_path_before(start, goal, _passable)
+        assert pathfinder.find_path(start, goal, _passable) == path
+        for search in ('a_star', 'bidirectional'):
+            searched = pathfinder.find_path(start, goal, _passable, search)
+            assert len(searched) == len(path)
+            _check(searched, start, goal)
+        found += bool(path)
+
+    # so both paths and no paths were compared
+    assert 0 < found < len(pairs)
+
+
+def test_breaks_ties_the_way_find_path_did():
+    game = _drawn(
+        '.....',
+        '.#...',
+        '.....',
+        '...#.',
+        '.....'
+    ).game
+    pathfinder = Pathfinder(game)
+
+    for start in game.tiles:
+        for goal in game.tiles:
+            assert pathfinder.find_path(start, goal, _passable) == _find_path_before(start, goal, _passable)
+
+    # of the paths as short, the one going the first direction first
+    corner, across = game.get_tile_at(0, 0), game.get_tile_at(2, 2)
+    assert [(tile.x, tile.y) for tile in pathfinder.find_path(corner, across, _passable)] == [(1, 0), (2, 0), (2, 1), (2, 2)]
+
+
+@pytest.mark.parametrize('search', SEARCHES)
+def test_finds_no_path_from_a_tile_to_itself(search):
+    game = _drawn('...', '...').game
+    pathfinder = Pathfinder(game)
+    tile = game.get_tile_at(1, 1)
+
+    assert pathfinder.find_path(tile, tile, _passable, search) == []
+
+
+@pytest.mark.parametrize('search', SEARCHES)
+def test_finds_no_path_to_a_goal_out_of_reach(search):
+    game = _drawn(
+        '..#..',
+        '..#..',
+        '###..'
+    ).game
+    pathfinder = Pathfinder(game)
+    start = game.get_tile_at(0, 0)
+
+    for goal in (game.get_tile_at(4, 0), game.get_tile_at(3, 2)):
+        assert pathfinder.find_path(start, goal, _passable, search) == []
+        assert _find_path_before(start, goal, _passable) == []
+    assert pathfinder.find_path(start, game.get_tile_at(1, 1), _passable, search) != []
+
+
+@pytest.mark.parametrize('search', SEARCHES)
+def test_ends_paths_on_goals_not_passable(search):
+    game = _drawn(
+        '.....',
+        '..#..',
+        '.....'
+    ).game
+    pathfinder = Pathfinder(game)
+    start, river = game.get_tile_at(0, 1), game.get_tile_at(2, 1)
+
+    path = pathfinder.find_path(start, river, _passable, search)
+    assert len(path) == 2 and path[-1] is river
+    _check(path, start, river)
+
+    # nor do starts need to be, but tiles between them must
+    back = pathfinder.find_path(river, game.get_tile_at(4, 1), _passable, search)
+    assert len(back) == 2
+    _check(back, river, game.get_tile_at(4, 1))
+    assert river not in pathfinder.find_path(start, game.get_tile_at(4, 1), _passable, search)
+
+
+@pytest.mark.parametrize('search', SEARCHES)
+def test_goes_through_anything_without_passable(search):
+    game = _drawn(
+        '.#.',
+        '.#.',
+        '.#.'
+    ).game
+    pathfinder = Pathfinder(game)
+
+    path = pathfinder.find_path(game.get_tile_at(0, 1), game.get_tile_at(2, 1), search=search)
+    assert [(tile.x, tile.y) for tile in path] == [(1, 1), (2, 1)]
+
+
+def test_measures_distances_as_long_as_the_paths_found():
+    game = _recorded().game
+    pathfinder = Pathfinder(game)
+    rng = random.Random(1)
+    units = [unit.tile for unit in game.units if unit.tile]
+
+    for goal in [rng.choice(game.tiles) for _ in range(3)] + units[:2]:
+        steps = pathfinder.distances(goal, _passable)
+        for tile in [goal] + rng.sample(game.tiles, 150):
+            path = _find_path_before(tile, goal, _passable)
+            if tile is goal:
+                assert steps[pathfinder.index(tile)] == 0
+            else:
+                assert steps[pathfinder.index(tile)] == (len(path) if path else -1), (tile, goal)
+
+
+def test_measures_distances_from_the_nearest_of_many_tiles():
+    game = _recorded().game
+    pathfinder = Pathfinder(game)
+    sources = [game.get_tile_at(10, 10), game.get_tile_at(40, 20), game.get_tile_at(5, 28)]
+
+    steps = pathfinder.distances(sources, _passable)
+    for tile in sources + random.Random(2).sample(game.tiles, 150):
+        lengths = [0 if tile is source else len(_find_path_before(tile, source, _passable)) for source in sources]
+        reached = [length for source, length in zip(sources, lengths) if length or tile is source]
+        assert steps[pathfinder.index(tile)] == (min(reached) if reached else -1)
+
+
+def test_caches_distances_until_what_is_on_a_tile_changes():
+    manager = _drawn('....', '....')
+    game = manager.game
+    pathfinder = Pathfinder(game, manager.changes)
+    goal = game.get_tile_at(0, 0)
+
+    steps = pathfinder.distances(goal, _passable)
+    assert pathfinder.distances([goal], _passable) is steps
+    assert steps[pathfinder.index(game.get_tile_at(3, 1))] == 4
+
+    # fields that are not what is on a tile keep them
+    manager.apply_delta_state({'gameObjects': {'5': {'corpses': 3, 'numZombies': 1}}})
+    assert pathfinder.distances(goal, _passable) is steps
+
+    manager.apply_delta_state({'gameObjects': {
+        '9': {'id': '9', 'gameObjectName': 'Unit', 'tile': {'id': '1'}},
+        '1': {'unit': {'id': '9'}}
+    }})
+    blocked = pathfinder.distances(goal, _passable)
+    assert blocked is not steps
+    assert blocked[pathfinder.index(game.get_tile_at(1, 0))] == 1  # a unit's tile can still be the end
+    assert blocked[pathfinder.index(game.get_tile_at(2, 0))] == 4  # around it
+
+    manager.apply_delta_state({'gameObjects': {'1': {'unit': None}}})
+    assert pathfinder.distances(goal, _passable) == steps
+
+
+def test_caches_distances_until_the_fields_watched_change():
+    manager = _drawn('....', '....')
+    game = manager.game
+    pathfinder = Pathfinder(game, manager.changes, watch=['corpses'])
+    steps = pathfinder.distances(game.get_tile_at(0, 0), _passable)
+
+    manager.apply_delta_state({'gameObjects': {'9': {'id': '9', 'gameObjectName': 'Unit'}, '1': {'unit': {'id': '9'}}}})
+    assert pathfinder.distances(game.get_tile_at(0, 0), _passable) is steps
+
+    manager.apply_delta_state({'gameObjects': {'5': {'corpses': 1}}})
+    assert pathfinder.distances(game.get_tile_at(0, 0), _passable) is not steps
+
+
+def test_caches_distances_until_cleared_without_changes():
+    manager = _drawn('....', '....')
+    game = manager.game
+    pathfinder = Pathfinder(game)
+    steps = pathfinder.distances(game.get_tile_at(0, 0), _passable)
+
+    manager.apply_delta_state({'gameObjects': {'9': {'id': '9', 'gameObjectName': 'Unit'}, '1': {'unit': {'id': '9'}}}})
+    assert pathfinder.distances(game.get_tile_at(0, 0), _passable) is steps
+
+    pathfinder.clear()
+    assert pathfinder.distances(game.get_tile_at(0, 0), _passable) is not steps
+
+
+def test_caches_distances_by_passable():
+    game = _drawn('.#..').game
+    pathfinder = Pathfinder(game)
+    goal = game.get_tile_at(0, 0)
+
+    walled = pathfinder.distances(goal, _passable)
+    anything = pathfinder.distances(goal)
+    assert walled[3] == -1 and anything[3] == 3
+    assert pathfinder.distances(goal, _passable) is walled
+
+
+def test_forgets_the_oldest_distances_past_max_cached():
+    game = _drawn('....', '....').game
+    pathfinder = Pathfinder(game)
+    pathfinder.max_cached = 3
+
+    first, second, third, fourth = (pathfinder.distances(game.tiles[i], _passable) for i in range(4))
+
+    assert len(pathfinder._distances) == 3
+    assert pathfinder.distances(game.tiles[3], _passable) is fourth
+    assert pathfinder.distances(game.tiles[1], _passable) is second
+    assert pathfinder.distances(game.tiles[0], _passable) is not first
+
+    # the oldest found, not the oldest asked for, was forgotten for it
+    assert pathfinder.distances(game.tiles[2], _passable) is third
+    assert pathfinder.distances(game.tiles[3], _passable) is fourth
+    assert pathfinder.distances(game.tiles[1], _passable) is not second
+    assert len(pathfinder._distances) == 3
+
+
+def test_finds_the_nearest_candidate():
+    game = _drawn(
+        '.....',
+        '.###.',
+        '.....'
+    ).game
+    pathfinder = Pathfinder(game)
+    goal = game.get_tile_at(0, 0)
+    tiles = [game.get_tile_at(x, y) for x, y in ((4, 2), (4, 0), (0, 2), (2, 2))]
+
+    assert pathfinder.nearest(goal, tiles, _passable) is tiles[2]
+    assert pathfinder.nearest(goal, tiles[:2], _passable) is tiles[1]  # tied, so the first
+    assert pathfinder.nearest(goal, [], _passable) is None
+    assert pathfinder.nearest(goal, [goal, tiles[0]], _passable) is goal
+
+    class Candidate():
+        def __init__(self, tile):
+            self.tile = tile
+
+    candidates = [Candidate(None), Candidate(tiles[0]), Candidate(tiles[3])]
+    assert pathfinder.nearest(goal, candidates, _passable) is candidates[2]
+
+    island = _drawn('..#..').game
+    pathfinder = Pathfinder(island)
+    assert pathfinder.nearest(island.tiles[0], [island.tiles[3], island.tiles[4]], _passable) is None
+
+
+def test_picks_the_closest_worker_the_way_find_path_did():
+    manager = _recorded()
+    game = manager.game
+    checked = 0
+    for player in game.players:
+        ai = games.necrowar.AI(game)
+        ai.set_player(player)
+        ai.set_changes(manager.changes)
+        workers = [unit for unit in game.units if unit.job.title == 'worker' and unit.owner == player]
+
+        # as closest_worker was, measuring each worker's path
+        def before(tile, low, high):
+            best_distance = 9999
+            best_worker = None
+            for count, unit in enumerate(workers, 1):
+                if unit.tile == tile:
+                    return unit
+                if low <= count <= high and not unit.acted and unit.moves > 0:
+                    distance = len(_find_path_before(unit.tile, tile, ai.walkable))
+                    if distance < best_distance:
+                        best_distance = distance
+                        best_worker = unit
+            return best_worker
+
+        for tile in game.tiles[::37]:
+            for low, high in ((0, 99), (2, 4)):
+                assert ai.closest_worker(tile, low, high) is before(tile, low, high), (tile, low, high)
+                checked += 1
+
+    # so workers that could move were compared
+    assert checked and any(not unit.acted and unit.moves > 0 and unit.job.title == 'worker' for unit in game.units)
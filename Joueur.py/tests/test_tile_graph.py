@@ -0,0 +1,120 @@
+# Tests of joueur.tile_graph and the neighbors Tiles cache: the adjacency
+# arrays must hold the same neighbors as get_neighbors() for every tile, and
+# a tile's cached neighbors must follow the deltas changing its links
+import gzip
+import importlib
+import json
+import os
+
+import pytest
+
+import games.necrowar
+from joueur.game_manager import GameManager
+from joueur.tile_graph import adjacency
+
+import loopback
+
+TILE_GAMES = ['catastrophe', 'necrowar', 'newtonian', 'pirates', 'saloon', 'stumped']
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'deltas', 'necrowar.json.gz')
+
+WIDTH = 4
+HEIGHT = 3
+
+
+# a reference to the tile at a position, or None off the map
+def _tile_at(x, y):
+    if 0 <= x < WIDTH and 0 <= y < HEIGHT:
+        return {'id': str(x + y * WIDTH)}
+
+    return None
+
+
+# a manager with a first state of a small map of linked tiles, but for the
+# tiles left out of it
+def _manager(game_name, without=()):
+    game_objects = {}
+    for y in range(HEIGHT):
+        for x in range(WIDTH):
+            if (x, y) in without:
+                continue
+            game_objects[str(x + y * WIDTH)] = {
+                'id': str(x + y * WIDTH), 'gameObjectName': 'Tile', 'x': x, 'y': y,
+                'tileNorth': _tile_at(x, y - 1), 'tileEast': _tile_at(x + 1, y),
+                'tileSouth': _tile_at(x, y + 1), 'tileWest': _tile_at(x - 1, y)
+            }
+
+    manager = GameManager(importlib.import_module('games.' + game_name).Game())
+    manager.set_constants(loopback.CONSTANTS)
+    manager.apply_delta_state({
+        'gameObjects': game_objects,
+        'mapWidth': WIDTH,
+        'mapHeight': HEIGHT,
+        'tiles': loopback._list(*(
+            None if (x, y) in without else _tile_at(x, y)
+            for y in range(HEIGHT) for x in range(WIDTH)
+        ))
+    })
+    return manager
+
+
+def _index(tile):
+    return tile.x + tile.y * WIDTH
+
+
+@pytest.mark.parametrize('game_name', TILE_GAMES)
+def test_adjacency_matches_get_neighbors(game_name):
+    game = _manager(game_name).game
+    offsets, neighbors = adjacency(game)
+
+    assert len(offsets) == len(game.tiles) + 1
+    for i, tile in enumerate(game.tiles):
+        assert list(neighbors[offsets[i]:offsets[i + 1]]) == [_index(n) for n in tile.get_neighbors()]
+
+    assert list(neighbors[offsets[0]:offsets[1]]) == [1, 4]  # east and south, of the corner
+    assert list(neighbors[offsets[5]:offsets[6]]) == [1, 6, 9, 4]  # in the order of directions
+
+
+def test_adjacency_matches_get_neighbors_of_a_real_map():
+    with gzip.open(FIXTURE, 'rb') as file:
+        recorded = json.loads(file.read().decode('utf-8'))
+    manager = GameManager(games.necrowar.Game())
+    manager.set_constants(recorded['constants'])
+    manager.apply_delta_state(recorded['sequences'][0][0])
+    game = manager.game
+    offsets, neighbors = adjacency(game)
+
+    assert len(game.tiles) == 63 * 32
+    for i, tile in enumerate(game.tiles):
+        assert list(neighbors[offsets[i]:offsets[i + 1]]) == [n.x + n.y * game.map_width for n in tile.get_neighbors()]
+
+
+def test_adjacency_leaves_tiles_not_yet_merged_empty():
+    game = _manager('necrowar', without=[(1, 1)]).game
+    offsets, neighbors = adjacency(game)
+
+    assert offsets[5] == offsets[6]
+    assert list(neighbors[offsets[1]:offsets[2]]) == [2, 0]  # its reference is None, so not a neighbor
+
+
+@pytest.mark.parametrize('game_name', TILE_GAMES)
+def test_recomputes_neighbors_after_a_link_changes(game_name):
+    manager = _manager(game_name)
+    game = manager.game
+    tile = game.tiles[5]
+    cached = tile.neighbors
+
+    # other fields changing keep them cached
+    manager.apply_delta_state({'gameObjects': {'5': {'x': 1}}})
+    assert tile.neighbors is cached
+
+    manager.apply_delta_state({'gameObjects': {'5': {'tileEast': None}}})
+    assert tile.neighbors == (game.tiles[1], game.tiles[9], game.tiles[4])
+    assert tile.get_neighbors() == [game.tiles[1], game.tiles[9], game.tiles[4]]
+    assert not tile.has_neighbor(game.tiles[6])
+
+    manager.apply_delta_state({'gameObjects': {'5': {'tileEast': {'id': '7'}, 'tileWest': None}}})
+    assert tile.neighbors == (game.tiles[1], game.tiles[7], game.tiles[9])
+    assert tile.has_neighbor(game.tiles[7])
+    offsets, neighbors = adjacency(game)
+    assert list(neighbors[offsets[5]:offsets[6]]) == [1, 7, 9]
@@ -0,0 +1,148 @@
+# Tests of joueur.tile_store, over simulated and recorded Necrowar games: the
+# arrays must hold what the tiles do after the deltas merged, and select the
+# same tiles as walking them would
+import gzip
+import json
+import os
+
+import pytest
+
+numpy = pytest.importorskip('numpy')
+
+import games.necrowar
+from joueur.game_manager import GameManager
+from joueur.tile_store import TileStore
+
+from necrowar_random import Chaos, RandomAI
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'deltas', 'necrowar.json.gz')
+
+
+# a manager and the recorded deltas of a game, with the first merged
+def _recorded():
+    with gzip.open(FIXTURE, 'rb') as file:
+        recorded = json.loads(file.read().decode('utf-8'))
+
+    manager = GameManager(games.necrowar.Game())
+    manager.set_constants(recorded['constants'])
+    deltas = recorded['sequences'][0]
+    manager.apply_delta_state(deltas[0])
+    return manager, deltas[1:]
+
+
+# what the array of a field should hold, from the tiles themselves
+def _expected(store, field):
+    values = []
+    for tile in store.game.tiles:
+        value = getattr(tile, field)
+        if field in ('owner', 'tower', 'unit'):
+            value = -1 if value is None else int(value.id)
+        values.append(value)
+
+    return numpy.array(values, dtype=store[field].dtype)
+
+
+# the bundled AI keeping a store of the tiles, checking it after each update
+class _Stored(RandomAI):
+    def start(self):
+        RandomAI.start(self)
+        self.store = TileStore(self.game, self.changes)
+        self.changed = set()
+        self.updates = 0
+        self._check()
+
+    def game_updated(self):
+        RandomAI.game_updated(self)
+        if hasattr(self, 'store'):  # started
+            changes = self.changes
+            self.changed |= {
+                field for tile in changes.game_objects() if isinstance(tile, games.necrowar.Tile)
+                for field in changes.fields[tile.id] if field in self.store
+            }
+            self.updates += 1
+            if self.updates % 10 == 0:
+                self._check()
+
+    def _check(self):
+        for field in self.store._columns:
+            assert numpy.array_equal(self.store[field], _expected(self.store, field)), field
+
+
+def test_stays_in_sync_with_merged_deltas():
+    simulator = Chaos((_Stored, RandomAI), settings={'max_turns': 30}, seed=0, ai_settings=('seed=0', 'seed=0'))
+    store = simulator.play()[0].store
+
+    assert simulator.errors == {}
+    assert {'corpses', 'num_zombies', 'is_path', 'owner', 'tower', 'unit'} <= set(store._columns)
+    assert 'tile_north' not in store and 'x' not in store
+    for field in store._columns:
+        assert numpy.array_equal(store[field], _expected(store, field)), field
+
+    # so the deltas changed the arrays, not only the first state
+    assert {'corpses', 'num_zombies', 'num_ghouls', 'num_hounds', 'unit', 'tower', 'is_tower'} <= simulator._clients[0][1].changed
+
+
+def test_stops_syncing_once_closed():
+    manager, deltas = _recorded()
+    store = TileStore(manager.game, manager.changes, fields=['unit'])
+    before = store['unit'].copy()
+    store.close()
+
+    for delta in deltas:
+        manager.apply_delta_state(delta)
+
+    assert numpy.array_equal(store['unit'], before)
+    assert not numpy.array_equal(_expected(store, 'unit'), before)
+    assert manager.changes._subscriptions == {}
+
+
+def test_selects_tiles_by_mask():
+    manager, deltas = _recorded()
+    store = TileStore(manager.game, manager.changes, fields=['is_path', 'owner', 'num_zombies'])
+    for delta in deltas:
+        manager.apply_delta_state(delta)
+    game = manager.game
+    player = game.players[0]
+
+    assert store.tiles(store['is_path']) == [tile for tile in game.tiles if tile.is_path]
+    assert store.tiles(store['owner'] == int(player.id)) == [tile for tile in game.tiles if tile.owner is player]
+    assert store.tiles(store['num_zombies'] > 0) == [tile for tile in game.tiles if tile.num_zombies > 0]
+    assert store.tiles(numpy.zeros(len(game.tiles), dtype=bool)) == []
+
+
+def test_finds_tiles_near_a_position():
+    manager, deltas = _recorded()
+    store = TileStore(manager.game, manager.changes, fields=['is_path'])
+    game = manager.game
+
+    for x, y, radius in ((6, 6, 2.2), (0, 0, 3), (62, 31, 1), (30, 15, 0)):
+        near = store.tiles(store.near(x, y, radius))
+        assert near == [
+            tile for tile in game.tiles
+            if (tile.x - x) ** 2 + (tile.y - y) ** 2 <= radius * radius
+        ]
+
+    assert len(store.tiles(store.near(30, 15, 0))) == 1
+    assert len(store.tiles(store.near(30, 15, 1))) == 5
+    near_path = store.tiles(store['is_path'] & store.near(6, 6, 2.2))
+    assert near_path and all(tile.is_path for tile in near_path)
+
+
+def test_shapes_a_field_like_the_map():
+    manager, deltas = _recorded()
+    store = TileStore(manager.game, manager.changes, fields=['is_river', 'unit'])
+    game = manager.game
+
+    grid = store.grid('is_river')
+    assert grid.shape == (game.map_height, game.map_width)
+    for tile in game.tiles:
+        assert grid[tile.y, tile.x] == tile.is_river
+
+    # a view, so it is kept in sync as well
+    for delta in deltas:
+        manager.apply_delta_state(delta)
+    units = store.grid('unit')
+    for tile in game.tiles:
+        assert units[tile.y, tile.x] == (-1 if tile.unit is None else int(tile.unit.id))
+    assert store.index(3, 2) == 3 + 2 * game.map_width
+    assert game.tiles[store.index(3, 2)] is game.get_tile_at(3, 2)
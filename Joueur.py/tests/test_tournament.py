@@ -0,0 +1,209 @@
+# Tests of joueur.tournament's pairings and ratings, against values worked out
+# by hand, as getting them wrong would skew every tournament's results without
+# anything failing
+import math
+import random
+
+import pytest
+
+from joueur import tournament
+from joueur.tournament import parse_variant, round_robin, summarize, swiss_pairings
+
+
+def _variants(*names):
+    return [parse_variant(name) for name in names]
+
+
+# the result of a game between two variants, the first winning by default
+def _result(first, second, winner=0, turn_seconds=(0.0, 0.0)):
+    return {
+        'players': [first, second],
+        'winner': winner,
+        'turn_seconds': list(turn_seconds)
+    }
+
+
+def _names(pairings):
+    return [(a['name'], b['name']) for a, b in pairings]
+
+
+def test_parses_variants():
+    assert parse_variant('games.necrowar.ai') == {
+        'name': 'games.necrowar.ai', 'module': 'games.necrowar.ai', 'class': 'AI', 'ai_settings': None
+    }
+    assert parse_variant('greedy=games.necrowar.ai:Greedy?aggression=3&log') == {
+        'name': 'greedy', 'module': 'games.necrowar.ai', 'class': 'Greedy', 'ai_settings': 'aggression=3&log'
+    }
+
+
+def test_schedules_every_pair_taking_turns_going_first():
+    a, b, c = _variants('a', 'b', 'c')
+
+    assert _names(round_robin([a, b, c], 3)) == [
+        ('a', 'b'), ('b', 'a'), ('a', 'b'),
+        ('a', 'c'), ('c', 'a'), ('a', 'c'),
+        ('b', 'c'), ('c', 'b'), ('b', 'c')
+    ]
+
+
+def test_pairs_everyone_in_the_first_swiss_round():
+    variants = _variants('a', 'b', 'c', 'd')
+
+    pairings = swiss_pairings(variants, [], random.Random(0))
+
+    assert len(pairings) == 2
+    assert sorted(name for pair in _names(pairings) for name in pair) == ['a', 'b', 'c', 'd']
+
+
+def test_pairs_by_the_standings_without_rematches():
+    variants = _variants('a', 'b', 'c', 'd')
+    results = [_result('a', 'b'), _result('c', 'd')]  # a and c lead
+
+    assert _names(swiss_pairings(variants, results, random.Random(0))) in (
+        [('a', 'c'), ('b', 'd')], [('c', 'a'), ('b', 'd')],
+        [('a', 'c'), ('d', 'b')], [('c', 'a'), ('d', 'b')]
+    )
+
+    # a has played c already, so b, the closest it has not
+    results += [_result('a', 'c')]
+    assert _names(swiss_pairings(variants, results, random.Random(0)))[0] == ('a', 'b') or \
+        _names(swiss_pairings(variants, results, random.Random(0)))[0] == ('a', 'd')
+    assert _names(swiss_pairings(variants, results + [_result('a', 'b')], random.Random(0)))[0] == ('a', 'd')
+
+
+def test_rematches_the_closest_once_everyone_was_played():
+    variants = _variants('a', 'b')
+    results = [_result('a', 'b')]
+
+    assert _names(swiss_pairings(variants, results, random.Random(0))) == [('a', 'b')]
+
+
+def test_gives_a_bye_to_the_lowest_that_has_not_had_one():
+    variants = _variants('a', 'b', 'c')
+
+    # round one: c, last after the coin flips, sits out
+    first = swiss_pairings(variants, [], random.Random(0))
+    assert len(first) == 1
+    sat_out = ({'a', 'b', 'c'} - set(_names(first)[0])).pop()
+
+    # round two: whoever lost round one is lowest, but has played, so the
+    # one that sat out plays and the loser sits out
+    results = [_result(*_names(first)[0])]
+    loser = _names(first)[0][1]
+    second = swiss_pairings(variants, results, random.Random(0))
+    assert len(second) == 1
+    assert sat_out in _names(second)[0]
+    assert loser not in _names(second)[0]
+
+    # round three: everyone has played twice but the loser, once, who now plays
+    results.append(_result(*_names(second)[0]))
+    third = swiss_pairings(variants, results, random.Random(0))
+    assert loser in _names(third)[0]
+
+
+def test_gives_the_bye_by_the_standings():
+    variants = _variants('a', 'b', 'c', 'd', 'e')
+    results = [_result('a', 'b'), _result('c', 'd')]  # e sat out, b and d lost
+
+    pairings = swiss_pairings(variants, results, random.Random(0))
+    paired = {name for pair in _names(pairings) for name in pair}
+
+    assert len(pairings) == 2
+    assert 'e' in paired
+    assert ({'a', 'b', 'c', 'd', 'e'} - paired).pop() in ('b', 'd')  # lowest of those that played
+
+
+def test_computes_wilson_intervals():
+    assert tournament._wilson(5, 10) == pytest.approx((0.2366, 0.7634), abs=1e-4)
+    assert tournament._wilson(0, 10) == pytest.approx((0.0, 0.2775), abs=1e-4)
+    assert tournament._wilson(10, 10) == pytest.approx((0.7225, 1.0), abs=1e-4)
+    assert tournament._wilson(81, 263) == pytest.approx((0.2553, 0.3662), abs=1e-4)
+
+    # wider with more confidence, and narrower with more games
+    assert tournament._wilson(5, 10, z=2.576)[0] < tournament._wilson(5, 10)[0]
+    assert tournament._wilson(50, 100)[0] > tournament._wilson(5, 10)[0]
+
+
+def test_computes_elo_differences():
+    assert tournament._elo_difference(0.5) == 0
+    assert tournament._elo_difference(0.75) == pytest.approx(190.85, abs=0.01)
+    assert tournament._elo_difference(0.25) == pytest.approx(-190.85, abs=0.01)
+    assert tournament._elo_difference(1.0) == math.inf
+    assert tournament._elo_difference(0.0) == -math.inf
+
+
+def _wins(names, *games):
+    wins = {name: {other: 0 for other in names} for name in names}
+    for winner, loser, count in games:
+        wins[winner][loser] += count
+    return wins
+
+
+def test_rates_two_variants_by_their_wins():
+    names = ['a', 'b']
+
+    # 3 wins to 1, plus the draw each pair counts as having, so 3.5 to 1.5
+    ratings = tournament._bradley_terry(names, _wins(names, ('a', 'b', 3), ('b', 'a', 1)))
+    assert ratings['a'] == pytest.approx(200 * math.log10(3.5 / 1.5), abs=1e-6)
+    assert ratings['b'] == pytest.approx(-ratings['a'], abs=1e-9)
+
+    even = tournament._bradley_terry(names, _wins(names, ('a', 'b', 2), ('b', 'a', 2)))
+    assert even == pytest.approx({'a': 0.0, 'b': 0.0})
+
+    # winning every game is still a finite rating
+    swept = tournament._bradley_terry(names, _wins(names, ('a', 'b', 10)))
+    assert math.isfinite(swept['a']) and swept['a'] == pytest.approx(200 * math.log10(10.5 / 0.5), abs=1e-6)
+
+
+def test_rates_many_variants_by_their_wins():
+    names = ['a', 'b', 'c']
+    ratings = tournament._bradley_terry(names, _wins(
+        names, ('a', 'b', 6), ('b', 'a', 4), ('b', 'c', 6), ('c', 'b', 4), ('a', 'c', 7), ('c', 'a', 3)
+    ))
+
+    assert ratings['a'] > ratings['b'] > ratings['c']
+    assert sum(ratings.values()) == pytest.approx(0, abs=1e-9)
+
+    # as the model has it, the scores the ratings mean add up to the games each won
+    strengths = {name: 10 ** (rating / 400) for name, rating in ratings.items()}
+    expected_a = sum(11 * strengths['a'] / (strengths['a'] + strengths[other]) for other in 'bc')
+    assert expected_a == pytest.approx(13 + 1, abs=1e-6)
+
+
+def test_summarizes_the_results():
+    variants = _variants('a', 'b', 'c')
+    results = [
+        _result('a', 'b', 0, (0.1, 0.2)),
+        _result('b', 'a', 1, (0.2, 0.3)),
+        _result('a', 'b', 1, (0.1, 0.2)),
+        _result('a', 'c', 0, (0.1, 0.4)),
+        {'players': ['b', 'c'], 'winner': None, 'error': 'ValueError: broken'}
+    ]
+
+    summary = summarize(variants, results)
+    standings = {standing['name']: standing for standing in summary['standings']}
+
+    assert [standing['name'] for standing in summary['standings']] == ['a', 'b', 'c']
+    assert standings['a'] == dict(standings['a'], wins=3, losses=1, errors=0, score=0.75)
+    assert standings['a']['turn_seconds'] == pytest.approx((0.1 + 0.3 + 0.1 + 0.1) / 4)
+    assert standings['b'] == dict(standings['b'], wins=1, losses=2, errors=1)
+    assert standings['b']['score'] == pytest.approx(1 / 3)
+    assert standings['c'] == dict(standings['c'], wins=0, losses=1, errors=1, score=0.0, turn_seconds=0.4)
+    assert sum(standing['elo'] for standing in summary['standings']) == pytest.approx(0, abs=1e-9)
+
+    pairs = {tuple(pair['players']): pair for pair in summary['pairs']}
+    assert set(pairs) == {('a', 'b'), ('a', 'c')}  # b and c only errored
+    assert pairs[('a', 'b')]['wins'] == [2, 1]
+    assert pairs[('a', 'b')]['score'] == pytest.approx(2 / 3)
+    assert pairs[('a', 'b')]['score_interval'] == pytest.approx(list(tournament._wilson(2, 3)))
+    assert pairs[('a', 'b')]['elo'] == pytest.approx(400 * math.log10(2))
+    assert pairs[('a', 'c')]['elo'] == math.inf
+    assert pairs[('a', 'c')]['elo_interval'][1] == math.inf
+
+
+def test_summarizes_no_results():
+    summary = summarize(_variants('a', 'b'), [])
+
+    assert summary['pairs'] == []
+    assert [standing['score'] for standing in summary['standings']] == [None, None]
+    assert [standing['elo'] for standing in summary['standings']] == [0.0, 0.0]
@@ -0,0 +1,125 @@
+# Tests of playing without a server, over a LoopbackTransport to a responder in
+# the test, either a ScriptedResponder or the stand-in server in loopback.py.
+import asyncio
+
+import pytest
+
+import games.checkers
+import joueur.error_code as error_code
+import loopback
+from joueur.client import Client
+from joueur.run import run, run_async
+from joueur.transport import LoopbackTransport, ScriptedResponder
+
+
+# logs a message each turn, keeping what the server replied
+class LoggingAI(games.checkers.AI):
+    def start(self):
+        self.replies = []
+
+    def run_turn(self):
+        self.replies.append(self.player.log('turn {}'.format(self.game.current_turn)))
+        return True
+
+
+class AsyncLoggingAI(games.checkers.AI):
+    async def start(self):
+        self.replies = []
+
+    async def run_turn(self):
+        self.replies.append(await self.player.log('turn {}'.format(self.game.current_turn)))
+        return True
+
+
+# one turn, logging once, then over
+SCRIPT = loopback.starting() + [
+    {'event': 'order', 'data': {'name': 'runTurn', 'index': 0, 'args': []}},
+    {'event': 'ran', 'data': 'logged'}
+] + loopback.ending()
+
+
+def test_sends_events_to_the_responder_as_they_are():
+    responder = ScriptedResponder([])
+    transport = LoopbackTransport(responder)
+    data = {'caller': object(), 'args': [1, 2]}
+    transport.send('run', data)
+    transport.send('finished', None)
+
+    assert responder.sent == [('run', data), ('finished', None)]
+    assert responder.sent[0][1] is data  # never serialized
+    assert transport.stats() == {'events_sent': 2, 'events_received': 0}
+
+
+def test_receives_the_events_of_the_responder_one_at_a_time():
+    events = [{'event': 'a', 'data': 1}, {'event': 'b', 'data': {'c': [2]}}]
+    transport = LoopbackTransport(ScriptedResponder(events))
+
+    assert transport.receive_nowait() == events[:1]
+    assert asyncio.run(transport.receive()) == events[1:]
+    assert transport.stats()['events_received'] == 2
+
+
+def test_disconnects_once_the_responder_has_nothing_more():
+    transport = LoopbackTransport(ScriptedResponder([]))
+    with pytest.raises(error_code.JoueurError) as raised:
+        transport.receive_nowait()
+
+    assert raised.value.code == error_code.DISCONNECTED_UNEXPECTEDLY
+
+
+def test_drops_sends_once_closed():
+    responder = ScriptedResponder([])
+    transport = LoopbackTransport(responder)
+    transport.close()
+    transport.send('run', {})
+
+    assert transport.closed
+    assert responder.sent == []
+
+
+def test_attaches_a_client_to_a_transport():
+    transport = LoopbackTransport(ScriptedResponder(SCRIPT[:1]))
+    client = Client()
+    client.attach(transport)
+    try:
+        client.send('alias', 'Checkers')
+        assert client.wait_for_event('named') == 'Checkers'
+    finally:
+        client.close()
+
+    assert transport.closed
+    assert transport.hostname == 'loopback'
+
+
+def test_plays_a_scripted_game():
+    script = ScriptedResponder(SCRIPT)
+    ai = run(loopback.args(), transport=LoopbackTransport(script), ai_class=LoggingAI)
+
+    assert [event for event, data in script.sent] == ['alias', 'play', 'run', 'finished']
+    event, data = script.sent[2]
+    assert data['caller'] is ai.player
+    assert data['functionName'] == 'log'
+    assert data['args'] == {'message': 'turn 0'}
+    assert script.sent[3][1] == {'orderIndex': 0, 'returned': True}
+
+    assert ai.replies == ['logged']
+    assert ai.player.won and ai.player.reason_won == 'Tested'
+    assert [checker.id for checker in ai.player.checkers] == ['2']
+
+
+def test_plays_a_scripted_game_on_asyncio():
+    script = ScriptedResponder(SCRIPT)
+    ai = asyncio.run(run_async(loopback.args(), transport=LoopbackTransport(script), ai_class=AsyncLoggingAI))
+
+    assert [event for event, data in script.sent] == ['alias', 'play', 'run', 'finished']
+    assert ai.replies == ['logged']
+    assert ai.player.won
+
+
+def test_plays_turns_against_a_responder():
+    server = loopback.Server(turns=3, reply=lambda data, number: [{'event': 'ran', 'data': number}])
+    ai = run(loopback.args(), transport=LoopbackTransport(server), ai_class=LoggingAI)
+
+    assert ai.replies == [0, 1, 2]
+    assert [data['orderIndex'] for event, data in server.sent if event == 'finished'] == [0, 1, 2]
+    assert ai.player.won